@@ -32,9 +32,17 @@ main() {
     exit 1
   else
     [[ $DO_DEBUG == true ]] && display_debug "Pip install dependencies successfully."
+    if ! generate_data; then
+      display_stderr "Failed to generate the bundled datasets in mycity/data."
+      exit 1
+    fi
+    [[ $DO_DEBUG == true ]] && display_debug "Bundled datasets generated successfully."
     if ! zip_site_packages; then
       display_stderr "Failed to zip the artifacts to ${OUT_FILE}."
       exit 1
+    elif ! check_bundled_data; then
+      display_stderr "The bundled datasets are missing from ${OUT_FILE}."
+      exit 1
     else
       if [[ $DO_DEBUG = true ]]; then
         echo "###########################"
@@ -77,6 +85,22 @@ install_dependencies() {
   return $?
 }
 
+#######################################
+# Downloads the datasets answered from the package (such as the
+# neighborhood and precinct polygons) into mycity/data and checks they
+# load, so the Lambda does not query them on every request.
+# Arguments:
+#   None
+# Returns:
+#   None
+#######################################
+generate_data() {
+  [[ $DO_DEBUG == true ]] && display_debug "Generating the bundled datasets."
+  venv/bin/python -m mycity.utilities.boundary_utils --refresh --check &&
+    venv/bin/python -m mycity.utilities.voting_utils --refresh --check
+  return $?
+}
+
 zip_site_packages() {
   if [[ $DO_DEBUG = true ]]; then
     display_debug "Zipping source files and dependencies to $OUT_FILE."
@@ -87,5 +111,29 @@ zip_site_packages() {
   return $?
 }
 
+#######################################
+# Checks the bundled datasets made it into the upload. Without them the
+# skill still works, but asks ArcGIS where every location is, so the
+# build fails rather than deploying it that way.
+# Arguments:
+#   None
+# Returns:
+#   None
+#######################################
+check_bundled_data() {
+  [[ $DO_DEBUG == true ]] && display_debug "Checking the bundled datasets are in $OUT_FILE."
+  venv/bin/python -c '
+import sys, zipfile
+names = set(zipfile.ZipFile(sys.argv[1]).namelist())
+missing = [name for name in sys.argv[2:] if name not in names]
+if missing:
+    sys.exit("Missing from the upload: " + ", ".join(missing))
+' "$OUT_FILE" \
+    mycity/data/boston_neighborhoods.geojson \
+    mycity/data/boston_precincts.geojson \
+    mycity/data/polling_locations.json
+  return $?
+}
+
 # Execute main function
 main "$@"
\ No newline at end of file
@@ -10,6 +10,7 @@ import traceback
 from mycity.intents.feedback_intent import build_slack_traceback, send_to_slack
 from mycity.mycity_request_data_model import MyCityRequestDataModel
 from mycity.mycity_controller import execute_request
+from mycity.utilities.deadline import Deadline
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +35,7 @@ def lambda_handler(event, context):
 
     try:
         model = platform_to_mycity_request(event)
+        model.deadline = Deadline.from_lambda_context(context)
         return mycity_response_to_platform(execute_request(model))
     except Exception as error:
         trace = traceback.format_exc()
@@ -0,0 +1,182 @@
+"""
+Sending every destination to ClosestFacility against only the nearest ones.
+
+Finder sends the routing service the max_destinations destinations closest
+to the origin in a straight line (see Finder.nearest_rows) instead
+of the whole dataset. For random origins around the snow emergency parking
+lots in test/test_data, this reports for each number of destinations kept:
+the time to pick them, the size of the request body, the time the routing
+service took to solve, and how often it picked the same lot as when it was
+given every lot.
+
+Solving needs the ArcGIS routing service and credentials in
+ARCGIS_CLIENT_ID and ARCGIS_CLIENT_SECRET. No fixtures are committed, so
+record its answers first:
+
+    python -m mycity.benchmarks.closest_facility --record
+
+Solve times are only reported while recording. Later runs replay the
+answers from fixtures through utilities/http_replay, which keeps the
+agreement figures. Without fixtures only the selection time and request
+size are reported.
+
+Run from the project root.
+"""
+
+import argparse
+import csv
+import os
+import random
+import statistics
+import time
+
+import mycity.utilities.arcgis_utils as arcgis_utils
+import mycity.utilities.http_replay as http_replay
+from mycity.utilities.finder.RecordStore import RecordStore
+
+TEST_DATA_DIRECTORY = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'test', 'test_data')
+DEFAULT_FIXTURES_DIRECTORY = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'fixtures',
+    'closest_facility')
+
+DEFAULT_LIMITS = [3, 5, 10, 20]
+
+
+def load_destinations(file_name='Snow_Emergency_Parking.csv'):
+    """
+    :param file_name: name of a csv file in test_data with X, Y and
+        Address columns
+    :return: dictionary with (X, Y) coordinates as keys and address strings
+        as values, as RecordStore.coordinate_dict builds it, leaving out
+        records without coordinates
+    """
+    with open(os.path.join(TEST_DATA_DIRECTORY, file_name),
+              encoding='utf-8-sig') as csv_file:
+        return {(record['X'], record['Y']): record['Address'] + ' Boston, MA'
+                for record in csv.DictReader(csv_file)
+                if record['X'].strip() and record['Y'].strip()}
+
+
+def random_origins(destinations, count, seed):
+    """
+    :param destinations: dictionary with (X, Y) coordinates as keys
+    :param count: number of origins
+    :param seed: random seed, so recorded fixtures match later runs
+    :return: list of origin dictionaries with 'x' and 'y' keys, inside the
+        bounding box of the destinations
+    """
+    xs = [float(x) for x, _ in destinations]
+    ys = [float(y) for _, y in destinations]
+    generator = random.Random(seed)
+    return [{'x': round(generator.uniform(min(xs), max(xs)), 6),
+             'y': round(generator.uniform(min(ys), max(ys)), 6)}
+            for _ in range(count)]
+
+
+def select(origin, destinations, store, limit):
+    """
+    :param destinations: dictionary of every destination, as
+        load_destinations returns it
+    :param store: RecordStore of the same destinations
+    :return: tuple of (destinations kept, seconds taken to pick them)
+    """
+    if limit is None:
+        return destinations, 0.0
+    start = time.perf_counter()
+    kept = store.coordinate_dict(store.nearest_rows(origin, limit))
+    return kept, time.perf_counter() - start
+
+
+def body_size(origin, destinations):
+    """
+    :return: size in bytes of the ClosestFacility request body
+    """
+    params = {
+        'f': 'json',
+        'token': 'x' * 128,
+        'returnDirections': 'false',
+        'returnCFRoutes': 'true',
+        'incidents': '{},{}'.format(origin['x'], origin['y']),
+        'facilities': ';'.join('{},{}'.format(x, y)
+                               for x, y in destinations),
+    }
+    body, _ = arcgis_utils.format_multipart_form_request(
+        arcgis_utils.ARCGIS_CLOSEST_FACILITY_URL, params)
+    return len(body.encode('utf-8'))
+
+
+def solve(token, origin, destinations):
+    """
+    :return: tuple of (closest address or None, seconds taken)
+    """
+    start = time.perf_counter()
+    closest = arcgis_utils.find_closest_route(token, origin, destinations)
+    elapsed = time.perf_counter() - start
+    return (closest['Address'] if closest else None), elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--origins', type=int, default=20,
+                        help='number of random origins')
+    parser.add_argument('--limits', type=int, nargs='+',
+                        default=DEFAULT_LIMITS,
+                        help='numbers of destinations to keep')
+    parser.add_argument('--seed', type=int, default=311)
+    parser.add_argument('--fixtures', default=DEFAULT_FIXTURES_DIRECTORY,
+                        help='directory of recorded routing responses')
+    parser.add_argument('--record', action='store_true',
+                        help='call the routing service and save responses')
+    args = parser.parse_args(argv)
+
+    destinations = load_destinations()
+    store = RecordStore(({'X': x, 'Y': y, 'Address': address}
+                         for (x, y), address in destinations.items()),
+                        'Address')
+    origins = random_origins(destinations, args.origins, args.seed)
+    limits = [None] + sorted(args.limits)
+    solving = args.record or os.path.isdir(args.fixtures)
+    print('* {} destinations, {} origins{}'.format(
+        len(destinations), len(origins),
+        '' if solving else ', no fixtures so not solving'))
+
+    if args.record:
+        context = http_replay.recording(args.fixtures)
+    else:
+        context = http_replay.replaying(args.fixtures, strict=False)
+    with context:
+        token = arcgis_utils.generate_access_token() if solving else None
+        answers = {}
+        print('* {:>6} {:>10} {:>10} {:>10} {:>10}'.format(
+            'kept', 'select us', 'body KB', 'solve ms', 'agree'))
+        for limit in limits:
+            select_times, sizes, solve_times = [], [], []
+            agreed = solved = 0
+            for index, origin in enumerate(origins):
+                kept, seconds = select(origin, destinations, store, limit)
+                select_times.append(seconds)
+                sizes.append(body_size(origin, kept))
+                if not solving:
+                    continue
+                closest, seconds = solve(token, origin, kept)
+                if args.record:
+                    solve_times.append(seconds)
+                if limit is None:
+                    answers[index] = closest
+                elif closest is not None and answers.get(index) is not None:
+                    solved += 1
+                    agreed += closest == answers[index]
+            print('* {:>6} {:>10.1f} {:>10.2f} {:>10} {:>10}'.format(
+                'all' if limit is None else limit,
+                statistics.median(select_times) * 1e6,
+                statistics.median(sizes) / 1024,
+                '{:.1f}'.format(statistics.median(solve_times) * 1000)
+                if solve_times else '-',
+                '{}/{}'.format(agreed, solved)
+                if limit is not None and solving else '-'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,275 @@
+"""
+Cold start benchmark for the lambda entry point.
+
+Imports lambda_function in a fresh interpreter a number of times and reports
+how long the import took and whether anything tried to open a network
+connection while importing. Any network activity at import time is paid by
+every cold Lambda container before the first request is handled.
+
+Each child runs with -X importtime, so the time is also broken down by
+package (mycity, requests, bs4, usaddress, dateutil, pytz, the standard
+library, ...) and by module. --with-intents also imports every intent
+handler, as the first request for each intent would.
+
+The report can be written as JSON, and the run fails if the median import
+time is more than --tolerance above a stored baseline. Baselines are only
+comparable on the machine they were measured on, so refresh the baseline
+with --update-baseline when changing machines.
+
+Run from the project root:
+
+    python -m mycity.benchmarks.cold_start --runs 10 --report report.json
+    python -m mycity.benchmarks.cold_start --runs 10 --update-baseline
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                'cold_start_baseline.json')
+
+# Fraction the median import time may grow past the baseline
+DEFAULT_TOLERANCE = 0.2
+
+# Written to stderr by the child right before importing lambda_function;
+# -X importtime lines after it belong to the import being measured
+IMPORT_MARKER = '--- importing lambda_function ---'
+
+IMPORT_TIME_PREFIX = 'import time:'
+
+STDLIB_MODULE_NAMES = getattr(sys, 'stdlib_module_names', frozenset())
+
+# Executed in the child interpreter. Socket creation and name resolution are
+# replaced with versions that record the attempt and then refuse it, so a
+# module that reaches for the network at import time is both counted and
+# kept from actually touching a remote host.
+CHILD_SCRIPT = """
+import json
+import socket
+import time
+
+attempts = []
+
+def _refuse(name):
+    def refused(*args, **kwargs):
+        attempts.append(name + ' ' + repr(args[:2]))
+        raise OSError('network disabled during cold start benchmark')
+    return refused
+
+socket.getaddrinfo = _refuse('getaddrinfo')
+socket.create_connection = _refuse('create_connection')
+socket.socket.connect = _refuse('connect')
+
+import sys
+sys.stderr.write(%r + '\\n')
+sys.stderr.flush()
+start = time.perf_counter()
+import lambda_function
+if %r:
+    from mycity.mycity_controller import INTENT_HANDLERS
+    for intent_name in INTENT_HANDLERS:
+        INTENT_HANDLERS.get_handler(intent_name)
+elapsed = time.perf_counter() - start
+print(json.dumps({'seconds': elapsed, 'network_attempts': attempts}))
+"""
+
+
+def parse_import_times(stderr):
+    """
+    Reads the -X importtime lines written after IMPORT_MARKER
+
+    :param stderr: standard error of the child interpreter
+    :return: dictionary of module name to the seconds spent importing the
+        module itself, not counting the modules it imported
+    """
+    module_seconds = {}
+    lines = stderr.splitlines()
+    if IMPORT_MARKER in lines:
+        lines = lines[lines.index(IMPORT_MARKER) + 1:]
+    for line in lines:
+        if not line.startswith(IMPORT_TIME_PREFIX):
+            continue
+        fields = line[len(IMPORT_TIME_PREFIX):].split('|')
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            # the column header
+            continue
+        module_name = fields[2].strip()
+        module_seconds[module_name] = \
+            module_seconds.get(module_name, 0) + int(fields[0]) / 1e6
+    return module_seconds
+
+
+def package_of(module_name):
+    """
+    :param module_name: dotted module name
+    :return: top level package name, or 'stdlib' for the standard library
+    """
+    top_level = module_name.split('.')[0]
+    if top_level in STDLIB_MODULE_NAMES or top_level.startswith('_'):
+        return 'stdlib'
+    return top_level
+
+
+def run_cold_import(project_root, with_intents=False):
+    """
+    Imports lambda_function once in a new interpreter
+
+    :param project_root: directory containing lambda_function.py
+    :param with_intents: also import every registered intent handler
+    :return: dictionary with the import time in seconds, a list of the
+        network calls attempted during the import and the seconds spent
+        importing each module
+    """
+    env = dict(os.environ)
+    env.setdefault('SLACK_WEBHOOKS_URL', 'FAKEFAKEFAKE')
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c',
+         CHILD_SCRIPT % (IMPORT_MARKER, with_intents)],
+        cwd=project_root,
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError('Importing lambda_function failed:\n' +
+                           result.stderr)
+    run = json.loads(result.stdout.strip().splitlines()[-1])
+    run['modules'] = parse_import_times(result.stderr)
+    return run
+
+
+def build_report(runs, top=15):
+    """
+    Summarizes several cold imports
+
+    :param runs: list of dictionaries returned by run_cold_import
+    :param top: number of slowest modules to include
+    :return: dictionary that can be written as JSON, times in seconds
+    """
+    timings = [run['seconds'] for run in runs]
+    module_names = set()
+    for run in runs:
+        module_names.update(run['modules'])
+    modules = {name: statistics.median(run['modules'].get(name, 0)
+                                       for run in runs)
+               for name in module_names}
+    packages = {}
+    for name, seconds in modules.items():
+        package = package_of(name)
+        packages[package] = packages.get(package, 0) + seconds
+    slowest = sorted(modules, key=modules.get, reverse=True)[:top]
+    return {
+        'runs': len(runs),
+        'seconds': {'min': min(timings),
+                    'median': statistics.median(timings),
+                    'max': max(timings)},
+        'packages': dict(sorted(packages.items(),
+                                key=lambda item: item[1], reverse=True)),
+        'slowest_modules': {name: modules[name] for name in slowest},
+        'network_attempts': sorted(set(
+            attempt for run in runs for attempt in run['network_attempts']))
+    }
+
+
+def check_regression(report, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Compares a report's median import time with a baseline report
+
+    :param report: dictionary returned by build_report
+    :param baseline: dictionary returned by build_report earlier
+    :param tolerance: fraction the median may grow by
+    :return: message describing the regression, or None
+    """
+    limit = baseline['seconds']['median'] * (1 + tolerance)
+    median = report['seconds']['median']
+    if median <= limit:
+        return None
+    message = 'median cold import {:.1f} ms is over the limit of {:.1f} ms ' \
+        '(baseline {:.1f} ms + {:.0%})'.format(
+            median * 1000, limit * 1000,
+            baseline['seconds']['median'] * 1000, tolerance)
+    grown = [(package, seconds - baseline['packages'].get(package, 0))
+             for package, seconds in report['packages'].items()]
+    grown = [item for item in grown if item[1] > 0]
+    if grown:
+        package, seconds = max(grown, key=lambda item: item[1])
+        message += '; {} grew the most, by {:.1f} ms'.format(
+            package, seconds * 1000)
+    return message
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--runs', type=int, default=5,
+                        help='number of fresh interpreters to import in')
+    parser.add_argument('--project-root', default=os.getcwd(),
+                        help='directory containing lambda_function.py')
+    parser.add_argument('--with-intents', action='store_true',
+                        help='also import every intent handler')
+    parser.add_argument('--report',
+                        help='write the report as JSON to this file')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE,
+                        help='report to compare the median import time to')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='fraction the median may exceed the baseline by')
+    parser.add_argument('--update-baseline', action='store_true',
+                        help='write this run as the new baseline')
+    args = parser.parse_args(argv)
+
+    runs = [run_cold_import(args.project_root, args.with_intents)
+            for _ in range(args.runs)]
+    report = build_report(runs)
+    report['with_intents'] = args.with_intents
+
+    seconds = report['seconds']
+    print('* cold imports of lambda_function{}: {}'.format(
+        ' and every intent' if args.with_intents else '', args.runs))
+    print('*   min    {:8.1f} ms'.format(seconds['min'] * 1000))
+    print('*   median {:8.1f} ms'.format(seconds['median'] * 1000))
+    print('*   max    {:8.1f} ms'.format(seconds['max'] * 1000))
+    print('* median import time by package (excluding what they import):')
+    for package, package_seconds in report['packages'].items():
+        print('*   {:24} {:8.1f} ms'.format(package, package_seconds * 1000))
+    print('* slowest modules:')
+    for module, module_seconds in report['slowest_modules'].items():
+        print('*   {:40} {:8.1f} ms'.format(module, module_seconds * 1000))
+    print('* network attempts during import: {}'.format(
+        len(report['network_attempts'])))
+    for attempt in report['network_attempts']:
+        print('*   ' + attempt)
+
+    if args.report:
+        with open(args.report, 'w') as report_file:
+            json.dump(report, report_file, indent=2)
+    if args.update_baseline:
+        with open(args.baseline, 'w') as baseline_file:
+            json.dump(report, baseline_file, indent=2)
+        print('* baseline written to ' + args.baseline)
+
+    failed = bool(report['network_attempts'])
+    if not args.update_baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+        if baseline.get('with_intents', False) != args.with_intents:
+            print('* baseline was measured {} --with-intents, not compared'
+                  .format('with' if baseline.get('with_intents') else
+                          'without'))
+        else:
+            regression = check_regression(report, baseline, args.tolerance)
+            if regression:
+                print('* REGRESSION: ' + regression)
+                failed = True
+            else:
+                print('* within {:.0%} of the baseline median of {:.1f} ms'
+                      .format(args.tolerance,
+                              baseline['seconds']['median'] * 1000))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
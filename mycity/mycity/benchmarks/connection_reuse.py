@@ -0,0 +1,123 @@
+"""
+Connection reuse benchmark for outbound HTTP.
+
+Replays the sequence of upstream hosts each intent calls against local
+keep-alive servers (one per upstream host) and counts the new connections
+opened. Every new connection to a real upstream is a TCP and TLS handshake.
+
+Two modes are compared:
+    per-call: a fresh requests.Session per call, as the intents used to do
+    pooled:   the shared sessions in mycity.utilities.http_utils
+
+Run from the project root:
+
+    python -m mycity.benchmarks.connection_reuse --invocations 3
+"""
+
+import argparse
+import http.server
+import threading
+
+import requests
+
+import mycity.utilities.http_utils as http_utils
+
+# Upstream hosts called, in order, by one invocation of each intent with an
+# address in the session
+INTENT_UPSTREAM_CALLS = {
+    'SnowParkingIntent': ['geocode.arcgis.com', 'geocode.arcgis.com',
+                          'bostonopendata-boston.opendata.arcgis.com',
+                          'www.arcgis.com', 'route.arcgis.com'],
+    'FoodTruckIntent': ['geocode.arcgis.com', 'geocode.arcgis.com',
+                        'services.arcgis.com'],
+    'CrimeIncidentsIntent': ['geocode.arcgis.com', 'geocode.arcgis.com',
+                             'data.boston.gov'],
+    'VotingIntent': ['geocode.arcgis.com', 'geocode.arcgis.com',
+                     'services.arcgis.com', 'gis.cityofboston.gov'],
+    'TrashDayIntent': ['geocode.arcgis.com', 'recollect.net',
+                       'recollect.net'],
+    'LatestThreeOneOne': ['data.boston.gov'],
+    'GetAlertsIntent': ['www.boston.gov'],
+    'FarmersMarketIntent': ['services.arcgis.com'],
+    'CoronavirusUpdateIntent': ['www.boston.gov'],
+}
+
+
+class _UpstreamHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def do_GET(self):
+        body = b'{}'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _UpstreamServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), _UpstreamHandler)
+        self.connections = 0
+
+
+def _per_call_get(url):
+    with requests.Session() as session:
+        return session.get(url, timeout=http_utils.DEFAULT_TIMEOUT)
+
+
+def measure(intent_name, invocations, get_function):
+    """
+    Replays an intent's upstream calls against local servers
+
+    :param intent_name: key of INTENT_UPSTREAM_CALLS
+    :param invocations: number of warm invocations to replay
+    :param get_function: function taking a url that performs a GET
+    :return: total number of connections opened
+    """
+    hosts = INTENT_UPSTREAM_CALLS[intent_name]
+    servers = {host: _UpstreamServer() for host in set(hosts)}
+    for server in servers.values():
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        for _ in range(invocations):
+            for host in hosts:
+                url = 'http://127.0.0.1:{}/{}'.format(
+                    servers[host].server_port, host)
+                get_function(url).close()
+        return sum(server.connections for server in servers.values())
+    finally:
+        http_utils.close_sessions()
+        for server in servers.values():
+            server.shutdown()
+            server.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--invocations', type=int, default=3,
+                        help='warm invocations to replay per intent')
+    args = parser.parse_args(argv)
+
+    print('* connections opened over {} invocations'.format(args.invocations))
+    print('* {:26} {:>6} {:>9} {:>7}'.format('intent', 'calls', 'per-call',
+                                             'pooled'))
+    for intent_name in sorted(INTENT_UPSTREAM_CALLS):
+        calls = len(INTENT_UPSTREAM_CALLS[intent_name]) * args.invocations
+        per_call = measure(intent_name, args.invocations, _per_call_get)
+        pooled = measure(intent_name, args.invocations, http_utils.get)
+        print('* {:26} {:>6} {:>9} {:>7}'.format(intent_name, calls,
+                                                 per_call, pooled))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+"""
+Peak memory of reading a Finder CSV file whole against streaming it.
+
+For synthetic files shaped like the open data portal's (a dozen columns, of
+which Finder speaks two or three) this reports the peak memory, measured
+with tracemalloc, and the time of turning the downloaded bytes into a
+RecordStore two ways: as FinderCSV did before, decoding the whole body to
+one string and parsing every column of every row, and as it does now,
+decoding the body chunk by chunk and keeping only the filtered rows and
+the columns the output speech uses (see FinderCSV.parse_records).
+
+Run from the project root:
+
+    python -m mycity.benchmarks.csv_ingestion --rows 1000 10000 50000
+"""
+
+import argparse
+import csv
+import io
+import random
+import time
+import tracemalloc
+
+import mycity.utilities.dataset_fetch as dataset_fetch
+from mycity.mycity_request_data_model import MyCityRequestDataModel
+from mycity.utilities.finder.FinderCSV import FinderCSV
+
+COLUMNS = ['X', 'Y', 'OBJECTID', 'Name', 'Address', 'Neighborhood',
+           'Zip_Code', 'Phone', 'Hours', 'Comments', 'Owner', 'Status']
+OUTPUT_SPEECH = 'The closest is {Name} at {Address}.'
+
+# Around Boston
+BOUNDS = (-71.19, 42.23, -70.99, 42.40)
+
+
+def make_csv(rows, seed):
+    """
+    :return: bytes of a utf-8 csv file with a byte order mark
+    """
+    generator = random.Random(seed)
+    output = io.StringIO()
+    writer = csv.writer(output, lineterminator='\r\n')
+    writer.writerow(COLUMNS)
+    for row in range(rows):
+        writer.writerow([
+            round(generator.uniform(BOUNDS[0], BOUNDS[2]), 6),
+            round(generator.uniform(BOUNDS[1], BOUNDS[3]), 6),
+            row,
+            'Site {}'.format(row),
+            '{} Main St'.format(generator.randint(1, 999)),
+            generator.choice(['Dorchester', 'Roxbury', 'Allston',
+                              'Brighton', 'Charlestown']),
+            '02{:03d}'.format(generator.randint(101, 137)),
+            '617-635-{:04d}'.format(generator.randint(0, 9999)),
+            'Monday through Friday, 8 a.m. to 4 p.m.',
+            'Entrance on the side street, café open in the summer',
+            'City of Boston',
+            generator.choice(['Open', 'Closed']),
+        ])
+    return ('\ufeff' + output.getvalue()).encode('utf-8')
+
+
+def _is_open(record):
+    return record['Status'] == 'Open'
+
+
+def _chunks(body):
+    return (body[start:start + dataset_fetch.CHUNK_SIZE]
+            for start in range(0, len(body), dataset_fetch.CHUNK_SIZE))
+
+
+def read_whole(finder, body):
+    """
+    FinderCSV before streaming: the body decoded to one string, every
+    column of every row parsed
+    """
+    text = ''.join(dataset_fetch.iter_lines(_chunks(body),
+                                            dataset_fetch.DEFAULT_ENCODING))
+    return finder.to_record_store(
+        [record for record in csv.DictReader(text.splitlines())
+         if _is_open(record)])
+
+
+def read_streamed(finder, body):
+    return finder.parse_records(
+        dataset_fetch.iter_lines(_chunks(body),
+                                 dataset_fetch.DEFAULT_ENCODING))
+
+
+def measure(function, finder, body):
+    """
+    :return: tuple of (peak bytes allocated, seconds, record count)
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    store = function(finder, body)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak, elapsed, len(store)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--rows', type=int, nargs='+',
+                        default=[1000, 10000, 50000],
+                        help='numbers of rows of the files read')
+    parser.add_argument('--seed', type=int, default=311)
+    args = parser.parse_args(argv)
+
+    finder = FinderCSV(MyCityRequestDataModel(), None, 'Address',
+                       OUTPUT_SPEECH, None,
+                       filter=_is_open,
+                       origin_coordinates={'x': -71.06, 'y': 42.36})
+
+    print('* {:>7} {:>9} {:>11} {:>11} {:>9} {:>9}'.format(
+        'rows', 'file KiB', 'whole KiB', 'stream KiB', 'whole ms',
+        'stream ms'))
+    for rows in args.rows:
+        body = make_csv(rows, args.seed)
+        whole_peak, whole_time, whole_count = measure(read_whole, finder,
+                                                      body)
+        stream_peak, stream_time, stream_count = measure(read_streamed,
+                                                         finder, body)
+        if whole_count != stream_count:
+            raise AssertionError('Different records for {} rows'.format(
+                rows))
+        print('* {:>7} {:>9.0f} {:>11.0f} {:>11.0f} {:>9.1f} {:>9.1f}'.format(
+            rows, len(body) / 1024, whole_peak / 1024, stream_peak / 1024,
+            whole_time * 1e3, stream_time * 1e3))
+
+
+if __name__ == '__main__':
+    main()
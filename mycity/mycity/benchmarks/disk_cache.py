@@ -0,0 +1,161 @@
+"""
+Read/write latency and hit rate of the on-disk cache tier.
+
+Uses the datasets saved in test/test_data: the snow emergency parking and
+open space CSV files as FinderCSV downloads them, and the parking lot and
+open space features as FeatureServer queries return them.
+
+Latency: each dataset is written to and read back from a DiskCache in a
+temporary directory, and the median times and file sizes are reported.
+
+Hit rate: a run of warm invocations each fetches every dataset through a
+cached function. Every --recycle-every invocations the Python module state
+is rebuilt (the in-memory caches are emptied, as after a handler reload)
+while /tmp is kept. Memory-only caches are compared with persistent ones.
+
+Run from the project root:
+
+    python -m mycity.benchmarks.disk_cache --invocations 50 --recycle-every 5
+"""
+
+import argparse
+import ast
+import os
+import statistics
+import tempfile
+import time
+
+import mycity.utilities.cache as cache
+import mycity.utilities.disk_cache as disk_cache
+
+TEST_DATA_DIRECTORY = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'test', 'test_data')
+
+
+def _read_csv_fixture(file_name):
+    with open(os.path.join(TEST_DATA_DIRECTORY, file_name)) as csv_file:
+        return csv_file.read()
+
+
+def _read_features_fixture(file_name):
+    """
+    Reads a fixture holding one feature's attribute list per line
+
+    :param file_name: name of the file in test_data
+    :return: list of attribute lists
+    """
+    features = []
+    with open(os.path.join(TEST_DATA_DIRECTORY, file_name)) as data_file:
+        for line in data_file:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                features.append(ast.literal_eval(line))
+    return features
+
+
+def load_datasets():
+    """
+    :return: dictionary of dataset name to its contents
+    """
+    return {
+        'Snow_Emergency_Parking.csv':
+            _read_csv_fixture('Snow_Emergency_Parking.csv'),
+        'Open_Space.csv': _read_csv_fixture('Open_Space.csv'),
+        'parking_lots': _read_features_fixture('parking_lots'),
+        'open_spaces_data': _read_features_fixture('open_spaces_data'),
+    }
+
+
+def measure_latency(disk, name, value, repeats):
+    """
+    :param disk: DiskCache object
+    :param name: dataset name, used as the cache key
+    :param value: dataset contents
+    :param repeats: number of writes and reads to time
+    :return: tuple of (median write ms, median read ms, file size in bytes)
+    """
+    write_times = []
+    read_times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        disk.save('benchmark', (name,), value, ttl=3600)
+        write_times.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        loaded = disk.load('benchmark', (name,))
+        read_times.append(time.perf_counter() - start)
+        assert loaded is not None and loaded[0] == value
+    size = os.path.getsize(disk._path('benchmark', (name,), 1))
+    return (statistics.median(write_times) * 1000,
+            statistics.median(read_times) * 1000, size)
+
+
+def measure_hit_rate(datasets, invocations, recycle_every, persistent):
+    """
+    Fetches every dataset once per invocation through a cached function
+
+    :param datasets: dictionary of dataset name to contents
+    :param invocations: number of invocations to simulate
+    :param recycle_every: invocations between module state rebuilds
+    :param persistent: whether the cache keeps an on-disk tier
+    :return: tuple of (lookups, upstream fetches)
+    """
+    fetches = []
+
+    @cache.cached('benchmark_persistent' if persistent else 'benchmark',
+                  ttl=3600, persistent=persistent)
+    def fetch(name):
+        fetches.append(name)
+        return datasets[name]
+
+    fetch.cache.clear()
+    lookups = 0
+    for invocation in range(invocations):
+        if invocation and invocation % recycle_every == 0:
+            fetch.cache.clear()
+        for name in datasets:
+            fetch(name)
+            lookups += 1
+    return lookups, len(fetches)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--repeats', type=int, default=20,
+                        help='writes and reads timed per dataset')
+    parser.add_argument('--invocations', type=int, default=50,
+                        help='warm invocations to simulate')
+    parser.add_argument('--recycle-every', type=int, default=5,
+                        help='invocations between module state rebuilds')
+    args = parser.parse_args(argv)
+
+    datasets = load_datasets()
+    with tempfile.TemporaryDirectory() as directory:
+        disk = disk_cache.DiskCache(directory)
+        disk_cache.set_disk_cache(disk)
+        try:
+            print('* {:28} {:>9} {:>9} {:>9} {:>9}'.format(
+                'dataset', 'raw KB', 'file KB', 'write ms', 'read ms'))
+            for name, value in datasets.items():
+                write_ms, read_ms, size = measure_latency(disk, name, value,
+                                                          args.repeats)
+                print('* {:28} {:>9.1f} {:>9.1f} {:>9.2f} {:>9.2f}'.format(
+                    name, len(repr(value)) / 1024, size / 1024,
+                    write_ms, read_ms))
+
+            print('* hit rate over {} invocations, module state rebuilt '
+                  'every {}'.format(args.invocations, args.recycle_every))
+            for persistent in (False, True):
+                lookups, fetched = measure_hit_rate(
+                    datasets, args.invocations, args.recycle_every,
+                    persistent)
+                print('* {:28} {:>5} lookups {:>5} upstream fetches '
+                      '{:>6.1%} hit rate'.format(
+                          'memory and /tmp' if persistent else 'memory only',
+                          lookups, fetched, 1 - fetched / lookups))
+        finally:
+            disk_cache.set_disk_cache(None)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,286 @@
+"""
+Asking a FeatureServer for every feature against narrowing the query.
+
+FinderGIS used to ask for every feature of a layer with every field and its
+geometry. It now asks only for the features within search_radius_meters of
+the origin and only for the fields the output speech needs (see
+FinderGIS.build_query). For random origins this reports, per query, the
+features and bytes returned, the pages fetched and the time taken, for both
+queries.
+
+Responses come from fixtures recorded once against the live layer:
+
+    python -m mycity.benchmarks.feature_query --record
+
+or, with --synthetic, from a stand-in FeatureServer answering from the
+snow emergency parking lots in test/test_data (repeated --scale times
+around Boston for a larger layer). Either way --latency adds that many
+milliseconds to every response, standing in for the network.
+
+Run from the project root, with SLACK_WEBHOOKS_URL set as for the tests.
+"""
+
+import argparse
+import contextlib
+import csv
+import json
+import os
+import random
+import statistics
+import time
+from urllib.parse import urlparse
+
+import requests
+
+import mycity.utilities.arcgis_utils as arcgis_utils
+import mycity.utilities.gis_utils as gis_utils
+import mycity.utilities.http_replay as http_replay
+import mycity.utilities.http_utils as http_utils
+from mycity.mycity_request_data_model import MyCityRequestDataModel
+from mycity.utilities.finder.FinderGIS import FinderGIS
+
+TEST_DATA_DIRECTORY = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'test', 'test_data')
+DEFAULT_FIXTURES_DIRECTORY = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'feature_query')
+
+DEFAULT_URL = 'https://services.arcgis.com/sFnw0xNflSi8J0uh/ArcGIS/rest/' \
+              'services/SnowParking/FeatureServer/0'
+OUTPUT_SPEECH = 'The closest snow emergency parking lot, {Name}, is at ' \
+                '{Address}. It is {' + \
+                arcgis_utils.DRIVING_DISTANCE_TEXT_KEY + '} away.'
+
+# Around Boston
+BOUNDS = (-71.19, 42.23, -70.99, 42.40)
+# Features per page, as the layer's maxRecordCount
+PAGE_SIZE = 1000
+
+
+class SyntheticFeatureServer(object):
+    """
+    http_utils transport answering FeatureServer queries from a list of
+    features, honouring the parts of a query FinderGIS uses: a point and
+    distance, outFields, returnGeometry and paging. Other requests get a
+    503 response.
+    """
+
+    def __init__(self, features, latency=0.0, page_size=PAGE_SIZE):
+        """
+        :param features: list of features with 'attributes' and 'geometry'
+        :param latency: seconds each response is delayed by
+        :param page_size: most features in one response
+        """
+        self.features = features
+        self.latency = latency
+        self.page_size = page_size
+
+    def _select(self, params):
+        selected = self.features
+        if 'geometry' in params:
+            x, y = (float(value) for value in params['geometry'].split(','))
+            radius = float(params['distance'])
+            selected = [feature for feature in selected
+                        if gis_utils.geodesic_distance(
+                            x, y, feature['geometry']['x'],
+                            feature['geometry']['y']) <= radius]
+        return selected
+
+    def _shape(self, feature, params):
+        fields = params.get('outFields', '*')
+        attributes = feature['attributes']
+        if fields != '*':
+            attributes = {field: attributes.get(field)
+                          for field in fields.split(',')}
+        shaped = {'attributes': attributes}
+        if params.get('returnGeometry', 'true') == 'true':
+            shaped['geometry'] = feature['geometry']
+        return shaped
+
+    def __call__(self, session, method, url, **kwargs):
+        response = requests.Response()
+        response.url = url
+        response._content_consumed = True
+        if not urlparse(url).path.endswith('/query'):
+            response.status_code = 503
+            response._content = b''
+            return response
+        params = {key: str(value) for key, value in
+                  (kwargs.get('params') or {}).items()}
+        selected = self._select(params)
+        offset = int(params.get('resultOffset', 0))
+        page = selected[offset:offset + self.page_size]
+        body = {
+            'objectIdFieldName': 'OBJECTID',
+            'geometryType': 'esriGeometryPoint',
+            'spatialReference': {'wkid': 4326, 'latestWkid': 4326},
+            'features': [self._shape(feature, params) for feature in page],
+        }
+        if offset + self.page_size < len(selected):
+            body['exceededTransferLimit'] = True
+        if self.latency:
+            time.sleep(self.latency)
+        response.status_code = 200
+        response.headers['Content-Type'] = 'application/json'
+        response._content = json.dumps(body).encode('utf-8')
+        return response
+
+
+class MeasuringTransport(object):
+    """
+    http_utils transport that passes requests on and counts the responses
+    and their bytes
+    """
+
+    def __init__(self, transport):
+        self.transport = transport
+        self.pages = 0
+        self.bytes = 0
+
+    def __call__(self, session, method, url, **kwargs):
+        if self.transport is not None:
+            response = self.transport(session, method, url, **kwargs)
+        else:
+            response = session.request(method, url, **kwargs)
+        if urlparse(url).path.endswith('/query'):
+            self.pages += 1
+            self.bytes += len(response.content)
+        return response
+
+
+@contextlib.contextmanager
+def measured(transport):
+    """
+    Sends every request made inside the block through transport, counting
+    the query responses
+
+    :param transport: http_utils transport, or None for the network
+    :return: context manager yielding the MeasuringTransport
+    """
+    measuring = MeasuringTransport(transport)
+    previous = http_utils.set_transport(measuring)
+    try:
+        yield measuring
+    finally:
+        http_utils.set_transport(previous)
+
+
+def synthetic_features(scale, seed):
+    """
+    :return: list of features built from the test_data snow emergency
+        parking lots, the first copy where the lots are and the others
+        moved to random places around Boston
+    """
+    with open(os.path.join(TEST_DATA_DIRECTORY,
+                           'Snow_Emergency_Parking.csv'),
+              encoding='utf-8-sig') as csv_file:
+        records = [record for record in csv.DictReader(csv_file)
+                   if record['X'].strip() and record['Y'].strip()]
+    generator = random.Random(seed)
+    features = []
+    for copy in range(scale):
+        for record in records:
+            attributes = {field: value for field, value in record.items()
+                          if field not in ('X', 'Y')}
+            x, y = float(record['X']), float(record['Y'])
+            if copy:
+                x = generator.uniform(BOUNDS[0], BOUNDS[2])
+                y = generator.uniform(BOUNDS[1], BOUNDS[3])
+            features.append({'attributes': attributes,
+                             'geometry': {'x': x, 'y': y}})
+    return features
+
+
+def run_query(finder, radius_meters, measuring):
+    """
+    :return: tuple of (features, bytes, pages, seconds) of one query
+    """
+    pages, size = measuring.pages, measuring.bytes
+    start = time.perf_counter()
+    count = sum(1 for _ in finder.iter_features(radius_meters))
+    elapsed = time.perf_counter() - start
+    return count, measuring.bytes - size, measuring.pages - pages, elapsed
+
+
+def run_everything(finder, measuring):
+    """
+    :return: as run_query, for the query FinderGIS sent before: every
+        feature, every field and the geometry
+    """
+    pages, size = measuring.pages, measuring.bytes
+    start = time.perf_counter()
+    count = sum(1 for _ in gis_utils.iter_features_from_feature_server(
+        finder.resource_url, {'where': FinderGIS.DEFAULT_QUERY,
+                              'out_sr': '4326'}))
+    elapsed = time.perf_counter() - start
+    return count, measuring.bytes - size, measuring.pages - pages, elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--origins', type=int, default=20,
+                        help='number of random origins')
+    parser.add_argument('--radius', type=float,
+                        default=FinderGIS.SEARCH_RADIUS_METERS,
+                        help='search radius in meters')
+    parser.add_argument('--url', default=DEFAULT_URL,
+                        help='FeatureServer layer queried')
+    parser.add_argument('--address-key', default='Address')
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='milliseconds added to every response')
+    parser.add_argument('--seed', type=int, default=311)
+    parser.add_argument('--fixtures', default=DEFAULT_FIXTURES_DIRECTORY,
+                        help='directory of recorded responses')
+    parser.add_argument('--record', action='store_true',
+                        help='query the live layer and save responses')
+    parser.add_argument('--synthetic', action='store_true',
+                        help='answer from the test_data parking lots')
+    parser.add_argument('--scale', type=int, default=1,
+                        help='copies of the lots in the synthetic layer')
+    args = parser.parse_args(argv)
+
+    generator = random.Random(args.seed)
+    origins = [{'x': generator.uniform(BOUNDS[0], BOUNDS[2]),
+                'y': generator.uniform(BOUNDS[1], BOUNDS[3])}
+               for _ in range(args.origins)]
+
+    if not (args.synthetic or args.record or
+            os.path.isdir(args.fixtures)):
+        print('* No fixtures in {}: record them with --record or use '
+              '--synthetic'.format(args.fixtures))
+        return
+
+    if args.synthetic:
+        source = contextlib.nullcontext(SyntheticFeatureServer(
+            synthetic_features(args.scale, args.seed), args.latency / 1000))
+    elif args.record:
+        source = http_replay.recording(args.fixtures)
+    else:
+        source = http_replay.replaying(args.fixtures, strict=False,
+                                       latency=args.latency / 1000)
+
+    results = {'every feature': [], 'narrowed': []}
+    with source as transport, measured(transport) as measuring:
+        for origin in origins:
+            finder = FinderGIS(MyCityRequestDataModel(), args.url,
+                               args.address_key, OUTPUT_SPEECH, None,
+                               origin_coordinates=origin)
+            results['every feature'].append(run_everything(finder,
+                                                           measuring))
+            results['narrowed'].append(run_query(finder, args.radius,
+                                                 measuring))
+
+    print('* {} origins, radius {:.0f} m'.format(len(origins), args.radius))
+    print('* {:<14} {:>9} {:>10} {:>7} {:>9}'.format(
+        'query', 'features', 'KB', 'pages', 'ms'))
+    for name, runs in results.items():
+        print('* {:<14} {:>9.0f} {:>10.2f} {:>7.1f} {:>9.2f}'.format(
+            name,
+            statistics.median(run[0] for run in runs),
+            statistics.median(run[1] for run in runs) / 1024,
+            statistics.median(run[2] for run in runs),
+            statistics.median(run[3] for run in runs) * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,255 @@
+"""
+End-to-end latency of lambda_handler for every intent, from recorded fixtures.
+
+Drives lambda_handler over a corpus of Alexa events, one or more for every
+intent registered in mycity_controller, with upstream HTTP answered by
+utilities/http_replay. Reports p50/p95/p99 latency and the number of
+upstream calls per invocation.
+
+No fixtures are committed. They have to be recorded first against the live
+services, which needs network access and ArcGIS credentials:
+
+    python -m mycity.benchmarks.intent_latency --record
+
+Without them the benchmark stops. Once recorded they can be replayed as
+often as needed, with injected latency standing in for the network:
+
+    python -m mycity.benchmarks.intent_latency --repeats 20 --latency 80
+
+Requests that were not recorded are answered with a 503 response and
+counted as misses. Caches are emptied before every invocation, so each one
+pays for its upstream calls, unless --warm is given.
+
+Run from the project root, with SLACK_WEBHOOKS_URL set as for the tests.
+"""
+
+import argparse
+import contextlib
+import copy
+import io
+import logging
+import math
+import os
+import tempfile
+import time
+
+import mycity.intents.intent_constants as intent_constants
+import mycity.mycity_controller as mycity_controller
+import mycity.utilities.cache as cache
+import mycity.utilities.concurrency as concurrency
+import mycity.utilities.disk_cache as disk_cache
+import mycity.utilities.http_replay as http_replay
+from lambda_function import lambda_handler
+
+DEFAULT_FIXTURES_DIRECTORY = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+ADDRESS = '46 Everdean St'
+
+# The time Alexa waits for the skill, in milliseconds
+DEFAULT_BUDGET_MS = 8000
+
+# Ranked lots kept by a SnowParkingIntent turn, as Finder.get_ranked_results
+# packs them, for the turn asking for the next one
+SNOW_PARKING_RANKED_RESULTS = {
+    'intent': 'SnowParkingIntent',
+    'next': 1,
+    'fields': ['Address', 'Comments', 'Driving_distance', 'Driving_time',
+               'Fee', 'Name', 'Phone', 'Spaces'],
+    'rows': [['8-20 Belden St Boston, MA', ' ', '0.73 miles',
+              '3.65 minutes', ' There is no fee. ', 'Municipal Lot #016', '',
+              '32'],
+             ['115 Harvard Ave Boston, MA', ' ', '3.2 miles', '9.1 minutes',
+              ' There is no fee. ', 'Municipal Lot #003', '', '60']],
+}
+
+# (label, intent name, slots, session attributes)
+EVENT_CORPUS = [
+    ('GetAddressIntent', 'GetAddressIntent',
+     {'Address': {'name': 'Address', 'value': ADDRESS}}, {}),
+    ('TrashDayIntent', 'TrashDayIntent', {}, {}),
+    ('SnowParkingIntent', 'SnowParkingIntent', {}, {}),
+    ('AMAZON.NextIntent', 'AMAZON.NextIntent', {},
+     {intent_constants.RANKED_RESULTS_KEY: SNOW_PARKING_RANKED_RESULTS}),
+    ('CrimeIncidentsIntent', 'CrimeIncidentsIntent', {}, {}),
+    ('FoodTruckIntent', 'FoodTruckIntent', {}, {}),
+    ('GetAlertsIntent', 'GetAlertsIntent', {}, {}),
+    ('GetAlertsIntent trash', 'GetAlertsIntent',
+     {'ServiceName': {'name': 'ServiceName', 'value': 'trash'}}, {}),
+    ('VotingIntent', 'VotingIntent', {}, {}),
+    ('AMAZON.HelpIntent', 'AMAZON.HelpIntent', {}, {}),
+    ('AMAZON.StopIntent', 'AMAZON.StopIntent', {}, {}),
+    ('AMAZON.CancelIntent', 'AMAZON.CancelIntent', {}, {}),
+    ('AMAZON.NavigateHomeIntent', 'AMAZON.NavigateHomeIntent', {}, {}),
+    # without a value the intent asks for the feedback instead of posting
+    # it to Slack, which recording would otherwise do for real
+    ('FeedbackIntent', 'FeedbackIntent',
+     {'Feedback': {'name': 'Feedback'}}, {}),
+    ('AMAZON.FallbackIntent', 'AMAZON.FallbackIntent', {}, {}),
+    ('LatestThreeOneOne', 'LatestThreeOneOne',
+     {'number_requests': {'name': 'number_requests', 'value': '3'}}, {}),
+    ('InclementWeatherIntent', 'InclementWeatherIntent', {}, {}),
+    ('FarmersMarketIntent', 'FarmersMarketIntent', {}, {}),
+    ('CoronavirusUpdateIntent', 'CoronavirusUpdateIntent', {}, {}),
+]
+
+# Intents that need an address in the session
+ADDRESS_INTENTS = {'TrashDayIntent', 'SnowParkingIntent',
+                   'CrimeIncidentsIntent', 'FoodTruckIntent', 'VotingIntent'}
+
+
+class FakeLambdaContext(object):
+    """
+    Stands in for the LambdaContext, reporting the time left in a budget
+    """
+
+    def __init__(self, budget_ms):
+        self._expires_at = time.monotonic() + budget_ms / 1000.0
+
+    def get_remaining_time_in_millis(self):
+        return int((self._expires_at - time.monotonic()) * 1000)
+
+
+def build_event(intent_name, slots, session_attributes):
+    """
+    :param intent_name: name of the intent
+    :param slots: dictionary of slot name to slot
+    :param session_attributes: dictionary of session attributes
+    :return: Alexa IntentRequest event dictionary
+    """
+    attributes = dict(session_attributes)
+    if intent_name in ADDRESS_INTENTS:
+        attributes.setdefault(intent_constants.CURRENT_ADDRESS_KEY, ADDRESS)
+    return {
+        'version': '1.0',
+        'session': {
+            'new': False,
+            'sessionId': 'benchmark-session-id',
+            'application': {'applicationId': 'benchmark-application-id'},
+            'attributes': attributes,
+            'user': {'userId': 'benchmark-user-id'}
+        },
+        'context': {
+            'System': {
+                'application': {'applicationId': 'benchmark-application-id'},
+                'device': {'deviceId': 'benchmark-device-id',
+                           'supportedInterfaces': {}},
+                'apiEndpoint': 'https://api.amazonalexa.com',
+                'apiAccessToken': 'benchmark-access-token'
+            }
+        },
+        'request': {
+            'type': 'IntentRequest',
+            'requestId': 'benchmark-request-id',
+            'locale': 'en-US',
+            'intent': {'name': intent_name, 'slots': copy.deepcopy(slots)}
+        }
+    }
+
+
+def percentile(sorted_values, percent):
+    """
+    :param sorted_values: non-empty list of numbers in ascending order
+    :param percent: percentile to return, between 0 and 100
+    :return: value at that percentile (nearest rank)
+    """
+    rank = max(int(math.ceil(percent / 100.0 * len(sorted_values))), 1)
+    return sorted_values[rank - 1]
+
+
+def run_event(event, transport, budget_ms, warm):
+    """
+    Runs lambda_handler once
+
+    :param event: Alexa event dictionary
+    :param transport: RecordingTransport or ReplayTransport in use
+    :param budget_ms: milliseconds the invocation may take
+    :param warm: keep the caches filled by earlier invocations
+    :return: tuple of (seconds, upstream calls, misses, failed)
+    """
+    if not warm:
+        cache.clear_all_caches()
+    calls_before = transport.calls
+    misses_before = getattr(transport, 'misses', 0)
+    failed = False
+    start = time.perf_counter()
+    try:
+        # some intents print progress, keep it out of the report
+        with contextlib.redirect_stdout(io.StringIO()):
+            lambda_handler(copy.deepcopy(event),
+                           FakeLambdaContext(budget_ms))
+    except Exception:
+        failed = True
+    elapsed = time.perf_counter() - start
+    # let calls the intent started but did not wait for finish, so they
+    # are counted against this invocation
+    concurrency.shutdown()
+    misses = getattr(transport, 'misses', 0) - misses_before
+    return elapsed, transport.calls - calls_before + misses, misses, failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--fixtures', default=DEFAULT_FIXTURES_DIRECTORY,
+                        help='directory of recorded responses')
+    parser.add_argument('--record', action='store_true',
+                        help='call the live services and save responses')
+    parser.add_argument('--repeats', type=int, default=10,
+                        help='invocations per event when replaying')
+    parser.add_argument('--latency', type=float, default=0,
+                        help='milliseconds added to every replayed response')
+    parser.add_argument('--jitter', type=float, default=0,
+                        help='up to this many more milliseconds at random')
+    parser.add_argument('--budget', type=int, default=DEFAULT_BUDGET_MS,
+                        help='milliseconds each invocation may take')
+    parser.add_argument('--warm', action='store_true',
+                        help='keep caches between invocations')
+    args = parser.parse_args(argv)
+
+    if not (args.record or os.path.isdir(args.fixtures)):
+        print('* No fixtures in {}: record them with --record'.format(
+            args.fixtures))
+        return
+
+    missing = set(mycity_controller.INTENT_HANDLERS) - \
+        set(intent_name for _, intent_name, _, _ in EVENT_CORPUS)
+    if missing:
+        print('* no events for: ' + ', '.join(sorted(missing)))
+
+    # lambda_handler logs every request at DEBUG, and failures are counted
+    logging.disable(logging.CRITICAL)
+    with tempfile.TemporaryDirectory() as directory:
+        disk_cache.set_disk_cache(disk_cache.DiskCache(directory))
+        if args.record:
+            context = http_replay.recording(args.fixtures)
+            repeats = 1
+        else:
+            context = http_replay.replaying(
+                args.fixtures, latency=args.latency / 1000.0,
+                jitter=args.jitter / 1000.0, strict=False)
+            repeats = args.repeats
+        try:
+            with context as transport:
+                print('* {:26} {:>5} {:>8} {:>8} {:>8} {:>6} {:>6} {:>6}'
+                      .format('event', 'runs', 'p50 ms', 'p95 ms', 'p99 ms',
+                              'calls', 'misses', 'errors'))
+                for label, intent_name, slots, attributes in EVENT_CORPUS:
+                    event = build_event(intent_name, slots, attributes)
+                    results = [run_event(event, transport, args.budget,
+                                         args.warm)
+                               for _ in range(repeats)]
+                    times = sorted(result[0] * 1000 for result in results)
+                    print('* {:26} {:>5} {:>8.1f} {:>8.1f} {:>8.1f} {:>6.1f} '
+                          '{:>6} {:>6}'.format(
+                              label, repeats, percentile(times, 50),
+                              percentile(times, 95), percentile(times, 99),
+                              sum(result[1] for result in results) / repeats,
+                              sum(result[2] for result in results),
+                              sum(result[3] for result in results)))
+        finally:
+            disk_cache.set_disk_cache(None)
+            logging.disable(logging.NOTSET)
+
+
+if __name__ == '__main__':
+    main()
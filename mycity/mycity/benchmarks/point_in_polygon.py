@@ -0,0 +1,116 @@
+"""
+Lookup time of the local Boston neighborhood check.
+
+Locates thousands of random points in and around Boston with the grid
+index in utilities/boundary_utils and compares it with testing every
+polygon. Uses the bundled neighborhood dataset when it is present, and
+otherwise a synthetic one of the same size (26 neighborhoods of 400
+vertices each tiling Boston's bounding box).
+
+Run from the project root:
+
+    python -m mycity.benchmarks.point_in_polygon --points 10000
+"""
+
+import argparse
+import math
+import random
+import time
+
+import mycity.utilities.boundary_utils as boundary_utils
+
+# Roughly the bounding box of the City of Boston
+BOSTON_BBOX = (-71.191, 42.227, -70.986, 42.397)
+
+
+def synthetic_index(neighborhoods=26, vertices=400, seed=617):
+    """
+    Builds irregular, non-overlapping polygons tiling BOSTON_BBOX
+
+    :param neighborhoods: number of polygons
+    :param vertices: vertices per polygon
+    :param seed: random seed
+    :return: BoundaryIndex object
+    """
+    generator = random.Random(seed)
+    columns = int(math.ceil(math.sqrt(neighborhoods)))
+    rows = int(math.ceil(neighborhoods / float(columns)))
+    min_x, min_y, max_x, max_y = BOSTON_BBOX
+    width = (max_x - min_x) / columns
+    height = (max_y - min_y) / rows
+    areas = []
+    for number in range(neighborhoods):
+        center_x = min_x + (number % columns + 0.5) * width
+        center_y = min_y + (number // columns + 0.5) * height
+        ring = []
+        for vertex in range(vertices):
+            angle = 2 * math.pi * vertex / vertices
+            scale = generator.uniform(0.35, 0.5)
+            ring.append([center_x + math.cos(angle) * width * scale,
+                         center_y + math.sin(angle) * height * scale])
+        ring.append(ring[0])
+        areas.append(('Neighborhood {}'.format(number),
+                      [boundary_utils.Polygon([ring])]))
+    return boundary_utils.BoundaryIndex(areas)
+
+
+def locate_by_testing_every_polygon(index, x, y):
+    for name, polygon in index.polygons:
+        if polygon.contains(x, y):
+            return name
+    return None
+
+
+def time_lookups(locate, points):
+    """
+    :param locate: function taking x and y
+    :param points: list of (x, y)
+    :return: tuple of (microseconds per point, list of results)
+    """
+    start = time.perf_counter()
+    results = [locate(x, y) for x, y in points]
+    elapsed = time.perf_counter() - start
+    return elapsed / len(points) * 1e6, results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--points', type=int, default=10000,
+                        help='random points to locate')
+    parser.add_argument('--seed', type=int, default=2020)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    index = boundary_utils.get_neighborhood_index()
+    dataset = 'bundled'
+    if index is None:
+        index = synthetic_index()
+        dataset = 'synthetic'
+    build_ms = (time.perf_counter() - start) * 1000
+    vertices = sum(len(ring) for _, polygon in index.polygons
+                   for ring in polygon.rings)
+
+    generator = random.Random(args.seed)
+    min_x, min_y, max_x, max_y = BOSTON_BBOX
+    margin = 0.05
+    points = [(generator.uniform(min_x - margin, max_x + margin),
+               generator.uniform(min_y - margin, max_y + margin))
+              for _ in range(args.points)]
+
+    grid_us, grid_results = time_lookups(index.locate, points)
+    every_us, every_results = time_lookups(
+        lambda x, y: locate_by_testing_every_polygon(index, x, y), points)
+
+    print('* {} dataset: {} areas, {} polygons, {} vertices, loaded and '
+          'indexed in {:.1f} ms'.format(dataset, len(index.names),
+                                        len(index.polygons), vertices,
+                                        build_ms))
+    print('* {} random points, {} inside an area'.format(
+        len(points), sum(result is not None for result in grid_results)))
+    print('*   grid index           {:8.1f} us per point'.format(grid_us))
+    print('*   every polygon        {:8.1f} us per point'.format(every_us))
+    print('*   results agree: {}'.format(grid_results == every_results))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,187 @@
+"""
+Finder records as a list of dictionaries against a column RecordStore.
+
+For the snow emergency parking and open space CSV files in test/test_data
+this reports the memory each record takes, measured with tracemalloc, held
+as the dictionaries csv.DictReader builds and held in a RecordStore, and
+the CPU time per request of the work Finder does with the records before
+routing: adding the city to the addresses, keeping the destinations
+nearest the origin and finding the winning record again. Before the store,
+that work copied and rewrote every record on each request.
+
+The open space records have no coordinates (Finder geocodes them, see
+utilities/batch_geocode), so they are given random ones around Boston.
+
+Run from the project root:
+
+    python -m mycity.benchmarks.record_store --origins 200
+"""
+
+import argparse
+import csv
+import heapq
+import os
+import random
+import statistics
+import time
+import tracemalloc
+
+import mycity.utilities.csv_utils as csv_utils
+import mycity.utilities.gis_utils as gis_utils
+from mycity.utilities.finder.Finder import Finder
+from mycity.utilities.finder.RecordStore import RecordStore
+
+TEST_DATA_DIRECTORY = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'test', 'test_data')
+
+# (file name, address field)
+DATASETS = [('Snow_Emergency_Parking.csv', 'Address'),
+            ('Open_Space.csv', 'ADDRESS')]
+
+# Around Boston, for the open space records and the origins
+BOUNDS = (-71.19, 42.23, -70.99, 42.40)
+
+SUFFIX = " " + Finder.CITY + ", " + Finder.STATE
+
+
+def load_records(file_name, seed):
+    """
+    :return: list of record dictionaries, every one with X and Y
+    """
+    with open(os.path.join(TEST_DATA_DIRECTORY, file_name),
+              encoding='utf-8-sig') as csv_file:
+        records = list(csv.DictReader(csv_file))
+    generator = random.Random(seed)
+    for record in records:
+        if not record.get('X', '').strip():
+            record['X'] = str(round(generator.uniform(BOUNDS[0], BOUNDS[2]),
+                                    6))
+            record['Y'] = str(round(generator.uniform(BOUNDS[1], BOUNDS[3]),
+                                    6))
+    return records
+
+
+def _csv_text(records):
+    lines = [','.join(records[0])]
+    for record in records:
+        lines.append(','.join('"' + value.replace('"', '""') + '"'
+                              for value in record.values()))
+    return '\n'.join(lines)
+
+
+def measure_memory(records, address_key):
+    """
+    :return: tuple of (bytes per record as dictionaries, bytes per record
+        in a RecordStore), each parsed from the same csv text so that
+        neither shares strings with the other
+    """
+    text = _csv_text(records)
+    results = []
+    for build in (lambda rows: list(rows),
+                  lambda rows: RecordStore(rows, address_key, SUFFIX)):
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        kept = build(csv.DictReader(text.splitlines()))
+        after = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        results.append((after - before) / len(records))
+        del kept
+    return tuple(results)
+
+
+def nearest_points(origin, points, count):
+    """
+    How Finder picked the destinations to route to before the RecordStore
+
+    :return: list of up to count (x, y) tuples of points, closest first by
+        great-circle distance
+    """
+    origin_x, origin_y = float(origin['x']), float(origin['y'])
+    distances = []
+    for point in points:
+        try:
+            x, y = float(point[0]), float(point[1])
+        except (TypeError, ValueError):
+            continue
+        distances.append((gis_utils.geodesic_distance(origin_x, origin_y,
+                                                      x, y),
+                          len(distances), point))
+    return [point for _, _, point in heapq.nsmallest(count, distances)]
+
+
+def request_with_dictionaries(records, address_key, origin, count):
+    """
+    The per-request work of Finder._start before the RecordStore
+    """
+    records = csv_utils.add_city_and_state_to_records(
+        [dict(record) for record in records], address_key,
+        Finder.CITY, Finder.STATE)
+    coordinate_dict = {(record['X'], record['Y']): record[address_key]
+                       for record in records}
+    nearest = nearest_points(origin, coordinate_dict, count)
+    destinations = {point: coordinate_dict[point] for point in nearest}
+    winner = next(iter(destinations.values()))
+    for record in records:
+        if record[address_key] == winner:
+            return dict(record)
+
+
+def request_with_store(store, origin, count):
+    """
+    The per-request work of Finder._start with the RecordStore
+    """
+    destinations = store.coordinate_dict(store.nearest_rows(origin, count))
+    winner = next(iter(destinations.values()))
+    return store.record(store.row_for_address(winner))
+
+
+def time_requests(function, origins):
+    times = []
+    for origin in origins:
+        start = time.perf_counter()
+        function(origin)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--origins', type=int, default=200,
+                        help='number of requests timed')
+    parser.add_argument('--destinations', type=int,
+                        default=Finder.MAX_DESTINATIONS,
+                        help='destinations kept per request')
+    parser.add_argument('--seed', type=int, default=311)
+    args = parser.parse_args(argv)
+
+    generator = random.Random(args.seed)
+    origins = [{'x': generator.uniform(BOUNDS[0], BOUNDS[2]),
+                'y': generator.uniform(BOUNDS[1], BOUNDS[3])}
+               for _ in range(args.origins)]
+
+    print('* {:<28} {:>7} {:>10} {:>10} {:>10} {:>10}'.format(
+        'dataset', 'records', 'dict B', 'store B', 'dict us', 'store us'))
+    for file_name, address_key in DATASETS:
+        records = load_records(file_name, args.seed)
+        dict_bytes, store_bytes = measure_memory(records, address_key)
+        store = RecordStore(records, address_key, SUFFIX)
+        for origin in origins:
+            expected = request_with_dictionaries(records, address_key,
+                                                 origin, args.destinations)
+            if request_with_store(store, origin, args.destinations) != \
+                    expected:
+                raise AssertionError('Different winner for ' + str(origin))
+        dict_time = time_requests(
+            lambda origin: request_with_dictionaries(
+                records, address_key, origin, args.destinations), origins)
+        store_time = time_requests(
+            lambda origin: request_with_store(store, origin,
+                                              args.destinations), origins)
+        print('* {:<28} {:>7} {:>10.0f} {:>10.0f} {:>10.1f} {:>10.1f}'.format(
+            file_name, len(records), dict_bytes, store_bytes,
+            dict_time * 1e6, store_time * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+"""
+Registry that maps intent names to the functions that handle them.
+
+Handlers are registered by import path ("package.module:function") so that
+an intent module, and everything it imports, is only loaded the first time
+its intent is requested. A cold container answering AMAZON.HelpIntent no
+longer pays for importing the geospatial and HTML parsing libraries used by
+other intents.
+"""
+
+import importlib
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class IntentStats(object):
+    """
+    Timing information recorded for one registered intent
+
+    @property: import_seconds ::= time spent importing the handler module,
+        None until the intent has been dispatched once
+    @property: calls ::= number of times the handler has been executed
+    @property: total_seconds ::= cumulative handler execution time
+    """
+
+    def __init__(self):
+        self.import_seconds = None
+        self.calls = 0
+        self.total_seconds = 0.0
+
+    def as_dict(self):
+        return {
+            'import_seconds': self.import_seconds,
+            'calls': self.calls,
+            'total_seconds': self.total_seconds
+        }
+
+
+class IntentRegistry(object):
+    """
+    Declarative mapping of intent names to handler import paths
+    """
+
+    def __init__(self, handlers=None):
+        """
+        :param handlers: optional dictionary of intent name to handler path
+        """
+        self._paths = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+        for intent_name, handler_path in (handlers or {}).items():
+            self.register(intent_name, handler_path)
+
+    def register(self, intent_name, handler_path):
+        """
+        Registers the handler for an intent
+
+        :param intent_name: name of the intent as sent by the platform
+        :param handler_path: "package.module:function" that takes a
+            MyCityRequestDataModel and returns a MyCityResponseDataModel
+        :return: None
+        :raises: ValueError if the handler path is malformed
+        """
+        module_name, _, function_name = handler_path.partition(':')
+        if not module_name or not function_name:
+            raise ValueError("Handler path must look like "
+                             "'package.module:function', got " +
+                             repr(handler_path))
+        self._paths[intent_name] = (module_name, function_name)
+        self._stats[intent_name] = IntentStats()
+
+    def __contains__(self, intent_name):
+        return intent_name in self._paths
+
+    def __iter__(self):
+        return iter(self._paths)
+
+    def get_handler(self, intent_name):
+        """
+        Returns the handler for an intent, importing its module if this is
+        the first time the intent has been seen
+
+        The function is looked up on the module every time so that tests
+        can patch handlers where they are defined.
+
+        :param intent_name: name of the intent
+        :return: handler function
+        :raises: ValueError if no handler is registered for the intent
+        """
+        if intent_name not in self._paths:
+            raise ValueError("Invalid intent")
+        module_name, function_name = self._paths[intent_name]
+        stats = self._stats[intent_name]
+        if stats.import_seconds is None:
+            with self._lock:
+                if stats.import_seconds is None:
+                    start = time.perf_counter()
+                    importlib.import_module(module_name)
+                    stats.import_seconds = time.perf_counter() - start
+                    logger.debug('Imported %s for %s in %.1f ms',
+                                 module_name, intent_name,
+                                 stats.import_seconds * 1000)
+        return getattr(importlib.import_module(module_name), function_name)
+
+    def dispatch(self, mycity_request):
+        """
+        Runs the handler registered for the request's intent
+
+        :param mycity_request: MyCityRequestDataModel object
+        :return: MyCityResponseDataModel object returned by the handler
+        :raises: ValueError if no handler is registered for the intent
+        """
+        intent_name = mycity_request.intent_name
+        handler = self.get_handler(intent_name)
+        stats = self._stats[intent_name]
+        start = time.perf_counter()
+        try:
+            return handler(mycity_request)
+        finally:
+            elapsed = time.perf_counter() - start
+            stats.calls += 1
+            stats.total_seconds += elapsed
+            logger.debug('%s handled in %.1f ms', intent_name, elapsed * 1000)
+
+    def get_stats(self):
+        """
+        Returns the recorded import and execution times for every intent
+
+        :return: dictionary of intent name to timing dictionary
+        """
+        return {intent_name: stats.as_dict()
+                for intent_name, stats in self._stats.items()}
@@ -5,7 +5,8 @@ Retrives updates from boston.gov on the coronavirus impact
 from mycity.mycity_request_data_model import MyCityRequestDataModel
 from mycity.mycity_response_data_model import MyCityResponseDataModel
 from mycity.intents.custom_errors import ParseError
-from urllib import request
+import mycity.utilities.cache as cache
+import mycity.utilities.http_utils as http_utils
 from mycity.utilities.parsing_utils import escape_characters
 from bs4 import BeautifulSoup
 
@@ -56,12 +57,14 @@ def _get_html_parser(url):
     :param url: URL to read and create the parser for
     :return: BeautifulSoup parser
     """
-    url = request.urlopen(url)
-    parser = BeautifulSoup(url, "html.parser")
-    url.close()
+    response = http_utils.get(url)
+    parser = BeautifulSoup(response.content, "html.parser")
+    response.close()
     return parser
 
 
+@cache.cached('coronavirus_detail', ttl=1800, stale_ttl=3600,
+              negative_ttl=60, negative_exceptions=(ParseError,))
 def _get_coronavirus_detail_text():
     """
     Get text from latest updates on the Boston.gov coronavirus detail page
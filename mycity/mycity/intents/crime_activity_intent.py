@@ -4,20 +4,18 @@ import logging
 import mycity.intents.intent_constants as intent_constants
 from mycity.intents.user_address_intent \
     import request_user_address_response
-from mycity.utilities.location_services_utils import is_location_in_city
 from mycity.intents.speech_constants.location_speech_constants import \
     NOT_IN_BOSTON_SPEECH
 from dateutil.parser import parse
 from mycity.utilities.location_services_utils \
     import request_geolocation_permission_response, \
     request_device_address_permission_response, \
-    get_address_from_user_device
+    get_address_from_user_device, resolve_location
 from mycity.utilities.address_utils \
     import get_address_coordinates_from_geolocation
 from mycity.mycity_response_data_model import MyCityResponseDataModel
 from mycity.utilities.crime_incidents_api_utils import \
     get_crime_incident_response
-import mycity.utilities.gis_utils as gis_utils
 
 # Constants
 CARD_TITLE_CRIME = "Crime Report"
@@ -62,26 +60,29 @@ def get_crime_incidents_intent(mycity_request):
             if not location_permissions:
                 return request_device_address_permission_response()
 
-    # Convert address to coordinates if we only have user address
     if intent_constants.CURRENT_ADDRESS_KEY \
             in mycity_request.session_attributes:
         current_address = mycity_request.session_attributes[
             intent_constants.CURRENT_ADDRESS_KEY]
-        coordinates = gis_utils.geocode_address(current_address)
+    elif not coordinates:
+        # If we don't have coordinates or an address by now, and we have
+        # all required permissions, ask the user for an address
+        return request_user_address_response(mycity_request)
 
-    # If we don't have coordinates by now, and we have all required
-    #  permissions, ask the user for an address
-    if not coordinates:
+    # Convert address to coordinates if we only have user address. Earlier
+    # turns of the session may have done so already.
+    location = resolve_location(mycity_request, current_address, coordinates)
+    if not location.coordinates:
         return request_user_address_response(mycity_request)
 
     mycity_response = MyCityResponseDataModel()
 
     # If our address/coordinates are not in Boston, send a response letting
     # the user know the intent only works in Boston.
-    if not is_location_in_city(current_address, coordinates):
+    if not location.in_city:
         mycity_response.output_speech = NOT_IN_BOSTON_SPEECH
     else:
-        response = get_crime_incident_response(coordinates)
+        response = get_crime_incident_response(location.coordinates)
         mycity_response.output_speech = \
             _build_text_from_response(response)
 
@@ -18,4 +18,9 @@ class MultipleAddressError(Exception):
 
 class ParseError(Exception):
     """Error when parsing info from a webpage fails"""
-    pass
\ No newline at end of file
+    pass
+
+
+class DeadlineExceededError(Exception):
+    """Error raised when the invocation has run out of time"""
+    pass
@@ -1,19 +1,14 @@
 """
 Farmers Market Intent
 """
-import mycity.utilities.gis_utils as gis_utils
 import mycity.utilities.datetime_utils as date
+import mycity.utilities.farmers_market_utils as farmers_market_utils
 import logging
 from mycity.mycity_response_data_model import MyCityResponseDataModel
 from .custom_errors import BadAPIResponse
 
 logger = logging.getLogger(__name__)
 
-BASE_URL = 'https://services.arcgis.com/sFnw0xNflSi8J0uh/arcgis/rest/' \
-           'services/Farmers_Markets_Fresh_Trucks_View/FeatureServer/0'
-QUERY = {'where': '1=1', 'out_sr': '4326'}
-DAY = date.get_day()
-
 
 def get_farmers_markets_today(mycity_request):
     """
@@ -24,23 +19,11 @@ def get_farmers_markets_today(mycity_request):
     """
     mycity_response = MyCityResponseDataModel()
 
-    # List all available farmers markets today
-    markets = gis_utils.get_features_from_feature_server(BASE_URL, QUERY)
-
     try:
-        # Loop through the list of available farmers markets at a certain day
-        markets_today = []
-        for m in markets:
-            if m not in markets_today and \
-                    m['attributes']['Day_of_Week'] == DAY:
-                markets_today.append(m)
-
-        response = 'Available farmers markets today are:\n'
-        for m in markets_today:
-            response += m['attributes']['Name'] + ' located at ' + \
-                        m['attributes']['Address'] + ' from ' + \
-                        m['attributes']['Hours'] + '. '
-        mycity_response.output_speech = response
+        # The day is taken per request, as a warm container outlives
+        # midnight. The table has each day's answer ready.
+        table = farmers_market_utils.get_farmers_market_table()
+        mycity_response.output_speech = table.get_speech(date.get_day())
 
     except BadAPIResponse:
         mycity_response.output_speech = \
@@ -5,7 +5,9 @@ import logging
 import mycity.intents.speech_constants.food_truck_intent as ft_speech_constants
 import mycity.intents.speech_constants.location_speech_constants as speech_const
 import mycity.utilities.address_utils as address_utils
+import mycity.utilities.concurrency as concurrency
 import mycity.utilities.datetime_utils as date
+import mycity.utilities.food_truck_utils as food_truck_utils
 import mycity.utilities.gis_utils as gis_utils
 import mycity.utilities.location_services_utils as location_services_utils
 
@@ -14,7 +16,6 @@ from mycity.intents.custom_errors import InvalidAddressError, BadAPIResponse
 from mycity.intents.user_address_intent import \
     clear_address_from_mycity_object, request_user_address_response
 from mycity.mycity_response_data_model import MyCityResponseDataModel
-from mycity.utilities.location_services_utils import is_location_in_city
 
 
 logger = logging.getLogger(__name__)
@@ -22,7 +23,6 @@ logger = logging.getLogger(__name__)
 MILE = 1600
 BASE_URL = 'https://services.arcgis.com/sFnw0xNflSi8J0uh/arcgis/rest/' \
                'services/food_truck_schedule/FeatureServer/0/'
-DAY = date.get_day()
 FOOD_TRUCK_LIMIT = 5  # limits the number of food trucks
 CARD_TITLE = "Food Trucks"
 QUERY = {
@@ -47,24 +47,41 @@ def add_response_text(food_trucks):
     return response
 
 
-def get_truck_locations(given_address):
+def get_truck_locations(given_address, schedule_lookup=None):
     """
     Get the location of the food trucks in Boston TODAY within 1 mile
-    of a given_address
+    of a given_address. The daily snapshot of the schedule is searched,
+    and the FeatureServer is only queried if the snapshot cannot be
+    fetched.
 
     :param given_address: a pair of coordinates
+    :param schedule_lookup: optional Future of an earlier call to
+        food_truck_utils.get_food_truck_schedule
     :return: a list of features with unique food truck locations
     """
+    # the day is taken per request, as a warm container outlives midnight
+    day = date.get_day()
+    try:
+        if schedule_lookup is not None:
+            schedule = schedule_lookup.result()
+        else:
+            schedule = food_truck_utils.get_food_truck_schedule()
+    except BadAPIResponse:
+        logger.debug('No food truck snapshot, querying the FeatureServer')
+    else:
+        return schedule.find_within(given_address, day,
+                                    food_truck_utils.METERS_PER_MILE)
+
     formatted_address = '{x_coordinate}, {y_coordinate}'.format(
         x_coordinate=given_address['x'],
         y_coordinate=given_address['y']
     )
-    QUERY["geometry"] = formatted_address
+    query = dict(QUERY, geometry=formatted_address)
 
-    trucks = gis_utils.get_features_from_feature_server(BASE_URL, QUERY)
+    trucks = gis_utils.get_features_from_feature_server(BASE_URL, query)
     truck_unique_locations = []
     for t in trucks:
-        if t['attributes']['Day'] == DAY:
+        if t['attributes']['Day'] == day:
             truck_unique_locations.append(t)
     return truck_unique_locations
 
@@ -109,16 +126,24 @@ def get_nearby_food_trucks(mycity_request):
 
         user_address = mycity_request.session_attributes[
             intent_constants.CURRENT_ADDRESS_KEY]
-        coordinates = gis_utils.geocode_address(user_address)
 
-    if not is_location_in_city(user_address, coordinates):
+    # A cold container fetches the schedule while the location is resolved
+    schedule_lookup = concurrency.submit(
+        food_truck_utils.get_food_truck_schedule)
+
+    # Earlier turns of the session may have resolved this location already
+    location = location_services_utils.resolve_location(
+        mycity_request, user_address, coordinates)
+
+    if not location.in_city:
         mycity_response.output_speech = speech_const.NOT_IN_BOSTON_SPEECH
         mycity_response.should_end_session = True
         mycity_response.card_title = CARD_TITLE
         return mycity_response
 
     # Get list of available trucks
-    truck_unique_locations = get_truck_locations(coordinates)
+    truck_unique_locations = get_truck_locations(location.coordinates,
+                                                 schedule_lookup)
 
     # Create custom response based on number of trucks returned
     try:
@@ -17,7 +17,8 @@ and street cleaning is running on a normal schedule."
 """
 
 from bs4 import BeautifulSoup
-from urllib import request
+import mycity.utilities.cache as cache
+import mycity.utilities.http_utils as http_utils
 from enum import Enum
 from mycity.mycity_request_data_model import MyCityRequestDataModel
 from mycity.mycity_response_data_model import MyCityResponseDataModel
@@ -285,6 +286,7 @@ def prune_normal_responses(service_alerts: typing.Dict) -> typing.Dict:
     return service_alerts
 
 
+@cache.cached('boston_gov_alerts', ttl=300, stale_ttl=900, copy_result=True)
 def get_alerts():
     """
     Checks Boston.gov for alerts, and if present scrapes them and returns
@@ -295,10 +297,10 @@ def get_alerts():
     logger.debug('')
 
     # get boston.gov as an httpResponse object
-    url = request.urlopen(BOSTON_GOV)
-    # feed the url object into beautiful soup
-    soup = BeautifulSoup(url, "html.parser")
-    url.close()
+    response = http_utils.get(BOSTON_GOV)
+    # feed the page into beautiful soup
+    soup = BeautifulSoup(response.content, "html.parser")
+    response.close()
 
     # parse, sanitize returned strings, place in dictionary
     services = [s.text.strip() for s in soup.find_all(class_=SERVICE_NAMES)]
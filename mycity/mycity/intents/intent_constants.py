@@ -4,3 +4,9 @@
 CURRENT_ADDRESS_KEY = "currentAddress"
 ZIP_CODE_KEY = "Zipcode"
 REPEAT_COUNT = "repeatCount"
+# Session attribute key holding the resolved current address or device
+# location
+RESOLVED_LOCATION_KEY = "resolvedLocation"
+# The key the ranked results of a search are kept under in session
+# attributes, so the next closest can be told without searching again
+RANKED_RESULTS_KEY = "rankedResults"
@@ -1,4 +1,6 @@
 import requests
+import mycity.utilities.cache as cache
+import mycity.utilities.http_utils as http_utils
 from mycity.mycity_response_data_model import MyCityResponseDataModel
 from mycity.intents.custom_errors import BadAPIResponse
 from mycity.intents.speech_constants.latest_311_constants import *
@@ -77,6 +79,8 @@ def get_311_requests_from_server(number_entries):
     return response_json["result"]["records"]
 
 
+@cache.cached('latest_311_reports', ttl=60, negative_ttl=30,
+              negative_exceptions=(BadAPIResponse,))
 def get_raw_311_reports_json(number_entries):
     """
     Returns the JSON object from the 311 API
@@ -90,7 +94,7 @@ def get_raw_311_reports_json(number_entries):
         "limit": number_entries
     }
 
-    response = requests.get(data_url, parameters)
+    response = http_utils.get(data_url, parameters)
     if response.status_code != requests.codes.ok:
         raise BadAPIResponse
 
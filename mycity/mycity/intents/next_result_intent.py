@@ -0,0 +1,71 @@
+"""
+Answers "next" after a search by reading out the next of its ranked
+results, kept in session attributes, without searching again
+"""
+
+import mycity.intents.intent_constants as intent_constants
+import mycity.intents.speech_constants.next_result_intent as speech_constants
+import mycity.intents.speech_constants.snow_parking_intent as \
+    snow_parking_constants
+from mycity.mycity_response_data_model import MyCityResponseDataModel
+from mycity.utilities.finder.Finder import Finder
+import logging
+
+CARD_TITLE = "Boston Info"
+
+# (speech format, prompt for the one after, card title) of each intent that
+# keeps ranked results
+RESULT_SPEECH = {
+    "SnowParkingIntent": (snow_parking_constants.NEXT_OUTPUT_SPEECH_FORMAT,
+                          snow_parking_constants.NEXT_PROMPT,
+                          snow_parking_constants.CARD_TITLE),
+}
+
+logger = logging.getLogger(__name__)
+
+
+def get_next_result(mycity_request):
+    """
+    Reads out the next ranked result of the last search
+
+    :param mycity_request: MyCityRequestDataModel object
+    :return: MyCityResponseDataModel object
+    """
+    logger.debug('MyCityRequestDataModel received:' +
+                 mycity_request.get_logger_string())
+
+    mycity_response = MyCityResponseDataModel()
+    mycity_response.session_attributes = mycity_request.session_attributes
+    mycity_response.card_title = CARD_TITLE
+    mycity_response.reprompt_text = speech_constants.REPROMPT_TEXT
+    mycity_response.should_end_session = False
+
+    ranked_results = mycity_request.session_attributes.get(
+        intent_constants.RANKED_RESULTS_KEY) or {}
+    speech = RESULT_SPEECH.get(ranked_results.get('intent'))
+    index = ranked_results.get('next', 0)
+    record = Finder.get_ranked_result(ranked_results, index) \
+        if speech else None
+    if record is None:
+        mycity_request.session_attributes.pop(
+            intent_constants.RANKED_RESULTS_KEY, None)
+        mycity_response.output_speech = speech_constants.NO_NEXT_RESULT_SPEECH
+        return mycity_response
+
+    speech_format, prompt, card_title = speech
+    mycity_response.card_title = card_title
+    try:
+        mycity_response.output_speech = speech_format.format(**record)
+    except KeyError:
+        mycity_response.output_speech = Finder.ERROR_MESSAGE
+    ranked_results['next'] = index + 1
+    if Finder.get_ranked_result(ranked_results, index + 1) is not None:
+        mycity_response.output_speech += prompt
+        mycity_response.reprompt_text = prompt
+    else:
+        mycity_request.session_attributes.pop(
+            intent_constants.RANKED_RESULTS_KEY)
+        mycity_response.output_speech += \
+            speech_constants.NO_MORE_RESULTS_SPEECH
+        mycity_response.should_end_session = True
+    return mycity_response
@@ -14,8 +14,11 @@ import logging
 
 PARKING_INFO_URL = "http://bostonopendata-boston.opendata.arcgis.com/" \
                    "datasets/53ebc23fcc654111b642f70e61c63852_0.csv"
-SNOW_PARKING_CARD_TITLE = "Snow Parking"
+SNOW_PARKING_CARD_TITLE = constants.CARD_TITLE
 ADDRESS_KEY = "Address"
+# Lots ranked by driving time in the one routing request, so asking for the
+# next closest needs no upstream calls
+RESULT_COUNT = 3
 
 logger = logging.getLogger(__name__)
 
@@ -48,6 +51,9 @@ def get_snow_emergency_parking_intent(mycity_request):
                  mycity_request.get_logger_string())
 
     mycity_response = MyCityResponseDataModel()
+    mycity_request.session_attributes.pop(
+        intent_constants.RANKED_RESULTS_KEY, None)
+    mycity_response.should_end_session = True
 
     coordinates = None
     if intent_constants.CURRENT_ADDRESS_KEY not in \
@@ -80,9 +86,12 @@ def get_snow_emergency_parking_intent(mycity_request):
         finder = FinderCSV(mycity_request, PARKING_INFO_URL, ADDRESS_KEY,
                            constants.OUTPUT_SPEECH_FORMAT, format_record_fields,
                            origin_coordinates=coordinates)
+        finder.result_count = RESULT_COUNT
     except InvalidAddressError:
         mycity_response.output_speech = constants.ERROR_INVALID_ADDRESS
     else:
+        # fetch the parking lots while checking the origin is in Boston
+        finder.prefetch_records()
         if finder.is_in_city():
             logger.debug("Address or coords deemed to be in Boston:\n%s\n%s",
                          finder.origin_address, finder.origin_coordinates)
@@ -94,18 +103,26 @@ def get_snow_emergency_parking_intent(mycity_request):
                   format(finder_location_string))
             finder.start()
             mycity_response.output_speech = finder.get_output_speech()
+            if len(finder.ranked_records) > 1:
+                ranked_results = finder.get_ranked_results()
+                ranked_results['intent'] = "SnowParkingIntent"
+                ranked_results['next'] = 1
+                mycity_request.session_attributes[
+                    intent_constants.RANKED_RESULTS_KEY] = ranked_results
+                mycity_response.output_speech += constants.NEXT_PROMPT
+                mycity_response.reprompt_text = constants.NEXT_PROMPT
+                mycity_response.should_end_session = False
         else:
             logger.debug("Address or coords deemed to be NOT in Boston: "
                          "<address: %s> <coords: %s>", finder.origin_address,
                          finder.origin_coordinates)
             mycity_response.output_speech = NOT_IN_BOSTON_SPEECH
 
-    # Setting reprompt_text to None signifies that we do not want to reprompt
-    # the user. If the user does not respond or says something that is not
-    # understood, the session will end.
-    mycity_response.reprompt_text = None
+    # Unless there is a next closest lot to offer, reprompt_text is left
+    # None, which signifies that we do not want to reprompt the user. If the
+    # user does not respond or says something that is not understood, the
+    # session will end.
     mycity_response.session_attributes = mycity_request.session_attributes
     mycity_response.card_title = SNOW_PARKING_CARD_TITLE
-    mycity_response.should_end_session = True
 
     return mycity_response
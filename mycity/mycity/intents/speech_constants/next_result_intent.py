@@ -0,0 +1,9 @@
+"""
+Speech constants for next_result_intent.py
+
+"""
+
+NO_NEXT_RESULT_SPEECH = "I don't have another place to tell you about. " \
+                        "What else can I help you with?"
+NO_MORE_RESULTS_SPEECH = " That was the last one I found."
+REPROMPT_TEXT = "So, what can I help you with today?"
@@ -10,6 +10,16 @@ OUTPUT_SPEECH_FORMAT = \
      "you {" + arcgis_utils.DRIVING_TIME_TEXT_KEY + "} to drive there. The lot has "
      "{Spaces} spaces when empty. {Fee} {Comments} {Phone}")
 
+# Read out when the user asks for the next closest lot
+NEXT_OUTPUT_SPEECH_FORMAT = \
+    ("The next closest snow emergency parking lot, {Name}, is at "
+     "{Address}. It is {" + arcgis_utils.DRIVING_DISTANCE_TEXT_KEY + "} away and should take "
+     "you {" + arcgis_utils.DRIVING_TIME_TEXT_KEY + "} to drive there. The lot has "
+     "{Spaces} spaces when empty. {Fee} {Comments} {Phone}")
+NEXT_PROMPT = " To hear about the next closest lot, say next."
+
+CARD_TITLE = "Snow Parking"
+
 # Formatted strings for the phone number and fee for the parking lot
 PHONE_PREPARED_STRING = "Call {} for information."
 FEE_PREPARED_STRING = " The fee is {}. "
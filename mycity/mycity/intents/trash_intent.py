@@ -6,7 +6,7 @@ from mycity.intents.speech_constants.location_speech_constants import \
 from mycity.utilities.location_services_utils import \
     request_device_address_permission_response, \
     get_address_from_user_device, \
-    is_address_in_city
+    resolve_location
 from mycity.intents import intent_constants
 from mycity.intents.custom_errors import \
     InvalidAddressError, BadAPIResponse, MultipleAddressError
@@ -21,6 +21,7 @@ import usaddress
 import re
 import requests
 import logging
+import mycity.utilities.http_utils as http_utils
 
 logger = logging.getLogger(__name__)
 
@@ -55,7 +56,9 @@ def get_trash_day_info(mycity_request):
         mycity_request.session_attributes[intent_constants.CURRENT_ADDRESS_KEY]
 
     # grab relevant information from session address
-    parsed_address, _ = usaddress.tag(current_address)
+    parsed_address = resolve_location(
+        mycity_request, current_address, geocode=False,
+        check_city=False).parsed_address
 
     if not address_utils.is_address_valid(parsed_address):
         repeatCount = mycity_request.session_attributes[intent_constants.REPEAT_COUNT]
@@ -73,7 +76,8 @@ def get_trash_day_info(mycity_request):
 
     # If we have more specific info then just the street
     # address, make sure we are in Boston
-    if not is_address_in_city(current_address):
+    if not resolve_location(mycity_request, current_address,
+                            geocode=False).in_city:
         mycity_response.output_speech = NOT_IN_BOSTON_SPEECH
         mycity_response.should_end_session = True
         mycity_response.card_title = CARD_TITLE
@@ -258,7 +262,7 @@ def get_address_api_info(address, neighborhood):
     full_address = address if neighborhood is None else ' '.join([address,
                                                                   neighborhood])
     url_params = {'q': full_address, 'locale': 'en-US'}
-    request_result = requests.get(base_url, url_params)
+    request_result = http_utils.get(base_url, url_params)
 
     if request_result.status_code != requests.codes.ok:
         logger.debug('Error getting ReCollect API info. Got response: {}'
@@ -289,7 +293,7 @@ def get_trash_day_data(api_parameters):
         api_parameters["formatted_address"] = api_parameters.pop("name")
 
     base_url = "https://recollect.net/api/places"
-    request_result = requests.get(base_url, api_parameters)
+    request_result = http_utils.get(base_url, api_parameters)
 
     if request_result.status_code != requests.codes.ok:
         logger.debug("Error getting trash info from ReCollect API info. " \
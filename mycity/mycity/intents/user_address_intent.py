@@ -4,7 +4,6 @@ Functions for setting and getting the current user address
 
 from . import intent_constants
 from mycity.mycity_response_data_model import MyCityResponseDataModel
-import requests
 import logging
 
 logger = logging.getLogger(__name__)
@@ -116,4 +115,7 @@ def clear_address_from_mycity_object(mycity_object):
         del(mycity_object.session_attributes[
             intent_constants.CURRENT_ADDRESS_KEY])
 
+    mycity_object.session_attributes.pop(
+        intent_constants.RESOLVED_LOCATION_KEY, None)
+
     return mycity_object
\ No newline at end of file
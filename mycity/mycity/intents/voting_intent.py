@@ -9,7 +9,7 @@ from mycity.intents.user_address_intent \
 from mycity.utilities.location_services_utils import \
     request_device_address_permission_response, \
     get_address_from_user_device, \
-    is_address_in_city
+    resolve_location
 from mycity.intents.user_address_intent import \
     clear_address_from_mycity_object
 from mycity.utilities.address_utils import is_address_valid
@@ -63,18 +63,42 @@ def get_voting_location(mycity_request: MyCityRequestDataModel) -> \
     current_address = \
         mycity_request.session_attributes[intent_constants.CURRENT_ADDRESS_KEY]
 
+    # grab relevant information from session address
+    parsed_address, _ = usaddress.tag(current_address)
+    address_valid = is_address_valid(parsed_address)
+
+    zipcode = None
+    if "Zipcode" in mycity_request.intent_variables and \
+        "value" in mycity_request.intent_variables["Zipcode"]:
+        zipcode = \
+                mycity_request.intent_variables["Zipcode"]["value"].zfill(5)
+
+    mycity_response.reprompt_text = None
+    mycity_response.should_end_session = True
+
+    try:
+        # One geocode finds both whether the address is in Boston and
+        # where it is
+        location = resolve_location(mycity_request, current_address,
+                                    zipcode=zipcode)
+    except BadAPIResponse:
+        mycity_response.output_speech = BAD_API_RESPONSE
+        return mycity_response
+    except MultipleAddressError:
+        mycity_response.output_speech = MULTIPLE_ADDRESS_ERROR
+        mycity_response.dialog_directive = "ElicitSlotZipCode"
+        mycity_response.should_end_session = False
+        return mycity_response
+
     # If we have more specific info then just the street
     # address, make sure we are in Boston
-    if not is_address_in_city(current_address):
+    if not location.in_city:
         mycity_response.output_speech = NOT_IN_BOSTON_SPEECH
         mycity_response.should_end_session = True
         mycity_response.card_title = CARD_TITLE
         return mycity_response
 
-    # grab relevant information from session address
-    parsed_address, _ = usaddress.tag(current_address)
-
-    if not is_address_valid(parsed_address):
+    if not address_valid:
         mycity_response.output_speech = ADDRESS_NOT_UNDERSTOOD
         mycity_response.dialog_directive = "ElicitSlotVotingIntent"
         mycity_response.reprompt_text = None
@@ -83,19 +107,8 @@ def get_voting_location(mycity_request: MyCityRequestDataModel) -> \
         mycity_response.should_end_session = True
         return clear_address_from_mycity_object(mycity_response)
 
-    zipcode = None
-    if "Zipcode" in mycity_request.intent_variables and \
-        "value" in mycity_request.intent_variables["Zipcode"]:
-        zipcode = \
-                mycity_request.intent_variables["Zipcode"]["value"].zfill(5)
-
-    mycity_response.reprompt_text = None
-    mycity_response.should_end_session = True
-
     try:
-        top_candidate = gis_utils.geocode_address(current_address, zipcode)
-        ward_precinct = vote_utils.get_ward_precinct_info(top_candidate)
-        poll_location = vote_utils.get_polling_location(ward_precinct)
+        poll_location = get_poll_location(location.coordinates)
         output_speech = LOCATION_SPEECH. \
             format(poll_location[LOCATION_NAME], poll_location[LOCATION_ADDRESS])
         mycity_response.output_speech = output_speech
@@ -103,11 +116,18 @@ def get_voting_location(mycity_request: MyCityRequestDataModel) -> \
         mycity_response.output_speech = NO_WARD_OR_PRECINCT
     except BadAPIResponse:
         mycity_response.output_speech = BAD_API_RESPONSE
-    except MultipleAddressError as error:
-        address_list = ', '.join(error.addresses)
-        mycity_response.output_speech = MULTIPLE_ADDRESS_ERROR
-        mycity_response.dialog_directive = "ElicitSlotZipCode"
-        mycity_response.should_end_session = False
-        
+
     return mycity_response
-        
+
+
+def get_poll_location(coordinates):
+    """
+    Finds the polling location for a place in Boston
+
+    :param coordinates: dictionary with 'x' (longitude) and 'y' (latitude)
+        keys
+    :return: dictionary of polling location information
+    :raises: BadAPIResponse, ParseError
+    """
+    ward_precinct = vote_utils.get_ward_precinct_info(coordinates)
+    return vote_utils.get_polling_location(ward_precinct)
@@ -5,22 +5,11 @@ This class handles all voice requests.
 """
 
 from mycity.mycity_response_data_model import MyCityResponseDataModel
-from mycity.intents.voting_intent import get_voting_location
 from mycity.intents.user_address_intent import set_address_in_session, \
-    get_address_from_session, request_user_address_response, \
     set_zipcode_in_session
-from mycity.intents.latest_311_intent import get_311_requests
-from mycity.intents.trash_intent import get_trash_day_info
-from mycity.intents.fallback_intent import fallback_intent
-from mycity.intents.get_alerts_intent import get_alerts_intent, \
-    get_inclement_weather_alert
-from mycity.intents.snow_parking_intent import get_snow_emergency_parking_intent
-from mycity.intents.feedback_intent import submit_feedback
-from mycity.intents.coronavirus_update_intent import get_coronovirus_update
-from mycity.intents.crime_activity_intent import get_crime_incidents_intent
-from mycity.intents.farmers_market_intent import get_farmers_markets_today
-from mycity.intents.food_truck_intent import get_nearby_food_trucks
-from mycity.intents import intent_constants
+from mycity.intent_registry import IntentRegistry
+from mycity.intents.custom_errors import DeadlineExceededError
+import mycity.utilities.deadline as deadline_utils
 import logging
 
 logger = logging.getLogger(__name__)
@@ -39,6 +28,40 @@ HELP_SPEECH = "You are using Boston Info, a skill that provides information " \
     "trucks and farmers markets, or info about snow emergencies. "\
     "If you have feedback for the skill, say, 'I have a suggestion.'"
 
+DEADLINE_EXCEEDED_SPEECH = "Sorry, that's taking longer than expected. " \
+    "Please try again in a moment."
+
+# Intent modules are imported the first time their intent is requested, so
+# each request only loads the libraries its own intent needs.
+INTENT_HANDLERS = IntentRegistry({
+    "GetAddressIntent":
+        "mycity.intents.user_address_intent:get_address_from_session",
+    "TrashDayIntent": "mycity.intents.trash_intent:get_trash_day_info",
+    "SnowParkingIntent":
+        "mycity.intents.snow_parking_intent:get_snow_emergency_parking_intent",
+    "CrimeIncidentsIntent":
+        "mycity.intents.crime_activity_intent:get_crime_incidents_intent",
+    "FoodTruckIntent": "mycity.intents.food_truck_intent:get_nearby_food_trucks",
+    "GetAlertsIntent": "mycity.intents.get_alerts_intent:get_alerts_intent",
+    "VotingIntent": "mycity.intents.voting_intent:get_voting_location",
+    "AMAZON.HelpIntent": "mycity.mycity_controller:get_help_response",
+    "AMAZON.StopIntent": "mycity.mycity_controller:handle_session_end_request",
+    "AMAZON.CancelIntent":
+        "mycity.mycity_controller:handle_session_end_request",
+    "AMAZON.NavigateHomeIntent":
+        "mycity.mycity_controller:handle_session_end_request",
+    "AMAZON.NextIntent": "mycity.intents.next_result_intent:get_next_result",
+    "FeedbackIntent": "mycity.intents.feedback_intent:submit_feedback",
+    "AMAZON.FallbackIntent": "mycity.intents.fallback_intent:fallback_intent",
+    "LatestThreeOneOne": "mycity.intents.latest_311_intent:get_311_requests",
+    "InclementWeatherIntent":
+        "mycity.intents.get_alerts_intent:get_inclement_weather_alert",
+    "FarmersMarketIntent":
+        "mycity.intents.farmers_market_intent:get_farmers_markets_today",
+    "CoronavirusUpdateIntent":
+        "mycity.intents.coronavirus_update_intent:get_coronovirus_update",
+})
+
 
 def execute_request(mycity_request):
     """
@@ -65,12 +88,18 @@ def execute_request(mycity_request):
     if mycity_request.is_new_session:
         mycity_request = on_session_started(mycity_request)
 
-    if mycity_request.request_type == "LaunchRequest":
-        return on_launch(mycity_request)
-    elif mycity_request.request_type == "IntentRequest":
-        return on_intent(mycity_request)
-    elif mycity_request.request_type == "SessionEndedRequest":
-        return on_session_ended(mycity_request)
+    # Upstream calls made while handling this request take their timeouts
+    # from the request's deadline
+    token = deadline_utils.set_current_deadline(mycity_request.deadline)
+    try:
+        if mycity_request.request_type == "LaunchRequest":
+            return on_launch(mycity_request)
+        elif mycity_request.request_type == "IntentRequest":
+            return on_intent(mycity_request)
+        elif mycity_request.request_type == "SessionEndedRequest":
+            return on_session_ended(mycity_request)
+    finally:
+        deadline_utils.reset_current_deadline(token)
 
 
 def on_session_started(mycity_request):
@@ -127,41 +156,11 @@ def on_intent(mycity_request):
         and "value" in mycity_request.intent_variables["Zipcode"]:
         set_zipcode_in_session(mycity_request)
 
-    # session_attributes = session.get("attributes", {})
-    if mycity_request.intent_name == "GetAddressIntent":
-        return get_address_from_session(mycity_request)
-    elif mycity_request.intent_name == "TrashDayIntent":
-        return get_trash_day_info(mycity_request)
-    elif mycity_request.intent_name == "SnowParkingIntent":
-        return get_snow_emergency_parking_intent(mycity_request)
-    elif mycity_request.intent_name == "CrimeIncidentsIntent":
-        return get_crime_incidents_intent(mycity_request)
-    elif mycity_request.intent_name == "FoodTruckIntent":
-        return get_nearby_food_trucks(mycity_request)
-    elif mycity_request.intent_name == "GetAlertsIntent":
-        return get_alerts_intent(mycity_request)
-    elif mycity_request.intent_name == "VotingIntent":
-        return  get_voting_location(mycity_request)
-    elif mycity_request.intent_name == "AMAZON.HelpIntent":
-        return get_help_response(mycity_request)
-    elif mycity_request.intent_name == "AMAZON.StopIntent" or \
-            mycity_request.intent_name == "AMAZON.CancelIntent" or \
-            mycity_request.intent_name == "AMAZON.NavigateHomeIntent":
-        return handle_session_end_request(mycity_request)
-    elif mycity_request.intent_name == "FeedbackIntent":
-        return submit_feedback(mycity_request)
-    elif mycity_request.intent_name == "AMAZON.FallbackIntent":
-        return fallback_intent(mycity_request)
-    elif mycity_request.intent_name == "LatestThreeOneOne":
-        return get_311_requests(mycity_request)
-    elif mycity_request.intent_name == "InclementWeatherIntent":
-        return get_inclement_weather_alert(mycity_request)
-    elif mycity_request.intent_name == "FarmersMarketIntent":
-        return get_farmers_markets_today(mycity_request)
-    elif mycity_request.intent_name == "CoronavirusUpdateIntent":
-        return get_coronovirus_update(mycity_request)
-    else:
-        raise ValueError("Invalid intent")
+    try:
+        return INTENT_HANDLERS.dispatch(mycity_request)
+    except DeadlineExceededError:
+        logger.debug('Ran out of time handling ' + mycity_request.intent_name)
+        return get_deadline_exceeded_response(mycity_request)
 
 
 def on_session_ended(mycity_request):
@@ -198,6 +197,23 @@ def get_help_response(mycity_request):
     return mycity_response
 
 
+def get_deadline_exceeded_response(mycity_request):
+    """
+    Asks the user to try again when an intent runs out of time waiting
+    on upstream services.
+
+    :param mycity_request: MyCityRequestDataModel object
+    :return: MyCityResponseDataModel object
+    """
+    mycity_response = MyCityResponseDataModel()
+    mycity_response.session_attributes = mycity_request.session_attributes
+    mycity_response.card_title = "Boston Info"
+    mycity_response.output_speech = DEADLINE_EXCEEDED_SPEECH
+    mycity_response.reprompt_text = None
+    mycity_response.should_end_session = True
+    return mycity_response
+
+
 def get_welcome_response(mycity_request):
     """
     Welcomes the user and sets initial session attributes. Is triggered on
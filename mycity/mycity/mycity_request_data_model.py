@@ -3,6 +3,72 @@ Data Model for structuring requests to the skill implementation
 """
 import json
 
+from mycity.intents.intent_constants import RESOLVED_LOCATION_KEY
+
+
+class ResolvedLocation:
+    """
+    What is known about the location a request is about: the address or
+    device coordinates it was given, and what geocoding found out about
+    them. Fields are None until they have been looked up.
+
+    @property: address ::= address string, or None for device coordinates
+    @property: parsed_address ::= dictionary of usaddress labels to parts
+    @property: coordinates ::= dictionary with 'x' (longitude) and 'y'
+        (latitude) keys
+    @property: in_city ::= True if the location is in Boston
+    @property: neighborhood ::= name of the Boston neighborhood it is in
+    """
+
+    # Session attribute keys, kept short as sessions are sent back and
+    # forth on every turn
+    _SESSION_FIELDS = {
+        'address': 'a',
+        'parsed_address': 'p',
+        'coordinates': 'c',
+        'in_city': 'i',
+        'neighborhood': 'n',
+    }
+
+    def __init__(self, address=None, coordinates=None):
+        self.address = address
+        self.parsed_address = None
+        self.coordinates = coordinates
+        self.in_city = None
+        self.neighborhood = None
+
+    def describes(self, address, coordinates):
+        """
+        :param address: address string, or None
+        :param coordinates: dictionary with 'x' and 'y' keys, or None
+        :return: True if this was resolved for the same address, or for the
+            same coordinates when there is no address
+        """
+        if address or self.address:
+            return address == self.address
+        return coordinates is not None and self.coordinates is not None and \
+            (coordinates['x'], coordinates['y']) == \
+            (self.coordinates['x'], self.coordinates['y'])
+
+    def to_session(self):
+        """
+        :return: dictionary of the known fields, for session attributes
+        """
+        return {key: getattr(self, field)
+                for field, key in self._SESSION_FIELDS.items()
+                if getattr(self, field) is not None}
+
+    @classmethod
+    def from_session(cls, value):
+        """
+        :param value: dictionary returned by to_session
+        :return: ResolvedLocation object
+        """
+        location = cls()
+        for field, key in cls._SESSION_FIELDS.items():
+            setattr(location, field, value.get(key))
+        return location
+
 
 class MyCityRequestDataModel:
     """
@@ -31,6 +97,8 @@ class MyCityRequestDataModel:
         self._has_geolocation = None
         self._geolocation_permission = None
         self._geolocation_coordinates = None
+        self._deadline = None
+        self._resolved_location = None
 
     def __str__(self):
         return """\
@@ -47,7 +115,8 @@ class MyCityRequestDataModel:
             api_access_token={},
             has_geolocation={},
             geolocation_permission={},
-            geolocation_coordinates={}
+            geolocation_coordinates={},
+            deadline={}
         >
         """.format(
             self._request_type,
@@ -62,7 +131,8 @@ class MyCityRequestDataModel:
             self._api_access_token,
             self._has_geolocation,
             self._geolocation_permission,
-            self._geolocation_coordinates
+            self._geolocation_coordinates,
+            self._deadline
         )
 
     def get_logger_string(self):
@@ -118,6 +188,7 @@ class MyCityRequestDataModel:
     @session_attributes.setter
     def session_attributes(self, value):
         self._session_attributes = value
+        self._resolved_location = None
 
     @property
     def application_id(self):
@@ -213,3 +284,36 @@ class MyCityRequestDataModel:
                             "on geolocation_coordinates")
 
         self._geolocation_coordinates = value
+
+    @property
+    def deadline(self):
+        """
+        Deadline object limiting how long this request may spend on
+        upstream calls, or None if there is no limit.
+        """
+        return self._deadline
+
+    @deadline.setter
+    def deadline(self, value):
+        self._deadline = value
+
+    @property
+    def resolved_location(self):
+        """
+        ResolvedLocation found earlier in this request or session, or None.
+        Use location_services_utils.resolve_location to fill it in.
+        """
+        if self._resolved_location is None and \
+                RESOLVED_LOCATION_KEY in self._session_attributes:
+            self._resolved_location = ResolvedLocation.from_session(
+                self._session_attributes[RESOLVED_LOCATION_KEY])
+        return self._resolved_location
+
+    @resolved_location.setter
+    def resolved_location(self, value):
+        self._resolved_location = value
+        if value is None:
+            self._session_attributes.pop(RESOLVED_LOCATION_KEY, None)
+        else:
+            self._session_attributes[RESOLVED_LOCATION_KEY] = \
+                value.to_session()
@@ -1,7 +1,10 @@
+import tempfile
 import unittest
 import mycity.intents.intent_constants as intent_constants
 import mycity.mycity_controller as my_controller
 import mycity.mycity_request_data_model as req
+import mycity.utilities.cache as cache
+import mycity.utilities.disk_cache as disk_cache
 
 
 ###############################################################################
@@ -18,6 +21,12 @@ class IntentBaseCase(unittest.TestCase):
     returns_reprompt_text = False
 
     def setUp(self):
+        # persistent caches write to a directory of the test's own, so the
+        # real on-disk cache is neither read nor wiped
+        self.disk_cache_directory = tempfile.TemporaryDirectory()
+        disk_cache.set_disk_cache(
+            disk_cache.DiskCache(self.disk_cache_directory.name))
+        cache.clear_all_caches()
         self.controller = my_controller
         self.request = req.MyCityRequestDataModel()
         key = intent_constants.CURRENT_ADDRESS_KEY
@@ -25,6 +34,8 @@ class IntentBaseCase(unittest.TestCase):
         self.request.intent_name = self.intent_to_test
 
     def tearDown(self):
+        disk_cache.set_disk_cache(None)
+        self.disk_cache_directory.cleanup()
         self.controller = None
         self.request = None
 
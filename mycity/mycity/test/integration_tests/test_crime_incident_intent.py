@@ -37,7 +37,8 @@ class CrimeIncidentsTestCase(mix_ins.RepromptTextTestMixIn,
                 ('mycity.intents.crime_activity_intent.'
                  'get_crime_incident_response'),
                 return_value=test_constants.GET_CRIME_INCIDENTS_API_MOCK)
-        self.get_crime_incident_response.start()
+        self.mock_get_crime_incident_response = \
+            self.get_crime_incident_response.start()
         response = self.controller.on_intent(self.request)
         for record in MOCK_RESPONSE[RESULT][RECORDS]:
             self.assertIn(record[STREET], response.output_speech)
@@ -131,10 +132,12 @@ class CrimeIncidentsTestCase(mix_ins.RepromptTextTestMixIn,
             "latitudeInDegrees": 42.367013,
             "longitudeInDegrees": -71.105786,
         }
+        self.mock_get_crime_incident_response.reset_mock()
         response = crime_intent.get_crime_incidents_intent(self.request)
         self.assertEqual(self.expected_title, response.card_title)
         self.assertTrue(response.output_speech)
         self.assertEqual(response.output_speech, NOT_IN_BOSTON_SPEECH)
+        self.mock_get_crime_incident_response.assert_not_called()
 
 if __name__ == '__main__':
     unittest.main()
@@ -5,6 +5,9 @@ import mycity.test.integration_tests.intent_base_case as base_case
 import mycity.test.integration_tests.intent_test_mixins as mix_ins
 import mycity.intents.food_truck_intent as food_truck_intent
 import mycity.intents.intent_constants as intent_constants
+import mycity.intents.speech_constants.location_speech_constants as \
+    speech_const
+from mycity.mycity_request_data_model import ResolvedLocation
 
 
 import unittest
@@ -71,6 +74,22 @@ class FoodTruckTestCase(mix_ins.RepromptTextTestMixIn,
         self.assertNotEqual(response.card_type, "AskForPermissionsConsent")
         self.assertTrue(response.dialog_directive is None)
 
+    @mock.patch('mycity.intents.food_truck_intent.food_truck_utils.'
+                'get_food_truck_schedule')
+    @mock.patch('mycity.intents.food_truck_intent.get_truck_locations')
+    @mock.patch('mycity.intents.food_truck_intent.location_services_utils.'
+                'resolve_location')
+    def test_trucks_are_not_searched_outside_boston(self, mock_resolve,
+                                                    mock_truck_locations, _):
+        location = ResolvedLocation("1 Main St Springfield MA")
+        location.coordinates = {'x': -72.59, 'y': 42.10}
+        location.in_city = False
+        mock_resolve.return_value = location
+        response = self.controller.on_intent(self.request)
+        self.assertEqual(speech_const.NOT_IN_BOSTON_SPEECH,
+                         response.output_speech)
+        mock_truck_locations.assert_not_called()
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -36,7 +36,7 @@ class GetAlertsTestCase(mix_ins.RepromptTextTestMixIn,
         self.mock_get_alerts.start()
 
     def tearDown(self):
-        super().setUp()
+        super().tearDown()
         self.mock_get_alerts.stop()
         self.mock_get_alerts = None
 
@@ -5,6 +5,7 @@ import mycity.test.integration_tests.intent_base_case as base_case
 import mycity.test.test_constants as test_constants
 import mycity.intents.intent_constants as intent_constants
 import mycity.intents.snow_parking_intent as snow_parking
+import mycity.utilities.dataset_fetch as dataset_fetch
 from mycity.intents.speech_constants import location_speech_constants
 from mycity.mycity_request_data_model import MyCityRequestDataModel
 
@@ -32,20 +33,20 @@ class SnowEmergencyTestCase(mix_ins.RepromptTextTestMixIn,
         """
         super().setUp()
 
-        def fake_filter(record):
-            return record
-
         self.csv_file = open(test_constants.PARKING_LOTS_TEST_CSV,
                              encoding='utf-8-sig')
-        mock_filtered_record_return = list(filter(fake_filter,
-                                                  csv.DictReader(
-                                                      self.csv_file,
-                                                      delimiter=','
-                                                  )))
-        self.mock_filtered_record = mock.patch(
-            ('mycity.intents.snow_parking_intent.'
-             'FinderCSV.file_to_filtered_records'),
-            return_value=mock_filtered_record_return
+        csv_lines = self.csv_file.read().splitlines()
+        self.csv_file.seek(0)
+
+        def fake_fetch_dataset(url, encoding=None, parse=None, **kwargs):
+            # the fixture file stands in for the download, still read by
+            # the finder's own parse
+            return dataset_fetch.Dataset(parse(csv_lines), 'test', None,
+                                         None, 0)
+
+        self.mock_fetch_dataset = mock.patch(
+            'mycity.utilities.dataset_fetch.fetch_dataset',
+            side_effect=fake_fetch_dataset
         )
 
         mock_geocoded_address_candidates = \
@@ -74,21 +75,28 @@ class SnowEmergencyTestCase(mix_ins.RepromptTextTestMixIn,
                         'mycity.utilities.finder.Finder.arcgis_utils.find_closest_route',
                         return_value=mock_closest_destination
                     )
+        self.mock_closest_destinations = \
+                mock.patch(
+                        'mycity.utilities.finder.Finder.arcgis_utils.find_closest_routes',
+                        return_value=[mock_closest_destination]
+                    )
 
 
 
-        self.mock_filtered_record.start()
+        self.mock_fetch_dataset.start()
         self.mock_address_candidates.start()
         self.mock_api_access_token.start()
         self.mock_closest_destination.start()
+        self.mock_closest_destinations.start()
 
     def tearDown(self):
         super().tearDown()
         self.csv_file.close()
-        self.mock_filtered_record.stop()
+        self.mock_fetch_dataset.stop()
         self.mock_address_candidates.stop()
         self.mock_api_access_token.stop()
         self.mock_closest_destination.stop()
+        self.mock_closest_destinations.stop()
 
     def test_requests_geolocation_permissions_if_supported(self):
         self.request._session_attributes.pop(intent_constants.CURRENT_ADDRESS_KEY, None)
@@ -143,6 +151,38 @@ class SnowEmergencyTestCase(mix_ins.RepromptTextTestMixIn,
         # return to expected value
         self.mock_address_candidates.return_value = test_constants.GEOCODE_ADDRESS_CANDIDATES
 
+    def test_next_intent_reads_the_next_closest_lot(self):
+        self.csv_file.seek(0)
+        records = list(csv.DictReader(self.csv_file, delimiter=','))
+        second_closest = {'Address': '115 Harvard Ave Boston, MA',
+                          'Driving_time': '9.1 minutes',
+                          'Driving_distance': '3.2 miles'}
+        routes = [test_constants.ARCGIS_CLOSEST_DESTINATION, second_closest]
+        with mock.patch.object(snow_parking.FinderCSV, 'get_records',
+                               return_value=records), \
+                mock.patch.object(snow_parking.FinderCSV, 'is_in_city',
+                                  return_value=True), \
+                mock.patch('mycity.utilities.finder.Finder.arcgis_utils.'
+                           'find_closest_routes',
+                           return_value=routes) as mock_routes:
+            response = self.controller.on_intent(self.request)
+        mock_routes.assert_called_once()
+        self.assertIn('Municipal Lot #016', response.output_speech)
+        self.assertFalse(response.should_end_session)
+        self.assertIn(intent_constants.RANKED_RESULTS_KEY,
+                      response.session_attributes)
+
+        next_request = MyCityRequestDataModel()
+        next_request._session_attributes = response.session_attributes
+        next_request.intent_name = "AMAZON.NextIntent"
+        with mock.patch.object(snow_parking.FinderCSV,
+                               'get_records') as mock_get_records:
+            response = self.controller.on_intent(next_request)
+        mock_get_records.assert_not_called()
+        self.assertIn('Municipal Lot #003', response.output_speech)
+        self.assertIn('3.2 miles', response.output_speech)
+        self.assertTrue(response.should_end_session)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1191,3 +1191,42 @@ GET_FOOD_TRUCKS_MOCK = [
         }
     }
 ]
+
+# Landmarks in Boston and just across its boundary, with the city the
+# ArcGIS reverse geocoder names for each ("Boston" or a neighborhood
+# inside the city)
+REVERSE_GEOCODED_LOCATIONS = [
+    {'name': 'City Hall', 'x': -71.0579, 'y': 42.3602, 'city': 'Boston'},
+    {'name': 'Fields Corner', 'x': -71.0617, 'y': 42.3002,
+     'city': 'Dorchester'},
+    {'name': 'Nubian Square', 'x': -71.0838, 'y': 42.3294,
+     'city': 'Roxbury'},
+    {'name': 'Bunker Hill Monument', 'x': -71.0608, 'y': 42.3763,
+     'city': 'Charlestown'},
+    {'name': 'Maverick Square', 'x': -71.0397, 'y': 42.3691,
+     'city': 'East Boston'},
+    {'name': 'Roslindale Square', 'x': -71.1297, 'y': 42.2870,
+     'city': 'Roslindale'},
+    {'name': 'Fenway Park', 'x': -71.0972, 'y': 42.3467, 'city': 'Boston'},
+    # near the boundary with Newton
+    {'name': 'Oak Square', 'x': -71.1768, 'y': 42.3497, 'city': 'Brighton'},
+    # near the boundaries with Dedham and Milton
+    {'name': 'Readville', 'x': -71.1327, 'y': 42.2379, 'city': 'Hyde Park'},
+    # on the Neponset, across from Milton
+    {'name': 'Mattapan Square', 'x': -71.0925, 'y': 42.2677,
+     'city': 'Mattapan'},
+    {'name': 'Harvard Square', 'x': -71.1190, 'y': 42.3733,
+     'city': 'Cambridge'},
+    {'name': 'Coolidge Corner', 'x': -71.1214, 'y': 42.3420,
+     'city': 'Brookline'},
+    # across the Riverway from Boston
+    {'name': 'Brookline Village', 'x': -71.1169, 'y': 42.3327,
+     'city': 'Brookline'},
+    {'name': 'Milton Village', 'x': -71.0679, 'y': 42.2697,
+     'city': 'Milton'},
+    {'name': 'Dedham Square', 'x': -71.1761, 'y': 42.2480, 'city': 'Dedham'},
+    {'name': 'Newton Corner', 'x': -71.1871, 'y': 42.3549, 'city': 'Newton'},
+    {'name': 'Chelsea Square', 'x': -71.0330, 'y': 42.3937,
+     'city': 'Chelsea'},
+    {'name': 'Quincy Center', 'x': -71.0050, 'y': 42.2510, 'city': 'Quincy'},
+]
@@ -1,17 +1,41 @@
+import tempfile
 import unittest
 import unittest.mock as mock
 import mycity.intents.intent_constants as intent_constants
 import mycity.mycity_controller as my_controller
 import mycity.mycity_request_data_model as my_req
+import mycity.utilities.cache as cache
+import mycity.utilities.disk_cache as disk_cache
+
+
+class FakeClock(object):
+    """
+    Clock for code that takes one, such as Deadline and the caches, whose
+    time only moves when a test sets now
+    """
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
 
 
 class BaseTestCase(unittest.TestCase):
 
     def setUp(self):
+        # persistent caches write to a directory of the test's own, so the
+        # real on-disk cache is neither read nor wiped
+        self.disk_cache_directory = tempfile.TemporaryDirectory()
+        disk_cache.set_disk_cache(
+            disk_cache.DiskCache(self.disk_cache_directory.name))
+        cache.clear_all_caches()
         self.controller = my_controller
         self.request = my_req.MyCityRequestDataModel()
         
     def tearDown(self):
+        disk_cache.set_disk_cache(None)
+        self.disk_cache_directory.cleanup()
         self.controller = None
         self.request = None
 
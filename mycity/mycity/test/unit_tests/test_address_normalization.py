@@ -0,0 +1,41 @@
+import mycity.test.unit_tests.base as base
+import mycity.utilities.address_normalization as address_normalization
+
+
+class AddressNormalizationTestCase(base.BaseTestCase):
+
+    def test_spellings_of_an_address_normalize_the_same(self):
+        spellings = ["46 Everdean St",
+                     "46 everdean street",
+                     "46 EVERDEAN ST, Boston",
+                     "46 Everdean St. Boston MA"]
+        normalized = set(address_normalization.normalize_address(address)
+                         for address in spellings)
+        self.assertEqual(1, len(normalized))
+        self.assertEqual("46 Everdean St, City:Boston, State:Ma",
+                         address_normalization.to_single_line(
+                             normalized.pop()))
+
+    def test_zip_code_replaces_the_city_hint(self):
+        normalized = address_normalization.normalize_address(
+            "1000 Dorchester Avenue", "02125")
+        self.assertEqual("1000 Dorchester Ave, State:Ma, Zone:02125",
+                         address_normalization.to_single_line(normalized))
+
+    def test_directions_and_other_cities_are_kept(self):
+        normalized = address_normalization.normalize_address(
+            "12 West Broadway, South Boston")
+        self.assertEqual("W Broadway", normalized.street)
+        self.assertEqual("South Boston", normalized.city)
+
+    def test_street_types_before_the_name_are_kept(self):
+        spellings = ["2 Avenue de Lafayette", "2 AVE DE LAFAYETTE BOSTON MA"]
+        normalized = set(address_normalization.normalize_address(address)
+                         for address in spellings)
+        self.assertEqual(1, len(normalized))
+        self.assertEqual("2 Ave De Lafayette, City:Boston, State:Ma",
+                         address_normalization.to_single_line(
+                             normalized.pop()))
+
+    def test_address_without_street_is_not_normalized(self):
+        self.assertIsNone(address_normalization.normalize_address("02125"))
@@ -0,0 +1,190 @@
+import threading
+import unittest.mock as mock
+
+import mycity.test.unit_tests.base as base
+import mycity.utilities.arcgis_utils as arcgis_utils
+import mycity.utilities.deadline as deadline
+
+
+class AccessTokenManagerTestCase(base.BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.now = 1000.0
+        self.tokens = iter('token{}'.format(number) for number in range(10))
+        self.fetch = mock.Mock(side_effect=lambda: (next(self.tokens), 3600))
+        self.manager = arcgis_utils.AccessTokenManager(
+            self.fetch, refresh_margin=300, clock=lambda: self.now)
+
+    def _wait_for_refresh(self):
+        for thread in threading.enumerate():
+            if thread is not threading.current_thread() and thread.daemon:
+                thread.join(1)
+
+    def test_token_is_reused_until_close_to_expiry(self):
+        self.assertEqual('token0', self.manager.get_token())
+        self.now += 3000
+        self.assertEqual('token0', self.manager.get_token())
+        self.assertEqual(1, self.fetch.call_count)
+        self.assertEqual(1, self.manager.fetches)
+        self.assertEqual(1, self.manager.reuses)
+
+    def test_token_close_to_expiry_is_refreshed_in_background(self):
+        self.manager.get_token()
+        self.now += 3400
+        self.assertEqual('token0', self.manager.get_token())
+        self._wait_for_refresh()
+        self.assertEqual('token1', self.manager.get_token())
+        self.assertEqual(2, self.fetch.call_count)
+
+    def test_expired_token_is_fetched_again(self):
+        self.manager.get_token()
+        self.now += 3600
+        self.assertEqual('token1', self.manager.get_token())
+
+    def test_failed_fetch_is_not_kept(self):
+        self.fetch.side_effect = [None, ('token', 3600)]
+        self.assertIsNone(self.manager.get_token())
+        self.assertEqual('token', self.manager.get_token())
+
+    def test_invalidate_only_forgets_the_rejected_token(self):
+        self.manager.get_token()
+        self.manager.invalidate('some older token')
+        self.assertEqual('token0', self.manager.get_token())
+        self.manager.invalidate('token0')
+        self.assertEqual('token1', self.manager.get_token())
+
+    def test_callers_do_not_wait_for_a_background_refresh(self):
+        release = threading.Event()
+        fetched = iter(['token0', 'refreshed', 'token2'])
+
+        def fetch():
+            token = next(fetched)
+            if token == 'refreshed':
+                release.wait(1)
+            return token, 3600
+        manager = arcgis_utils.AccessTokenManager(
+            fetch, refresh_margin=300, clock=lambda: self.now)
+        manager.get_token()
+        self.now += 3400
+        self.assertEqual('token0', manager.get_token())
+        manager.invalidate('token0')
+        self.assertEqual('token2', manager.get_token())
+        release.set()
+        self._wait_for_refresh()
+        self.assertEqual('refreshed', manager.get_token())
+
+    def test_background_refresh_has_the_callers_deadline(self):
+        seen = []
+
+        def fetch():
+            seen.append(deadline.get_current_deadline())
+            return 'token', 3600
+        manager = arcgis_utils.AccessTokenManager(
+            fetch, refresh_margin=300, clock=lambda: self.now)
+        manager.get_token()
+        self.now += 3400
+        current = deadline.Deadline(5)
+        token = deadline.set_current_deadline(current)
+        try:
+            manager.get_token()
+        finally:
+            deadline.reset_current_deadline(token)
+        self._wait_for_refresh()
+        self.assertEqual([None, current], seen)
+
+    def test_concurrent_callers_share_one_fetch(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow_fetch():
+            started.set()
+            release.wait(1)
+            return 'token', 3600
+        manager = arcgis_utils.AccessTokenManager(slow_fetch)
+        results = []
+        threads = [threading.Thread(
+            target=lambda: results.append(manager.get_token()))
+            for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        started.wait(1)
+        release.set()
+        for thread in threads:
+            thread.join(1)
+        self.assertEqual(['token'] * 4, results)
+        self.assertEqual(1, manager.fetches)
+        self.assertEqual(3, manager.reuses)
+
+    @mock.patch.dict('os.environ', {'ARCGIS_CLIENT_ID': 'id',
+                                    'ARCGIS_CLIENT_SECRET': 'secret'})
+    @mock.patch('mycity.utilities.arcgis_utils.http_utils.post')
+    def test_generate_access_token_uses_expires_in(self, mock_post):
+        mock_post.return_value = self._mock_response(
+            json_data={'access_token': 'token', 'expires_in': 7200})
+        manager = arcgis_utils.AccessTokenManager(
+            arcgis_utils._request_access_token)
+        with mock.patch.object(arcgis_utils, '_access_token_manager',
+                               manager):
+            self.assertEqual('token', arcgis_utils.generate_access_token())
+            self.assertEqual('token', arcgis_utils.generate_access_token())
+            self.assertEqual({'fetches': 1, 'reuses': 1},
+                             arcgis_utils.get_access_token_stats())
+        mock_post.assert_called_once()
+
+
+class ClosestRoutesTestCase(base.BaseTestCase):
+
+    ORIGIN = {'x': -71.0589, 'y': 42.3601}
+    DESTINATIONS = {('-71.06', '42.36'): 'First Boston, MA',
+                    ('-71.07', '42.35'): 'Second Boston, MA',
+                    ('', ''): 'No coordinates Boston, MA',
+                    ('-71.10', '42.33'): 'Third Boston, MA'}
+
+    def setUp(self):
+        super().setUp()
+        form_patcher = mock.patch.object(
+            arcgis_utils, 'format_multipart_form_request',
+            side_effect=lambda url, params: (params, {}))
+        self.mock_form = form_patcher.start()
+        self.addCleanup(form_patcher.stop)
+        post_patcher = mock.patch.object(arcgis_utils, '_post_request')
+        self.mock_post = post_patcher.start()
+        self.addCleanup(post_patcher.stop)
+
+    def _routes(self, *routes):
+        self.mock_post.return_value = self._mock_response(json_data={
+            'routes': {'features': [
+                {'attributes': {'FacilityID': facility_id,
+                                'FacilityRank': rank,
+                                'Total_TravelTime': minutes,
+                                'Total_Miles': miles}}
+                for facility_id, rank, minutes, miles in routes]}})
+
+    def test_ranked_routes_come_from_one_request(self):
+        self._routes((1, 2, 4.0, 1.5), (3, 3, 9.25, 3.0), (2, 1, 2.5, 0.75))
+        routes = arcgis_utils.find_closest_routes(
+            'token', self.ORIGIN, self.DESTINATIONS, 3)
+        self.assertEqual(['Second Boston, MA', 'First Boston, MA',
+                          'Third Boston, MA'],
+                         [route['Address'] for route in routes])
+        self.assertEqual('2.5 minutes',
+                         routes[0][arcgis_utils.DRIVING_TIME_TEXT_KEY])
+        self.mock_post.assert_called_once()
+        self.assertEqual('3', self.mock_form.call_args[0][1]
+                         ['defaultTargetFacilityCount'])
+
+    def test_closest_route_is_the_first_ranked(self):
+        self._routes((2, 1, 2.5, 0.75))
+        closest = arcgis_utils.find_closest_route('token', self.ORIGIN,
+                                                  self.DESTINATIONS)
+        self.assertEqual({'Address': 'Second Boston, MA',
+                          'Driving_time': '2.5 minutes',
+                          'Driving_distance': '0.75 miles'}, closest)
+        self.assertNotIn('defaultTargetFacilityCount',
+                         self.mock_form.call_args[0][1])
+
+    def test_no_routes_found(self):
+        self._routes()
+        self.assertIsNone(arcgis_utils.find_closest_route(
+            'token', self.ORIGIN, self.DESTINATIONS))
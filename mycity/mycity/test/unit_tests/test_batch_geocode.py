@@ -0,0 +1,88 @@
+import unittest.mock as mock
+
+import mycity.test.unit_tests.base as base
+import mycity.utilities.batch_geocode as batch_geocode
+import mycity.utilities.deadline as deadline
+from mycity.utilities.finder.Finder import Finder
+from mycity.utilities.finder.FinderCSV import FinderCSV
+
+
+def _candidate(index):
+    return {'address': 'found', 'score': 100,
+            'location': {'x': -71.0 - index / 1000, 'y': 42.3}}
+
+
+class BatchGeocodeTestCase(base.BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        token_patcher = mock.patch(
+            'mycity.utilities.arcgis_utils.generate_access_token',
+            return_value='token')
+        token_patcher.start()
+        self.addCleanup(token_patcher.stop)
+        batch_patcher = mock.patch(
+            'mycity.utilities.arcgis_utils.geocode_addresses',
+            side_effect=lambda keys, token: [
+                _candidate(int(key.split()[0])) for key in keys])
+        self.mock_batch = batch_patcher.start()
+        self.addCleanup(batch_patcher.stop)
+
+    def test_missing_addresses_are_geocoded_in_batches(self):
+        addresses = ['{} Main St'.format(number) for number in range(1, 351)]
+        coordinates = batch_geocode.geocode_addresses(addresses)
+        self.assertEqual(3, self.mock_batch.call_count)
+        self.assertEqual(
+            [batch_geocode.BATCH_SIZE, batch_geocode.BATCH_SIZE, 50],
+            sorted((len(call[0][0]) for call in
+                    self.mock_batch.call_args_list), reverse=True))
+        self.assertEqual({'x': -71.007, 'y': 42.3},
+                         coordinates['7 Main St'])
+
+    def test_cached_addresses_are_not_geocoded_again(self):
+        batch_geocode.geocode_addresses(['1 Main St', '2 Main St'])
+        coordinates = batch_geocode.geocode_addresses(
+            ['1 main street', '2 MAIN ST'])
+        self.assertEqual(1, self.mock_batch.call_count)
+        self.assertEqual({'x': -71.002, 'y': 42.3}, coordinates['2 MAIN ST'])
+
+    def test_coordinates_are_kept_on_disk(self):
+        batch_geocode.geocode_addresses(['3 Main St'])
+        batch_geocode.get_coordinates.cache.clear()
+        self.assertEqual(
+            (True, {'x': -71.003, 'y': 42.3}),
+            batch_geocode.get_coordinates.peek(
+                batch_geocode.address_key('3 Main St')))
+
+    def test_unmatched_addresses_are_not_kept_on_disk(self):
+        self.mock_batch.side_effect = lambda keys, token: [None] * len(keys)
+        coordinates = batch_geocode.geocode_addresses(['4 Main St'])
+        self.assertIsNone(coordinates['4 Main St'])
+        batch_geocode.get_coordinates.cache.clear()
+        found, _ = batch_geocode.get_coordinates.peek(
+            batch_geocode.address_key('4 Main St'))
+        self.assertFalse(found)
+
+    def test_finder_fills_in_missing_coordinates(self):
+        finder = FinderCSV(self.request, 'https://fake.url', 'Address', '',
+                           None, origin_coordinates={'x': -71, 'y': 42})
+        records = [{'Address': '5 Main St', 'X': '', 'Y': ''},
+                   {'Address': '6 Main St', 'X': '-71.1', 'Y': '42.2'}]
+        finder.geocode_missing_coordinates(records)
+        self.assertEqual((-71.005, 42.3), (records[0]['X'], records[0]['Y']))
+        self.assertEqual(('-71.1', '42.2'), (records[1]['X'], records[1]['Y']))
+        self.assertEqual(['5 Main St, Boston, Ma'],
+                         self.mock_batch.call_args[0][0])
+
+    def test_finder_short_of_time_only_uses_cached_coordinates(self):
+        batch_geocode.geocode_addresses(['7 Main St, Boston, Ma'])
+        finder = FinderCSV(self.request, 'https://fake.url', 'Address', '',
+                           None, origin_coordinates={'x': -71, 'y': 42})
+        finder.deadline = deadline.Deadline(
+            Finder.MIN_GEOCODING_SECONDS - 1)
+        records = [{'Address': '7 Main St', 'X': '', 'Y': ''},
+                   {'Address': '8 Main St', 'X': '', 'Y': ''}]
+        finder.geocode_missing_coordinates(records)
+        self.assertEqual(1, self.mock_batch.call_count)
+        self.assertEqual((-71.007, 42.3), (records[0]['X'], records[0]['Y']))
+        self.assertEqual(('', ''), (records[1]['X'], records[1]['Y']))
@@ -0,0 +1,133 @@
+import os
+import random
+import tempfile
+import unittest.mock as mock
+import mycity.test.test_constants as test_constants
+import mycity.test.unit_tests.base as base
+import mycity.utilities.boundary_utils as boundary_utils
+import mycity.utilities.gis_utils as gis_utils
+import mycity.utilities.location_services_utils as location_services_utils
+
+
+def _square(min_x, min_y, max_x, max_y):
+    return [[min_x, min_y], [max_x, min_y], [max_x, max_y], [min_x, max_y],
+            [min_x, min_y]]
+
+
+def _feature(name, geometry_type, coordinates):
+    return {'type': 'Feature', 'properties': {'Name': name},
+            'geometry': {'type': geometry_type, 'coordinates': coordinates}}
+
+
+NEIGHBORHOODS_GEOJSON = {
+    'type': 'FeatureCollection',
+    'features': [
+        # with a hole standing in for an enclave that is not Boston
+        _feature('Dorchester', 'Polygon',
+                 [_square(-71.08, 42.28, -71.03, 42.32),
+                  _square(-71.06, 42.30, -71.05, 42.31)]),
+        # not in gis_utils.NEIGHBORHOODS, reverse geocodes as "Boston"
+        _feature('Downtown', 'Polygon', [_square(-71.07, 42.35, -71.05, 42.36)]),
+        _feature('Charlestown', 'MultiPolygon',
+                 [[_square(-71.07, 42.37, -71.06, 42.38)],
+                  [_square(-71.05, 42.37, -71.04, 42.38)]]),
+    ]
+}
+
+
+def _expected_neighborhood(x, y):
+    """
+    Where each test point is, worked out from the squares above
+    """
+    if -71.08 < x < -71.03 and 42.28 < y < 42.32 and \
+            not (-71.06 < x < -71.05 and 42.30 < y < 42.31):
+        return 'Dorchester'
+    if -71.07 < x < -71.05 and 42.35 < y < 42.36:
+        return 'Downtown'
+    if 42.37 < y < 42.38 and (-71.07 < x < -71.06 or -71.05 < x < -71.04):
+        return 'Charlestown'
+    return None
+
+
+def _random_points(count, seed=311):
+    generator = random.Random(seed)
+    return [(generator.uniform(-71.09, -71.02), generator.uniform(42.27, 42.39))
+            for _ in range(count)]
+
+
+class BoundaryUtilsTestCase(base.BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.index = boundary_utils.BoundaryIndex.from_geojson(
+            NEIGHBORHOODS_GEOJSON, cell_size=0.01)
+
+    def test_points_are_located_in_their_neighborhood(self):
+        self.assertEqual('Dorchester', self.index.locate(-71.07, 42.29))
+        self.assertEqual('Downtown', self.index.locate(-71.06, 42.355))
+        self.assertEqual('Charlestown', self.index.locate(-71.045, 42.375))
+        self.assertIsNone(self.index.locate(-71.055, 42.305))
+        self.assertIsNone(self.index.locate(-71.1, 42.37))
+
+    def test_random_points_are_located_correctly(self):
+        for x, y in _random_points(2000):
+            self.assertEqual(_expected_neighborhood(x, y),
+                             self.index.locate(x, y), (x, y))
+
+    def test_missing_dataset_raises(self):
+        with mock.patch.object(boundary_utils, 'get_neighborhood_index',
+                               return_value=None):
+            with self.assertRaises(FileNotFoundError):
+                boundary_utils.find_neighborhood(-71.06, 42.355)
+
+
+class ReverseGeocodingParityTestCase(base.BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        if boundary_utils.get_neighborhood_index() is None:
+            self.skipTest('neighborhoods are not bundled, run '
+                          'python -m mycity.utilities.boundary_utils '
+                          '--refresh')
+
+    def test_coordinates_in_city_match_reverse_geocoding(self):
+        for location in test_constants.REVERSE_GEOCODED_LOCATIONS:
+            with mock.patch.object(gis_utils, 'reverse_geocode_addr') \
+                    as mock_reverse_geocode:
+                in_city = location_services_utils.are_coordinates_in_city(
+                    {'x': location['x'], 'y': location['y']},
+                    gis_utils.NEIGHBORHOODS)
+            mock_reverse_geocode.assert_not_called()
+            self.assertEqual(location['city'] in gis_utils.NEIGHBORHOODS,
+                             in_city, location['name'])
+
+
+class BundledNeighborhoodsTestCase(base.BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'neighborhoods.geojson')
+        path_patcher = mock.patch.object(boundary_utils,
+                                         'NEIGHBORHOODS_PATH', self.path)
+        path_patcher.start()
+        self.addCleanup(path_patcher.stop)
+        self.addCleanup(setattr, boundary_utils, '_index_loaded', False)
+        boundary_utils._index_loaded = False
+
+    @mock.patch('mycity.utilities.boundary_utils.http_utils.get')
+    def test_refreshed_dataset_is_the_one_the_index_loads(self, mock_get):
+        mock_get.return_value = self._mock_response(
+            json_data=NEIGHBORHOODS_GEOJSON)
+        boundary_utils.main(['--refresh', '--check', '--path', self.path])
+        self.assertEqual(3, boundary_utils.check_neighborhoods(self.path))
+        self.assertEqual('Downtown',
+                         boundary_utils.find_neighborhood(-71.06, 42.355))
+
+    def test_check_fails_without_the_dataset(self):
+        with self.assertRaises(SystemExit) as context, \
+                mock.patch('sys.stderr'):
+            boundary_utils.main(['--check', '--path', self.path])
+        self.assertEqual(1, context.exception.code)
+        self.assertIsNone(boundary_utils.get_neighborhood_index())
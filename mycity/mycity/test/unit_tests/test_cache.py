@@ -0,0 +1,123 @@
+import threading
+import unittest.mock as mock
+import mycity.test.unit_tests.base as base
+import mycity.utilities.cache as cache
+from mycity.intents.custom_errors import BadAPIResponse
+
+
+class CacheTestCase(base.BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.clock = base.FakeClock()
+        self.calls = []
+
+    def _cached_function(self, name, **options):
+        @cache.cached(name, **options)
+        def fetch(key):
+            self.calls.append(key)
+            return {'key': key, 'call': len(self.calls)}
+        fetch.cache._clock = self.clock
+        return fetch
+
+    def test_second_call_is_a_hit(self):
+        fetch = self._cached_function('test_hit', ttl=60)
+        self.assertEqual(fetch('a'), fetch('a'))
+        self.assertEqual(['a'], self.calls)
+        stats = cache.get_cache_stats()['test_hit']
+        self.assertEqual(1, stats['hits'])
+        self.assertEqual(1, stats['misses'])
+
+    def test_primed_result_is_returned_without_a_call(self):
+        fetch = self._cached_function('test_prime', ttl=60)
+        self.assertEqual((False, None), fetch.peek('a'))
+        fetch.prime({'key': 'a', 'call': 0}, 'a')
+        self.assertEqual((True, {'key': 'a', 'call': 0}), fetch.peek('a'))
+        self.assertEqual({'key': 'a', 'call': 0}, fetch('a'))
+        self.assertEqual([], self.calls)
+
+    def test_entries_expire_after_ttl(self):
+        fetch = self._cached_function('test_ttl', ttl=60)
+        fetch('a')
+        self.clock.now += 61
+        fetch('a')
+        self.assertEqual(['a', 'a'], self.calls)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        fetch = self._cached_function('test_lru', ttl=60, maxsize=2)
+        fetch('a')
+        fetch('b')
+        fetch('a')
+        fetch('c')
+        fetch('a')
+        fetch('b')
+        self.assertEqual(['a', 'b', 'c', 'b'], self.calls)
+        self.assertEqual(2, cache.get_cache_stats()['test_lru']['evictions'])
+
+    def test_dictionary_arguments_are_keys(self):
+        fetch = self._cached_function('test_dict_key', ttl=60)
+        fetch({'where': '1=1', 'out_sr': '4326'})
+        fetch({'out_sr': '4326', 'where': '1=1'})
+        self.assertEqual(1, len(self.calls))
+
+    def test_failures_are_cached_for_negative_ttl(self):
+        @cache.cached('test_negative', ttl=60, negative_ttl=10,
+                      negative_exceptions=(BadAPIResponse,))
+        def fetch():
+            self.calls.append(None)
+            raise BadAPIResponse
+        fetch.cache._clock = self.clock
+
+        for _ in range(3):
+            with self.assertRaises(BadAPIResponse):
+                fetch()
+        self.assertEqual(1, len(self.calls))
+        self.clock.now += 11
+        with self.assertRaises(BadAPIResponse):
+            fetch()
+        self.assertEqual(2, len(self.calls))
+        self.assertEqual(
+            2, cache.get_cache_stats()['test_negative']['negative_hits'])
+
+    def test_negative_results_use_negative_ttl(self):
+        @cache.cached('test_negative_result', ttl=60, negative_ttl=10,
+                      is_negative=lambda result: result is None)
+        def fetch():
+            self.calls.append(None)
+            return None
+        fetch.cache._clock = self.clock
+
+        fetch()
+        fetch()
+        self.clock.now += 11
+        fetch()
+        self.assertEqual(2, len(self.calls))
+
+    def test_stale_value_is_served_while_refreshing(self):
+        fetch = self._cached_function('test_stale', ttl=60, stale_ttl=60)
+        first = fetch('a')
+        self.clock.now += 90
+        refreshed = threading.Event()
+        original_finish = fetch.cache.finish_refresh
+
+        def finish_refresh(key):
+            original_finish(key)
+            refreshed.set()
+
+        with mock.patch.object(fetch.cache, 'finish_refresh', finish_refresh):
+            self.assertEqual(first, fetch('a'))
+            self.assertTrue(refreshed.wait(5))
+        self.assertEqual(2, fetch('a')['call'])
+        self.assertEqual(1, cache.get_cache_stats()['test_stale']['stale_hits'])
+
+    def test_copy_result_protects_cached_value(self):
+        fetch = self._cached_function('test_copy', ttl=60, copy_result=True)
+        fetch('a')['key'] = 'changed'
+        self.assertEqual('a', fetch('a')['key'])
+
+    def test_clear_all_caches(self):
+        fetch = self._cached_function('test_clear', ttl=60)
+        fetch('a')
+        cache.clear_all_caches()
+        fetch('a')
+        self.assertEqual(['a', 'a'], self.calls)
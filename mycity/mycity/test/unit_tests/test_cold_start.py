@@ -0,0 +1,54 @@
+import mycity.benchmarks.cold_start as cold_start
+import mycity.test.unit_tests.base as base
+
+IMPORT_TIME_STDERR = """\
+import time: self [us] | cumulative | imported package
+import time:       500 |        500 | encodings
+{marker}
+import time:      2000 |       2000 |     urllib3.util.url
+import time:      1000 |       3000 |   urllib3
+import time:       300 |        300 |     mycity.utilities.cache
+import time:       200 |        500 |   mycity
+import time:      2500 |       6000 | lambda_function
+""".format(marker=cold_start.IMPORT_MARKER)
+
+
+def _report(median, packages):
+    return {'seconds': {'min': median, 'median': median, 'max': median},
+            'packages': packages}
+
+
+class ColdStartTestCase(base.BaseTestCase):
+
+    def test_import_times_after_the_marker_are_parsed(self):
+        self.assertEqual({'urllib3.util.url': 0.002, 'urllib3': 0.001,
+                          'mycity.utilities.cache': 0.0003,
+                          'mycity': 0.0002, 'lambda_function': 0.0025},
+                         cold_start.parse_import_times(IMPORT_TIME_STDERR))
+
+    def test_modules_are_grouped_by_package(self):
+        self.assertEqual('mycity',
+                         cold_start.package_of('mycity.utilities.cache'))
+        self.assertEqual('urllib3', cold_start.package_of('urllib3.util.url'))
+        if cold_start.STDLIB_MODULE_NAMES:
+            self.assertEqual('stdlib', cold_start.package_of('email.charset'))
+
+    def test_report_sums_module_times_by_package(self):
+        runs = [{'seconds': seconds, 'network_attempts': [],
+                 'modules': cold_start.parse_import_times(IMPORT_TIME_STDERR)}
+                for seconds in (0.1, 0.3, 0.2)]
+        report = cold_start.build_report(runs, top=1)
+        self.assertEqual(0.2, report['seconds']['median'])
+        self.assertAlmostEqual(0.003, report['packages']['urllib3'])
+        self.assertAlmostEqual(0.0005, report['packages']['mycity'])
+        self.assertEqual(['lambda_function'],
+                         list(report['slowest_modules']))
+
+    def test_regression_past_tolerance_is_reported(self):
+        baseline = _report(0.100, {'mycity': 0.010, 'bs4': 0.020})
+        self.assertIsNone(cold_start.check_regression(
+            _report(0.115, {'mycity': 0.012}), baseline, tolerance=0.2))
+        message = cold_start.check_regression(
+            _report(0.150, {'mycity': 0.050, 'bs4': 0.021}), baseline,
+            tolerance=0.2)
+        self.assertIn('mycity grew the most', message)
@@ -0,0 +1,55 @@
+import threading
+import time
+import mycity.test.unit_tests.base as base
+import mycity.utilities.concurrency as concurrency
+import mycity.utilities.deadline as deadline_utils
+from mycity.intents.custom_errors import BadAPIResponse
+
+
+class ConcurrencyTestCase(base.BaseTestCase):
+
+    def test_results_are_returned_in_order(self):
+        results = concurrency.run_in_parallel(lambda: 1, lambda: 2,
+                                              lambda: 3)
+        self.assertEqual([1, 2, 3], results)
+
+    def test_calls_run_at_the_same_time(self):
+        started = threading.Barrier(3, timeout=5)
+
+        def call():
+            # fails with BrokenBarrierError unless all three are running
+            started.wait()
+            return True
+
+        self.assertEqual([True] * 3,
+                         concurrency.run_in_parallel(call, call, call))
+
+    def test_wall_clock_is_the_slowest_call(self):
+        start = time.monotonic()
+        concurrency.run_in_parallel(lambda: time.sleep(0.2),
+                                    lambda: time.sleep(0.2),
+                                    lambda: time.sleep(0.2))
+        self.assertLess(time.monotonic() - start, 0.5)
+
+    def test_exception_is_raised_after_every_call_finishes(self):
+        finished = []
+
+        def fail():
+            raise BadAPIResponse
+
+        def slow():
+            time.sleep(0.1)
+            finished.append(True)
+
+        with self.assertRaises(BadAPIResponse):
+            concurrency.run_in_parallel(fail, slow)
+        self.assertEqual([True], finished)
+
+    def test_deadline_is_seen_by_submitted_calls(self):
+        deadline = deadline_utils.Deadline(5)
+        token = deadline_utils.set_current_deadline(deadline)
+        try:
+            future = concurrency.submit(deadline_utils.get_current_deadline)
+        finally:
+            deadline_utils.reset_current_deadline(token)
+        self.assertIs(deadline, future.result())
@@ -10,8 +10,8 @@ class CrimeIncidentsAPIUtilitiesTestCase(base.BaseTestCase):
         'mycity.utilities.gis_utils.geocode_address',
         return_value=test_constants.GEOCODE_ADDRESS_MOCK
     )
-    @mock.patch('requests.get')
-    def test_get_crime_incident_response(self, mock_geocode_address, mock_get):
+    @mock.patch('mycity.utilities.crime_incidents_api_utils.http_utils.get')
+    def test_get_crime_incident_response(self, mock_get, mock_geocode_address):
         mock_resp = self._mock_response(status=200,
             json_data=test_constants.GET_CRIME_INCIDENTS_API_MOCK)
         mock_get.return_value = mock_resp
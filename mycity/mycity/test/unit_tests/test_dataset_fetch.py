@@ -0,0 +1,150 @@
+import unittest.mock as mock
+
+import mycity.test.unit_tests.base as base
+import mycity.utilities.dataset_fetch as dataset_fetch
+from mycity.utilities.finder.FinderCSV import FinderCSV
+
+URL = 'https://data.boston.gov/parking.csv'
+ORIGIN = {'x': -71.0, 'y': 42.3}
+CSV = '\ufeffX,Y,Address\n-71.06,42.36,1 City Hall Sq\n'
+
+
+class DatasetFetchTestCase(base.BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.now = 1000000.0
+        clock_patcher = mock.patch.object(dataset_fetch, '_clock',
+                                          lambda: self.now)
+        clock_patcher.start()
+        self.addCleanup(clock_patcher.stop)
+        get_patcher = mock.patch(
+            'mycity.utilities.dataset_fetch.http_utils.get')
+        self.mock_get = get_patcher.start()
+        self.addCleanup(get_patcher.stop)
+        self.mock_get.return_value = self._response(200)
+
+    def _response(self, status, headers=None):
+        body = CSV.encode('utf-8')
+        response = self._mock_response(status=status, content=body)
+        # small chunks, so characters and lines are split between them
+        response.iter_content = lambda chunk_size: \
+            [body[start:start + 5] for start in range(0, len(body), 5)]
+        response.headers = headers if headers is not None else \
+            {'ETag': '"v1"', 'Last-Modified': 'Mon, 05 Oct 2026 10:00:00 GMT'}
+        return response
+
+    def test_fresh_dataset_is_returned_without_a_request(self):
+        first = dataset_fetch.fetch_dataset(URL)
+        self.now += dataset_fetch.FRESH_SECONDS - 1
+        second = dataset_fetch.fetch_dataset(URL)
+        self.assertEqual('X,Y,Address\n-71.06,42.36,1 City Hall Sq\n',
+                         first.value)
+        self.assertIs(first, second)
+        self.assertEqual(1, self.mock_get.call_count)
+        self.assertIsNone(self.mock_get.call_args[1]['headers'])
+        self.assertTrue(self.mock_get.call_args[1]['stream'])
+
+    def test_unchanged_dataset_is_revalidated(self):
+        first = dataset_fetch.fetch_dataset(URL)
+        self.now += dataset_fetch.FRESH_SECONDS
+        self.mock_get.return_value = self._response(304, {})
+        second = dataset_fetch.fetch_dataset(URL)
+        self.assertEqual({'If-None-Match': '"v1"',
+                          'If-Modified-Since':
+                              'Mon, 05 Oct 2026 10:00:00 GMT'},
+                         self.mock_get.call_args[1]['headers'])
+        self.assertIs(first.value, second.value)
+        self.assertEqual(self.now, second.checked_at)
+
+    def test_dataset_without_validators_is_versioned_by_its_body(self):
+        self.mock_get.return_value = self._response(200, {})
+        first = dataset_fetch.fetch_dataset(URL)
+        dataset_fetch.cache.clear_all_caches()
+        second = dataset_fetch.fetch_dataset(URL)
+        self.assertEqual(first.version, second.version)
+        self.assertIsNone(first.etag)
+
+    def test_failed_revalidation_keeps_the_dataset(self):
+        first = dataset_fetch.fetch_dataset(URL)
+        self.now += dataset_fetch.FRESH_SECONDS
+        self.mock_get.return_value = self._response(503)
+        self.assertEqual(first.value, dataset_fetch.fetch_dataset(URL).value)
+        self.assertEqual(first.value, dataset_fetch.fetch_dataset(URL).value)
+        # the failure is remembered, so the server is not asked again
+        self.assertEqual(2, self.mock_get.call_count)
+
+    def test_failed_first_download_returns_none(self):
+        self.mock_get.return_value = self._response(404)
+        self.assertIsNone(dataset_fetch.fetch_dataset(URL))
+
+    def test_lines_are_decoded_across_chunk_boundaries(self):
+        body = '\ufeffName,Comments\nCafé,"two\nlines"\nEnd,'.encode('utf-8')
+        chunks = [body[start:start + 2] for start in range(len(body))[::2]]
+        lines = list(dataset_fetch.iter_lines(chunks, 'utf-8-sig'))
+        self.assertEqual(['Name,Comments\n', 'Café,"two\n', 'lines"\n',
+                          'End,'], lines)
+
+    def test_finder_keeps_only_the_columns_it_uses(self):
+        finder = FinderCSV(self.request, URL, 'Address', 'At {Address}', None,
+                           filter=lambda record: record['X'],
+                           origin_coordinates={'x': -71.0, 'y': 42.3})
+        self.mock_get.return_value.iter_content = lambda chunk_size: [
+            b'X,Y,Address,Notes\n-71.06,42.36,1 City Hall Sq,a\n',
+            b',,2 City Hall Sq,b\n']
+        store = finder.get_records()
+        self.assertEqual(1, len(store))
+        self.assertEqual({'X': '-71.06', 'Y': '42.36',
+                          'Address': '1 City Hall Sq Boston, MA'},
+                         store.record(0))
+
+    def test_finder_records_are_saved_to_disk_only_for_named_filters(self):
+        with mock.patch('mycity.utilities.dataset_fetch.disk_cache.'
+                        'get_disk_cache') as mock_disk_cache:
+            mock_disk_cache.return_value.load.return_value = None
+            FinderCSV(self.request, URL, 'Address', '{Address}', None,
+                      origin_coordinates=ORIGIN).get_records()
+            self.assertEqual(1, mock_disk_cache.return_value.save.call_count)
+            FinderCSV(self.request, URL, 'Address', '{Address}', None,
+                      filter=lambda record: True,
+                      origin_coordinates=ORIGIN).get_records()
+            self.assertEqual(1, mock_disk_cache.return_value.save.call_count)
+
+    def test_finder_reuses_parsed_records_until_the_file_changes(self):
+        finder = FinderCSV(self.request, URL, 'Address', '{Address}', None,
+                           origin_coordinates={'x': -71.0, 'y': 42.3})
+        with mock.patch.object(FinderCSV, 'parse_records', autospec=True,
+                               side_effect=FinderCSV.parse_records
+                               ) as mock_parse:
+            first = finder.get_records()
+            self.now += dataset_fetch.FRESH_SECONDS
+            self.mock_get.return_value = self._response(304, {})
+            second = finder.get_records()
+            self.assertEqual(1, mock_parse.call_count)
+            self.assertIs(first, second)
+            self.assertEqual('1 City Hall Sq Boston, MA', second.address(0))
+
+            self.now += dataset_fetch.FRESH_SECONDS
+            self.mock_get.return_value = self._response(200, {'ETag': '"v2"'})
+            finder.get_records()
+            self.assertEqual(2, mock_parse.call_count)
+
+    def test_records_kept_without_coordinates_are_geocoded_again(self):
+        finder = FinderCSV(self.request, URL, 'Address', '{Address}', None,
+                           origin_coordinates=ORIGIN)
+        self.mock_get.return_value.iter_content = lambda chunk_size: [
+            b'X,Y,Address\n,,2 City Hall Sq\n']
+        with mock.patch('mycity.utilities.batch_geocode.geocode_addresses',
+                        return_value={'2 City Hall Sq Boston, MA': None}
+                        ) as mock_geocode:
+            self.assertEqual([0], finder.get_records()
+                             .rows_without_coordinates())
+            self.now += dataset_fetch.FRESH_SECONDS
+            self.mock_get.return_value = self._response(304, {})
+            mock_geocode.return_value = {
+                '2 City Hall Sq Boston, MA': {'x': -71.05, 'y': 42.36}}
+            store = finder.get_records()
+        self.assertEqual(2, mock_geocode.call_count)
+        self.assertEqual({'X': -71.05, 'Y': 42.36,
+                          'Address': '2 City Hall Sq Boston, MA'},
+                         store.record(0))
@@ -0,0 +1,62 @@
+import unittest.mock as mock
+import mycity.test.unit_tests.base as base
+import mycity.utilities.deadline as deadline_utils
+import mycity.utilities.http_utils as http_utils
+from mycity.intents.custom_errors import DeadlineExceededError
+
+
+class DeadlineTestCase(base.BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.clock = base.FakeClock(100.0)
+        self.deadline = deadline_utils.Deadline(2.0, clock=self.clock)
+
+    def test_timeout_is_capped_to_remaining_time(self):
+        self.clock.now += 1.5
+        self.assertEqual((0.5, 0.5), self.deadline.timeout((3.05, 10)))
+        self.assertEqual(0.25, self.deadline.timeout(0.25))
+
+    def test_expired_deadline_raises(self):
+        self.clock.now += 2.5
+        self.assertTrue(self.deadline.expired())
+        with self.assertRaises(DeadlineExceededError):
+            self.deadline.timeout(3)
+        with self.assertRaises(DeadlineExceededError):
+            self.deadline.check()
+
+    def test_from_lambda_context_keeps_safety_margin(self):
+        context = mock.Mock()
+        context.get_remaining_time_in_millis.return_value = 3000
+        deadline = deadline_utils.Deadline.from_lambda_context(context)
+        self.assertAlmostEqual(
+            3 - deadline_utils.SAFETY_MARGIN_SECONDS,
+            deadline.remaining(), places=2)
+
+    def test_from_lambda_context_without_lambda(self):
+        self.assertIsNone(deadline_utils.Deadline.from_lambda_context({}))
+
+    def test_http_requests_use_current_deadline(self):
+        session = http_utils.get_session('https://data.boston.gov/')
+        token = deadline_utils.set_current_deadline(self.deadline)
+        try:
+            with mock.patch.object(session, 'request') as mock_request:
+                http_utils.get('https://data.boston.gov/api')
+                self.assertEqual((2.0, 2.0),
+                                 mock_request.call_args[1]['timeout'])
+                self.clock.now += 3
+                with self.assertRaises(DeadlineExceededError):
+                    http_utils.get('https://data.boston.gov/api')
+                self.assertEqual(1, mock_request.call_count)
+        finally:
+            deadline_utils.reset_current_deadline(token)
+        self.assertIsNone(deadline_utils.get_current_deadline())
+
+    @mock.patch('mycity.intents.latest_311_intent.get_311_requests',
+                side_effect=DeadlineExceededError)
+    def test_intent_out_of_time_returns_try_again(self, mock_intent):
+        self.request.intent_name = "LatestThreeOneOne"
+        response = self.controller.on_intent(self.request)
+        self.assertEqual(self.controller.DEADLINE_EXCEEDED_SPEECH,
+                         response.output_speech)
+        self.assertTrue(response.should_end_session)
@@ -0,0 +1,85 @@
+import os
+import tempfile
+import mycity.test.unit_tests.base as base
+import mycity.utilities.cache as cache
+import mycity.utilities.disk_cache as disk_cache
+
+
+class DiskCacheTestCase(base.BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.TemporaryDirectory()
+        self.clock = base.FakeClock(1000000.0)
+        self.disk = disk_cache.DiskCache(self.directory.name, clock=self.clock)
+        disk_cache.set_disk_cache(self.disk)
+
+    def tearDown(self):
+        super().tearDown()
+        self.directory.cleanup()
+
+    def _files(self):
+        return [name for name in os.listdir(self.directory.name)
+                if name.endswith(disk_cache.FILE_SUFFIX)]
+
+    def test_saved_value_is_loaded(self):
+        value = [{'attributes': {'Name': 'Lot 3'}, 'geometry': {'x': 1.5}}]
+        self.disk.save('features', ('url',), value, ttl=60, stale_ttl=30)
+        self.clock.now += 10
+        self.assertEqual((value, 50, 30),
+                         self.disk.load('features', ('url',)))
+
+    def test_expired_entry_is_loaded_within_its_grace_period(self):
+        self.disk.save('features', ('url',), 'value', ttl=60, stale_ttl=30)
+        self.clock.now += 70
+        self.assertEqual(('value', 0, 20),
+                         self.disk.load('features', ('url',)))
+
+    def test_entry_past_its_grace_period_is_removed(self):
+        self.disk.save('features', ('url',), 'value', ttl=60, stale_ttl=30)
+        self.clock.now += 91
+        self.assertIsNone(self.disk.load('features', ('url',)))
+        self.assertEqual([], self._files())
+
+    def test_other_version_is_a_miss(self):
+        self.disk.save('features', ('url',), 'value', ttl=60, version=1)
+        self.assertIsNone(self.disk.load('features', ('url',), version=2))
+
+    def test_unreadable_file_is_removed(self):
+        self.disk.save('features', ('url',), 'value', ttl=60)
+        path = os.path.join(self.directory.name, self._files()[0])
+        with open(path, 'wb') as entry_file:
+            entry_file.write(b'not a cache entry')
+        self.assertIsNone(self.disk.load('features', ('url',)))
+        self.assertEqual([], self._files())
+        self.assertEqual(1, self.disk.stats.errors)
+
+    def test_least_recently_used_files_are_evicted(self):
+        self.disk.max_bytes = 2500
+        for number in range(3):
+            self.disk.save('csv', (number,), os.urandom(1000), ttl=60)
+            os.utime(os.path.join(self.directory.name, self._files()[-1]),
+                     (number, number))
+        self.assertIsNone(self.disk.load('csv', (0,)))
+        self.assertIsNotNone(self.disk.load('csv', (2,)))
+        self.assertGreater(self.disk.stats.evictions, 0)
+
+    def test_persistent_cache_survives_losing_memory(self):
+        calls = []
+
+        @cache.cached('test_persistent', ttl=60, persistent=True)
+        def fetch(key):
+            calls.append(key)
+            return {'key': key}
+
+        self.assertEqual({'key': 'a'}, fetch('a'))
+        fetch.cache.clear()
+        self.assertEqual({'key': 'a'}, fetch('a'))
+        self.assertEqual(['a'], calls)
+        stats = cache.get_cache_stats()['test_persistent']
+        self.assertEqual(1, stats['disk_hits'])
+
+    def test_clear_all_caches_empties_the_disk_tier(self):
+        self.disk.save('features', ('url',), 'value', ttl=60)
+        cache.clear_all_caches()
+        self.assertEqual([], self._files())
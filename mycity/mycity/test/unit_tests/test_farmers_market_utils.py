@@ -0,0 +1,73 @@
+import unittest.mock as mock
+
+import mycity.intents.farmers_market_intent as farmers_market_intent
+import mycity.test.unit_tests.base as base
+import mycity.utilities.farmers_market_utils as farmers_market_utils
+from mycity.intents.custom_errors import BadAPIResponse
+
+
+def _market(name, day, object_id):
+    return {'attributes': {'OBJECTID': object_id, 'Name': name,
+                           'Day_of_Week': day, 'Address': '1 City Hall Sq',
+                           'Hours': '11 a.m. - 6 p.m.'}}
+
+
+MARKETS = [
+    _market('City Hall Plaza', 'Monday', 1),
+    _market('City Hall Plaza', 'Monday', 2),
+    _market('Copley Square', 'Tuesday', 3),
+    _market('City Hall Plaza', 'Wednesday', 4),
+]
+
+
+class FarmersMarketTableTestCase(base.BaseTestCase):
+
+    def test_each_days_speech_lists_its_markets_once(self):
+        table = farmers_market_utils.FarmersMarketTable(MARKETS)
+        self.assertEqual(
+            'Available farmers markets today are:\n'
+            'City Hall Plaza located at 1 City Hall Sq from '
+            '11 a.m. - 6 p.m.. ',
+            table.get_speech('Monday'))
+        self.assertEqual(['Copley Square'],
+                         [market['Name']
+                          for market in table.markets['Tuesday']])
+        self.assertEqual(farmers_market_utils.SPEECH_INTRODUCTION,
+                         table.get_speech('Sunday'))
+
+    def test_markets_with_missing_fields(self):
+        no_hours = _market('Dewey Square', 'Thursday', 5)
+        no_hours['attributes']['Hours'] = None
+        del no_hours['attributes']['Address']
+        no_day = _market('Copley Square', None, 6)
+        no_name = _market(None, 'Thursday', 7)
+        table = farmers_market_utils.FarmersMarketTable(
+            [no_hours, no_day, no_name])
+        self.assertEqual(
+            'Available farmers markets today are:\n'
+            'Dewey Square located at  from . ',
+            table.get_speech('Thursday'))
+        self.assertEqual(['Thursday'], list(table.markets))
+
+    @mock.patch('mycity.utilities.gis_utils.get_features_from_feature_server',
+                return_value=MARKETS)
+    def test_intent_uses_the_day_of_each_request(self, mock_features):
+        with mock.patch('mycity.intents.farmers_market_intent.date.get_day',
+                        return_value='Monday'):
+            monday = farmers_market_intent.get_farmers_markets_today(
+                self.request)
+        with mock.patch('mycity.intents.farmers_market_intent.date.get_day',
+                        return_value='Tuesday'):
+            tuesday = farmers_market_intent.get_farmers_markets_today(
+                self.request)
+        self.assertIn('City Hall Plaza', monday.output_speech)
+        self.assertIn('Copley Square', tuesday.output_speech)
+        self.assertEqual(1, mock_features.call_count)
+
+    @mock.patch('mycity.utilities.gis_utils.get_features_from_feature_server',
+                side_effect=BadAPIResponse)
+    def test_failed_fetch_gives_an_apology(self, _):
+        response = farmers_market_intent.get_farmers_markets_today(
+            self.request)
+        self.assertEqual("Hmm something went wrong. Maybe try again?",
+                         response.output_speech)
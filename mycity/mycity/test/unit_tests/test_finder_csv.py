@@ -1,5 +1,9 @@
+import unittest.mock as mock
 import mycity.test.unit_tests.base as base
+import mycity.utilities.deadline as deadline
+import mycity.utilities.finder.Finder as Finder
 from mycity.utilities.finder.FinderCSV import FinderCSV
+from mycity.utilities.finder.RecordStore import RecordStore
 
 
 class FinderCSVTestCase(base.BaseTestCase):
@@ -38,3 +42,214 @@ class FinderCSVTestCase(base.BaseTestCase):
             {'MissingKeys': 'Address, name, distance'}
         )
         self.assertEqual(self.finder.ERROR_MESSAGE, self.finder.output_speech)
+
+
+class FinderCSVDownloadFailureTestCase(base.BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.finder = FinderCSV(self.request, "www.fake.com", "Address",
+                                "{Address}", lambda keys: keys,
+                                origin_coordinates={'x': -71.0, 'y': 42.3})
+
+    @mock.patch('mycity.utilities.dataset_fetch.fetch_dataset',
+                return_value=None)
+    def test_failed_download_gives_no_records(self, mock_fetch):
+        self.assertEqual(0, len(self.finder.get_records()))
+
+    @mock.patch.object(Finder.arcgis_utils, 'find_closest_route')
+    @mock.patch('mycity.utilities.dataset_fetch.fetch_dataset',
+                return_value=None)
+    def test_failed_download_answers_with_error_message(self, mock_fetch,
+                                                        mock_route):
+        self.finder.start()
+        self.assertEqual(Finder.Finder.ERROR_MESSAGE,
+                         self.finder.get_output_speech())
+        mock_route.assert_not_called()
+
+
+class FinderNearestDestinationsTestCase(base.BaseTestCase):
+
+    ORIGIN = {'x': -71.0589, 'y': 42.3601}
+    RECORDS = [
+        {'X': '-71.0600', 'Y': '42.3600', 'Address': 'Closest'},
+        {'X': '-71.2000', 'Y': '42.2500', 'Address': 'Far'},
+        {'X': '-71.0700', 'Y': '42.3500', 'Address': 'Second'},
+        {'X': '', 'Y': '', 'Address': 'No coordinates'},
+        {'X': '-71.1000', 'Y': '42.3300', 'Address': 'Third'},
+    ]
+
+    def setUp(self):
+        super().setUp()
+        self.finder = FinderCSV(self.request, "www.fake.com", "Address",
+                                "{Address}", lambda keys: keys,
+                                origin_coordinates=self.ORIGIN)
+        self.store = RecordStore(self.RECORDS, "Address")
+
+    def test_keeps_the_closest_destinations(self):
+        self.finder.max_destinations = 2
+        nearest = self.finder.nearest_rows(self.store)
+        self.assertEqual(['Closest', 'Second'],
+                         [self.store.address(row) for row in nearest])
+
+    def test_no_limit_keeps_every_destination(self):
+        self.finder.max_destinations = None
+        self.assertEqual([0, 1, 2, 4], self.finder.nearest_rows(self.store))
+
+    @mock.patch.object(Finder.arcgis_utils, 'find_closest_route')
+    def test_only_nearest_destinations_are_routed(self, mock_route):
+        mock_route.return_value = {'Address': 'Closest Boston, MA',
+                                   'Driving_time': '1 minutes',
+                                   'Driving_distance': '0.1 miles'}
+        self.finder.max_destinations = 3
+        self.finder._start([dict(record) for record in self.RECORDS])
+        destinations = mock_route.call_args[0][2]
+        self.assertEqual(['Closest Boston, MA', 'Second Boston, MA',
+                          'Third Boston, MA'], list(destinations.values()))
+        self.assertEqual('Closest Boston, MA', self.finder.output_speech)
+
+
+class FinderTravelModeTestCase(base.BaseTestCase):
+
+    ORIGIN = {'x': -71.0589, 'y': 42.3601}
+    DESTINATIONS = {('-71.0600', '42.3600'): 'Closest Boston, MA',
+                    ('-71.1000', '42.3300'): 'Far Boston, MA'}
+    ROUTED = {'Address': 'Far Boston, MA',
+              'Driving_time': '3 minutes',
+              'Driving_distance': '1.2 miles'}
+
+    def setUp(self):
+        super().setUp()
+        self.finder = FinderCSV(self.request, "www.fake.com", "Address",
+                                "{Address}", lambda keys: keys,
+                                origin_coordinates=self.ORIGIN)
+
+    @mock.patch.object(Finder.arcgis_utils, 'find_closest_route')
+    def test_routed_answer_is_used_when_available(self, mock_route):
+        mock_route.return_value = self.ROUTED
+        self.assertEqual(self.ROUTED, self.finder.find_closest_destination(
+            self.DESTINATIONS))
+
+    @mock.patch.object(Finder.arcgis_utils, 'find_closest_route',
+                       return_value=None)
+    def test_failed_routing_falls_back_to_estimate(self, mock_route):
+        closest = self.finder.find_closest_destination(self.DESTINATIONS)
+        self.assertEqual('Closest Boston, MA', closest['Address'])
+        self.assertTrue(closest['Driving_time'].startswith('about '))
+
+    @mock.patch.object(Finder.arcgis_utils, 'find_closest_route',
+                       side_effect=ConnectionError)
+    def test_routing_error_falls_back_to_estimate(self, mock_route):
+        closest = self.finder.find_closest_destination(self.DESTINATIONS)
+        self.assertEqual('Closest Boston, MA', closest['Address'])
+
+    @mock.patch.object(Finder.arcgis_utils, 'find_closest_route')
+    def test_tight_deadline_skips_routing(self, mock_route):
+        self.finder.deadline = deadline.Deadline(0.5)
+        closest = self.finder.find_closest_destination(self.DESTINATIONS)
+        self.assertEqual('Closest Boston, MA', closest['Address'])
+        mock_route.assert_not_called()
+
+    @mock.patch.object(Finder.arcgis_utils, 'find_closest_route')
+    def test_estimated_mode_never_routes(self, mock_route):
+        self.finder.travel_mode = Finder.Finder.ESTIMATED
+        closest = self.finder.find_closest_destination(self.DESTINATIONS)
+        self.assertEqual('Closest Boston, MA', closest['Address'])
+        mock_route.assert_not_called()
+
+    @mock.patch.object(Finder.arcgis_utils, 'find_closest_route',
+                       return_value=None)
+    def test_routed_mode_reports_failure(self, mock_route):
+        self.finder.travel_mode = Finder.Finder.ROUTED
+        self.finder._start([{'X': '-71.0600', 'Y': '42.3600',
+                             'Address': 'Closest'}])
+        self.assertEqual(Finder.Finder.ERROR_MESSAGE,
+                         self.finder.output_speech)
+
+    @mock.patch.object(Finder.arcgis_utils, 'generate_access_token')
+    def test_access_token_is_only_fetched_to_route(self, mock_token):
+        self.finder.travel_mode = Finder.Finder.ESTIMATED
+        with mock.patch.object(self.finder, 'get_records', return_value=[
+                {'X': '-71.1000', 'Y': '42.3300', 'Address': 'Far'}]):
+            self.finder.start()
+        mock_token.assert_not_called()
+        self.assertEqual('Far Boston, MA', self.finder.get_output_speech())
+
+    @mock.patch.object(Finder.arcgis_utils, 'find_closest_route')
+    @mock.patch.object(Finder.arcgis_utils, 'generate_access_token',
+                       return_value='token')
+    def test_access_token_is_fetched_when_starting(self, mock_token,
+                                                   mock_route):
+        mock_route.return_value = self.ROUTED
+        mock_token.assert_not_called()
+        with mock.patch.object(self.finder, 'get_records', return_value=[
+                {'X': '-71.1000', 'Y': '42.3300', 'Address': 'Far'}]):
+            self.finder.start()
+        mock_token.assert_called_once()
+        self.assertEqual('token', mock_route.call_args[0][0])
+
+
+class FinderRankedResultsTestCase(base.BaseTestCase):
+
+    ORIGIN = {'x': -71.0589, 'y': 42.3601}
+    RECORDS = [
+        {'X': '-71.0600', 'Y': '42.3600', 'Address': 'Closest',
+         'Name': 'Lot A', 'Spaces': '10'},
+        {'X': '-71.0700', 'Y': '42.3500', 'Address': 'Second',
+         'Name': 'Lot B', 'Spaces': '20'},
+        {'X': '-71.1000', 'Y': '42.3300', 'Address': 'Third',
+         'Name': 'Lot C', 'Spaces': ''},
+    ]
+    ROUTES = [{'Address': 'Second Boston, MA', 'Driving_time': '2 minutes',
+               'Driving_distance': '0.5 miles'},
+              {'Address': 'Closest Boston, MA', 'Driving_time': '3 minutes',
+               'Driving_distance': '0.6 miles'}]
+
+    def setUp(self):
+        super().setUp()
+        self.finder = FinderCSV(self.request, "www.fake.com", "Address",
+                                "{Name} at {Address}, {Driving_time}",
+                                lambda keys: keys,
+                                origin_coordinates=self.ORIGIN)
+        self.finder.result_count = 3
+
+    @mock.patch.object(Finder.arcgis_utils, 'find_closest_route')
+    @mock.patch.object(Finder.arcgis_utils, 'find_closest_routes')
+    def test_ranked_results_come_from_one_routing_request(
+            self, mock_routes, mock_route):
+        mock_routes.return_value = self.ROUTES
+        self.finder._start([dict(record) for record in self.RECORDS])
+        mock_routes.assert_called_once()
+        mock_route.assert_not_called()
+        self.assertEqual(3, mock_routes.call_args[0][3])
+        self.assertEqual('Lot B at Second Boston, MA, 2 minutes',
+                         self.finder.get_output_speech())
+        self.assertEqual(['Lot B', 'Lot A'],
+                         [record['Name']
+                          for record in self.finder.ranked_records])
+
+    @mock.patch.object(Finder.arcgis_utils, 'find_closest_routes')
+    def test_ranked_results_keep_only_the_speech_fields(self, mock_routes):
+        mock_routes.return_value = self.ROUTES
+        self.finder._start([dict(record) for record in self.RECORDS])
+        ranked_results = self.finder.get_ranked_results()
+        self.assertEqual({
+            'fields': ['Address', 'Driving_time', 'Name'],
+            'rows': [['Second Boston, MA', '2 minutes', 'Lot B'],
+                     ['Closest Boston, MA', '3 minutes', 'Lot A']],
+        }, ranked_results)
+        self.assertEqual({'Address': 'Closest Boston, MA',
+                          'Driving_time': '3 minutes', 'Name': 'Lot A'},
+                         Finder.Finder.get_ranked_result(ranked_results, 1))
+        self.assertIsNone(Finder.Finder.get_ranked_result(ranked_results,
+                                                          2))
+
+    @mock.patch.object(Finder.arcgis_utils, 'find_closest_routes',
+                       return_value=None)
+    def test_failed_routing_ranks_estimates(self, mock_routes):
+        self.finder._start([dict(record) for record in self.RECORDS])
+        self.assertEqual(['Lot A', 'Lot B', 'Lot C'],
+                         [record['Name']
+                          for record in self.finder.ranked_records])
+        self.assertTrue(self.finder.ranked_records[0]['Driving_time']
+                        .startswith('about '))
@@ -0,0 +1,65 @@
+import unittest.mock as mock
+
+import mycity.test.unit_tests.base as base
+import mycity.utilities.arcgis_utils as arcgis_utils
+from mycity.utilities.finder.FinderGIS import FinderGIS
+
+URL = 'https://fake.arcgis.com/FeatureServer/0'
+ORIGIN = {'x': -71.0589, 'y': 42.3601}
+OUTPUT_SPEECH = 'The closest is {Name} at {Address}, {' + \
+    arcgis_utils.DRIVING_TIME_TEXT_KEY + '} away.'
+FEATURES = [
+    {'attributes': {'Name': 'Lot A', 'Address': '1 City Hall Sq'},
+     'geometry': {'x': -71.0600, 'y': 42.3600}},
+    {'attributes': {'Name': 'Lot B', 'Address': '2 Main St'},
+     'geometry': {'x': -71.0700, 'y': 42.3500}},
+]
+
+
+class FinderGISTestCase(base.BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.finder = FinderGIS(self.request, URL, 'Address', OUTPUT_SPEECH,
+                                None, origin_coordinates=ORIGIN)
+        get_patcher = mock.patch(
+            'mycity.utilities.arcgis_utils.http_utils.get')
+        self.mock_get = get_patcher.start()
+        self.addCleanup(get_patcher.stop)
+
+    def test_query_is_narrowed_to_the_origin_and_speech_fields(self):
+        self.mock_get.return_value = self._mock_response(
+            json_data={'features': FEATURES})
+        store = self.finder.get_records()
+        params = self.mock_get.call_args[1]['params']
+        self.assertEqual('Address,Name', params['outFields'])
+        self.assertEqual('true', params['returnGeometry'])
+        self.assertEqual('-71.0589,42.3601', params['geometry'])
+        self.assertEqual(FinderGIS.SEARCH_RADIUS_METERS, params['distance'])
+        self.assertEqual('esriSpatialRelIntersects', params['spatialRel'])
+        self.assertEqual({'Name': 'Lot A', 'X': -71.06, 'Y': 42.36,
+                          'Address': '1 City Hall Sq Boston, MA'},
+                         store.record(0))
+        self.assertEqual(2, len(store))
+
+    def test_coordinate_fields_replace_the_geometry(self):
+        self.finder.coordinate_fields = ('POINT_X', 'POINT_Y')
+        self.mock_get.return_value = self._mock_response(json_data={
+            'features': [{'attributes': {'Name': 'Lot A',
+                                         'Address': '1 City Hall Sq',
+                                         'POINT_X': -71.06,
+                                         'POINT_Y': 42.36}}]})
+        store = self.finder.get_records()
+        params = self.mock_get.call_args[1]['params']
+        self.assertEqual('false', params['returnGeometry'])
+        self.assertEqual('Address,Name,POINT_X,POINT_Y', params['outFields'])
+        self.assertEqual([0], store.rows_with_coordinates())
+
+    def test_every_feature_is_asked_for_when_none_is_near(self):
+        self.mock_get.side_effect = [
+            self._mock_response(json_data={'features': []}),
+            self._mock_response(json_data={'features': FEATURES})]
+        store = self.finder.get_records()
+        self.assertEqual(2, self.mock_get.call_count)
+        self.assertNotIn('geometry', self.mock_get.call_args[1]['params'])
+        self.assertEqual(2, len(store))
@@ -0,0 +1,81 @@
+import unittest.mock as mock
+
+import mycity.intents.food_truck_intent as food_truck_intent
+import mycity.test.test_constants as test_constants
+import mycity.test.unit_tests.base as base
+import mycity.utilities.food_truck_utils as food_truck_utils
+from mycity.intents.custom_errors import BadAPIResponse
+
+# Boston Medical Center, where the mock's Monday truck parks
+ORIGIN = {'x': -71.0731, 'y': 42.3367}
+
+
+def _stop(truck, day, x, y):
+    return {'attributes': {'Truck': truck, 'Day': day},
+            'geometry': {'x': x, 'y': y}}
+
+
+class FoodTruckScheduleTestCase(base.BaseTestCase):
+
+    def test_find_within_keeps_the_days_stops_in_the_radius(self):
+        schedule = food_truck_utils.FoodTruckSchedule([
+            _stop('far', 'Monday', -71.0731, 42.36),
+            _stop('near', 'Monday', -71.0731, 42.340),
+            _stop('nearest', 'Monday', -71.0735, 42.3368),
+            _stop('tuesday', 'Tuesday', -71.0731, 42.3367),
+            _stop('no location', 'Monday', None, None),
+        ])
+        found = schedule.find_within(ORIGIN, 'Monday')
+        self.assertEqual(['nearest', 'near'],
+                         [stop['attributes']['Truck'] for stop in found])
+        self.assertEqual([], schedule.find_within(ORIGIN, 'Sunday'))
+
+    def test_stops_in_neighboring_cells_are_found(self):
+        cell_edge = food_truck_utils.CELL_SIZE * -3555
+        schedule = food_truck_utils.FoodTruckSchedule([
+            _stop('east', 'Monday', cell_edge + 0.001, 42.35),
+            _stop('west', 'Monday', cell_edge - 0.001, 42.35),
+        ])
+        found = schedule.find_within({'x': cell_edge, 'y': 42.35}, 'Monday')
+        self.assertEqual({'east', 'west'},
+                         {stop['attributes']['Truck'] for stop in found})
+
+    @mock.patch('mycity.utilities.gis_utils.get_features_from_feature_server')
+    def test_snapshot_is_fetched_once(self, mock_features):
+        mock_features.return_value = test_constants.GET_FOOD_TRUCKS_MOCK
+        with mock.patch('mycity.intents.food_truck_intent.date.get_day',
+                        return_value='Monday'):
+            first = food_truck_intent.get_truck_locations(ORIGIN)
+            second = food_truck_intent.get_truck_locations(ORIGIN)
+        self.assertEqual(['Taco Don Beto'],
+                         [stop['attributes']['Truck'] for stop in first])
+        self.assertEqual(first, second)
+        self.assertEqual(1, mock_features.call_count)
+
+    @mock.patch('mycity.utilities.gis_utils.get_features_from_feature_server')
+    def test_day_is_taken_when_the_request_is_made(self, mock_features):
+        mock_features.return_value = test_constants.GET_FOOD_TRUCKS_MOCK
+        with mock.patch('mycity.intents.food_truck_intent.date.get_day',
+                        return_value='Monday'):
+            monday = food_truck_intent.get_truck_locations(ORIGIN)
+        with mock.patch('mycity.intents.food_truck_intent.date.get_day',
+                        return_value='Tuesday'):
+            tuesday = food_truck_intent.get_truck_locations(ORIGIN)
+        self.assertEqual('Monday', monday[0]['attributes']['Day'])
+        self.assertTrue(all(stop['attributes']['Day'] == 'Tuesday'
+                            for stop in tuesday))
+
+    @mock.patch('mycity.intents.food_truck_intent.gis_utils.'
+                'get_features_from_feature_server')
+    @mock.patch('mycity.utilities.food_truck_utils.get_food_truck_schedule',
+                side_effect=BadAPIResponse)
+    def test_feature_server_is_queried_without_a_snapshot(self, _,
+                                                          mock_features):
+        mock_features.return_value = test_constants.GET_FOOD_TRUCKS_MOCK
+        with mock.patch('mycity.intents.food_truck_intent.date.get_day',
+                        return_value='Tuesday'):
+            found = food_truck_intent.get_truck_locations(ORIGIN)
+        self.assertEqual({'Tuesday'},
+                         {stop['attributes']['Day'] for stop in found})
+        self.assertEqual(ORIGIN['x'], float(
+            mock_features.call_args[0][1]['geometry'].split(',')[0]))
@@ -1,6 +1,11 @@
+import os
 import unittest.mock as mock
+import mycity.benchmarks.cold_start as cold_start
 import mycity.test.test_constants as test_constants
 import mycity.test.unit_tests.base as base
+from mycity.intents.custom_errors import BadAPIResponse, \
+    MultipleAddressError
+import mycity.utilities.arcgis_utils as arcgis_utils
 import mycity.utilities.gis_utils as gis_utils
 
 
@@ -15,6 +20,115 @@ class GISUtilitiesTestCase(base.BaseTestCase):
         for address in to_test:
             self.assertTrue(address.find("Boston, MA"))
 
+    @mock.patch('mycity.utilities.arcgis_utils.http_utils.get')
+    def test_geocode_address_returns_confident_location(self, mock_get):
+        top_candidate = \
+            test_constants.GEOCODE_ADDRESS_CANDIDATES['candidates'][0]
+        mock_get.return_value = self._mock_response(
+            json_data={'candidates': [top_candidate]})
+        location = gis_utils.geocode_address("1000 Dorchester Ave")
+        self.assertEqual(top_candidate['location'], location)
+        params = mock_get.call_args[1]['params']
+        self.assertEqual("1000 Dorchester Ave, City:Boston, State:Ma",
+                         params['singleLine'])
+
+    @mock.patch('mycity.utilities.arcgis_utils.http_utils.get')
+    def test_geocode_address_with_several_confident_matches(self, mock_get):
+        mock_get.return_value = self._mock_response(
+            json_data=test_constants.GEOCODE_ADDRESS_CANDIDATES)
+        with self.assertRaises(MultipleAddressError) as context:
+            gis_utils.geocode_address("Dorchester Ave")
+        self.assertEqual({' 02125', ' 02122'}, context.exception.addresses)
+
+    @mock.patch('mycity.utilities.arcgis_utils.http_utils.get')
+    def test_geocode_is_shared_by_spellings_of_an_address(self, mock_get):
+        top_candidate = \
+            test_constants.GEOCODE_ADDRESS_CANDIDATES['candidates'][0]
+        mock_get.return_value = self._mock_response(
+            json_data={'candidates': [top_candidate]})
+        gis_utils.geocode_address("1000 Dorchester Ave")
+        self.assertTrue(gis_utils.geocode_addr("1000 dorchester avenue boston",
+                                               'Boston Metro Area'))
+        candidates = arcgis_utils.geocode_address_candidates(
+            "1000 DORCHESTER AVE Boston MA")
+        self.assertEqual(top_candidate['location'],
+                         candidates['candidates'][0]['location'])
+        self.assertEqual(1, mock_get.call_count)
+
+    @mock.patch('mycity.utilities.arcgis_utils.http_utils.get')
+    def test_ambiguous_geocode_is_cached_for_negative_ttl(self, mock_get):
+        mock_get.return_value = self._mock_response(
+            json_data=test_constants.GEOCODE_ADDRESS_CANDIDATES)
+        geocode_cache = arcgis_utils._geocode_single_line.cache
+        now = [1000.0]
+        with mock.patch.object(geocode_cache, '_clock', lambda: now[0]):
+            for _ in range(2):
+                with self.assertRaises(MultipleAddressError) as context:
+                    gis_utils.geocode_address("Dorchester Ave")
+                self.assertEqual({' 02125', ' 02122'},
+                                 context.exception.addresses)
+            self.assertEqual(1, mock_get.call_count)
+            now[0] += arcgis_utils.GEOCODE_NEGATIVE_TTL + 1
+            with self.assertRaises(MultipleAddressError):
+                gis_utils.geocode_address("Dorchester Ave")
+        self.assertEqual(2, mock_get.call_count)
+
+    @mock.patch('mycity.utilities.arcgis_utils.http_utils.get')
+    def test_get_features_from_feature_server_follows_pages(self, mock_get):
+        first_page = {'features': test_constants.PARKING_LOT_FEATURES[:2],
+                      'exceededTransferLimit': True}
+        second_page = {'features': test_constants.PARKING_LOT_FEATURES[2:]}
+        mock_get.side_effect = [self._mock_response(json_data=first_page),
+                                self._mock_response(json_data=second_page)]
+        features = gis_utils.get_features_from_feature_server(
+            'https://fake.arcgis.com/FeatureServer/0',
+            {'where': '1=1', 'out_sr': '4326'})
+        self.assertEqual(test_constants.PARKING_LOT_FEATURES, features)
+        first_params = mock_get.call_args_list[0][1]['params']
+        second_params = mock_get.call_args_list[1][1]['params']
+        self.assertEqual('4326', first_params['outSR'])
+        self.assertEqual(2, second_params['resultOffset'])
+
+    @mock.patch('mycity.utilities.arcgis_utils.http_utils.get')
+    def test_iter_features_requests_pages_as_they_are_used(self, mock_get):
+        first_page = {'features': test_constants.PARKING_LOT_FEATURES[:2],
+                      'exceededTransferLimit': True}
+        second_page = {'features': test_constants.PARKING_LOT_FEATURES[2:]}
+        mock_get.side_effect = [self._mock_response(json_data=first_page),
+                                self._mock_response(json_data=second_page)]
+        features = gis_utils.iter_features_from_feature_server(
+            'https://fake.arcgis.com/FeatureServer/0', '1=1')
+        self.assertEqual(0, mock_get.call_count)
+        self.assertEqual(test_constants.PARKING_LOT_FEATURES[0],
+                         next(features))
+        self.assertEqual(1, mock_get.call_count)
+        self.assertEqual(test_constants.PARKING_LOT_FEATURES[1:],
+                         list(features))
+        self.assertEqual(2, mock_get.call_count)
+
+    def test_distance_query(self):
+        query = gis_utils.distance_query({'x': -71.0589, 'y': 42.3601}, 800)
+        self.assertEqual('-71.0589,42.3601', query['geometry'])
+        self.assertEqual(800, query['distance'])
+        self.assertEqual('esriSRUnit_Meter', query['units'])
+
+    @mock.patch('mycity.utilities.arcgis_utils.http_utils.get')
+    def test_arcgis_error_body_raises_bad_api_response(self, mock_get):
+        mock_get.return_value = self._mock_response(
+            json_data={'error': {'code': 400, 'message': 'Invalid'}})
+        with self.assertRaises(BadAPIResponse):
+            gis_utils.reverse_geocode_addr([-71.05, 42.31])
+
+    def test_calculate_distance(self):
+        origin = {'x': -71.056769, 'y': 42.316466}
+        feature = {'geometry': {'x': -71.0589, 'y': 42.3601}}
+        distance = gis_utils.calculate_distance(origin, feature)
+        self.assertAlmostEqual(4856, distance, delta=25)
+
+    def test_cold_import_of_lambda_function_has_no_network_calls(self):
+        run = cold_start.run_cold_import(os.getcwd())
+        self.assertEqual([], run['network_attempts'])
+
     ####################################################################
     # Tests that should only be run if we're connected to the Internet #
     ####################################################################
@@ -0,0 +1,97 @@
+import http.server
+import tempfile
+import threading
+import requests
+import mycity.test.unit_tests.base as base
+import mycity.utilities.arcgis_utils as arcgis_utils
+import mycity.utilities.http_replay as http_replay
+import mycity.utilities.http_utils as http_utils
+
+
+class _JSONHandler(http.server.BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        body = b'{"path": "' + self.path.encode('utf-8') + b'"}'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class HTTPReplayTestCase(base.BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.TemporaryDirectory()
+        self.sleeps = []
+
+    def tearDown(self):
+        http_utils.close_sessions()
+        self.directory.cleanup()
+        super().tearDown()
+
+    def _record(self, params):
+        server = http.server.HTTPServer(('127.0.0.1', 0), _JSONHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = 'http://127.0.0.1:{}/layer'.format(server.server_port)
+        try:
+            with http_replay.recording(self.directory.name) as recorder:
+                recorded = http_utils.get(url, params=params)
+        finally:
+            http_utils.close_sessions()
+            server.shutdown()
+            server.server_close()
+        self.assertEqual(1, recorder.calls)
+        return url, recorded
+
+    def test_recorded_response_is_replayed_offline(self):
+        url, recorded = self._record({'where': '1=1', 'f': 'json'})
+        with http_replay.replaying(self.directory.name, latency=0.05,
+                                   sleep=self.sleeps.append) as replay:
+            replayed = http_utils.get(url, params={'f': 'json',
+                                                   'where': '1=1'})
+        self.assertEqual(200, replayed.status_code)
+        self.assertEqual(recorded.json(), replayed.json())
+        self.assertEqual('application/json',
+                         replayed.headers['content-type'])
+        self.assertEqual([0.05], self.sleeps)
+        self.assertEqual(1, replay.calls)
+
+    def test_unrecorded_request_raises_in_strict_mode(self):
+        with http_replay.replaying(self.directory.name) as replay:
+            with self.assertRaises(http_replay.UnrecordedRequestError):
+                http_utils.get('https://data.boston.gov/api')
+        self.assertEqual(1, replay.misses)
+
+    def test_unrecorded_request_is_unavailable_otherwise(self):
+        with http_replay.replaying(self.directory.name, strict=False):
+            response = http_utils.get('https://data.boston.gov/api')
+        self.assertEqual(503, response.status_code)
+
+    def test_latency_longer_than_timeout_times_out(self):
+        url, _ = self._record({})
+        with http_replay.replaying(self.directory.name, latency=5,
+                                   sleep=self.sleeps.append):
+            with self.assertRaises(requests.exceptions.ReadTimeout):
+                http_utils.get(url, params={}, timeout=(1, 2))
+        self.assertEqual([2], self.sleeps)
+
+    def test_multipart_boundary_does_not_change_the_key(self):
+        params = {'f': 'json', 'incidents': '1,2'}
+        url = arcgis_utils.ARCGIS_CLOSEST_FACILITY_URL
+        keys = set()
+        for _ in range(2):
+            body, headers = \
+                arcgis_utils.format_multipart_form_request(url, params)
+            keys.add(http_replay.request_key('POST', url, data=body,
+                                             headers=headers))
+        self.assertEqual(1, len(keys))
+
+    def test_transport_is_removed_after_the_block(self):
+        with http_replay.replaying(self.directory.name):
+            pass
+        self.assertIsNone(http_utils.set_transport(None))
@@ -0,0 +1,105 @@
+import http.server
+import threading
+import time
+import unittest.mock as mock
+import requests
+import mycity.test.unit_tests.base as base
+import mycity.utilities.deadline as deadline_utils
+import mycity.utilities.http_utils as http_utils
+from mycity.intents.custom_errors import DeadlineExceededError
+
+
+class _KeepAliveHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        body = b'ok'
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _SlowHandler(_KeepAliveHandler):
+
+    def do_GET(self):
+        time.sleep(1)
+        super().do_GET()
+
+
+class HTTPUtilitiesTestCase(base.BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        http_utils.close_sessions()
+
+    def tearDown(self):
+        http_utils.close_sessions()
+        super().tearDown()
+
+    def test_session_is_shared_per_host(self):
+        first = http_utils.get_session('https://geocode.arcgis.com/a')
+        second = http_utils.get_session('https://geocode.arcgis.com/b?c=d')
+        other_host = http_utils.get_session('https://data.boston.gov/a')
+        self.assertIs(first, second)
+        self.assertIsNot(first, other_host)
+
+    def test_default_timeout_is_applied(self):
+        session = http_utils.get_session('https://data.boston.gov/')
+        with mock.patch.object(session, 'request') as mock_request:
+            http_utils.get('https://data.boston.gov/api', {'limit': 1})
+        mock_request.assert_called_once_with(
+            'GET', 'https://data.boston.gov/api', params={'limit': 1},
+            timeout=http_utils.DEFAULT_TIMEOUT)
+
+    def test_explicit_timeout_is_kept(self):
+        session = http_utils.get_session('https://data.boston.gov/')
+        with mock.patch.object(session, 'request') as mock_request:
+            http_utils.post('https://data.boston.gov/api', 'body', timeout=1)
+        self.assertEqual(1, mock_request.call_args[1]['timeout'])
+
+    def test_connection_is_reused_across_requests(self):
+        server = http.server.HTTPServer(('127.0.0.1', 0), _KeepAliveHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            url = 'http://127.0.0.1:{}/'.format(server.server_port)
+            for _ in range(3):
+                self.assertEqual(200, http_utils.get(url).status_code)
+            stats = http_utils.get_connection_stats()[url.rstrip('/')]
+        finally:
+            http_utils.close_sessions()
+            server.shutdown()
+            server.server_close()
+        self.assertEqual({'requests': 3, 'connections': 1}, stats)
+
+    def _serve(self, handler):
+        server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        server.daemon_threads = True
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+
+        def stop():
+            http_utils.close_sessions()
+            server.shutdown()
+            server.server_close()
+        self.addCleanup(stop)
+        return 'http://127.0.0.1:{}/'.format(server.server_port)
+
+    def test_slow_response_raises_timeout(self):
+        url = self._serve(_SlowHandler)
+        with self.assertRaises(requests.exceptions.Timeout):
+            http_utils.get(url, timeout=0.2)
+
+    def test_slow_response_past_the_deadline_raises_deadline_exceeded(self):
+        url = self._serve(_SlowHandler)
+        token = deadline_utils.set_current_deadline(
+            deadline_utils.Deadline(0.3))
+        try:
+            with self.assertRaises(DeadlineExceededError):
+                http_utils.get(url)
+        finally:
+            deadline_utils.reset_current_deadline(token)
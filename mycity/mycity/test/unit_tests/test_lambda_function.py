@@ -4,6 +4,7 @@ import lambda_function as lambda_function
 
 import json
 import unittest
+import unittest.mock as mock
 
 class TestAlexaLambdaFunctionLocationServices(unittest.TestCase):
 
@@ -63,6 +64,15 @@ class TestAlexaLambdaFunctionLocationServices(unittest.TestCase):
         self.assertTrue("latitudeInDegrees" in mycity_request.geolocation_coordinates)
         self.assertTrue("longitudeInDegrees" in mycity_request.geolocation_coordinates)
 
+    @mock.patch('lambda_function.mycity_response_to_platform')
+    @mock.patch('lambda_function.execute_request')
+    def test_handler_creates_deadline_from_context(self, mock_execute, _):
+        context = mock.Mock()
+        context.get_remaining_time_in_millis.return_value = 3000
+        lambda_function.lambda_handler(self.alexa_request_json, context)
+        mycity_request = mock_execute.call_args[0][0]
+        self.assertLess(mycity_request.deadline.remaining(), 3)
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
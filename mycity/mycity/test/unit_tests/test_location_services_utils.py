@@ -6,6 +6,7 @@ import mycity.test.unit_tests.base as base
 import mycity.utilities.location_services_utils as location_services_utils
 
 import unittest
+import unittest.mock as mock
 
 class LocationServicesUtilsUnitTestCase(base.BaseTestCase):
 
@@ -70,6 +71,61 @@ class LocationServicesUtilsUnitTestCase(base.BaseTestCase):
         self.assertFalse(
             location_services_utils.is_location_in_city(None, coordinates))
 
+    @mock.patch.object(location_services_utils, 'is_location_in_city',
+                       return_value=True)
+    @mock.patch.object(location_services_utils.gis_utils, 'geocode_address',
+                       return_value={'x': -71.06, 'y': 42.32})
+    def test_resolved_location_is_reused_by_later_turns(self, mock_geocode,
+                                                        mock_in_city):
+        address = "46 Everdean St"
+        first_turn = MyCityRequestDataModel()
+        first_turn.session_attributes[intent_constants.CURRENT_ADDRESS_KEY] = \
+            address
+        location = location_services_utils.resolve_location(first_turn,
+                                                             address)
+        self.assertEqual({'x': -71.06, 'y': 42.32}, location.coordinates)
+        self.assertTrue(location.in_city)
+        self.assertEqual('Everdean', location.parsed_address['StreetName'])
+
+        second_turn = MyCityRequestDataModel()
+        second_turn.session_attributes = dict(first_turn.session_attributes)
+        location = location_services_utils.resolve_location(second_turn,
+                                                            address)
+        self.assertEqual({'x': -71.06, 'y': 42.32}, location.coordinates)
+        self.assertTrue(location.in_city)
+        mock_geocode.assert_called_once_with(address, None)
+        mock_in_city.assert_called_once_with(address, None, None)
+
+    @mock.patch.object(location_services_utils, 'is_location_in_city',
+                       return_value=True)
+    @mock.patch.object(location_services_utils.gis_utils, 'geocode_address',
+                       return_value={'x': -71.06, 'y': 42.32})
+    def test_new_address_is_resolved_again(self, mock_geocode, mock_in_city):
+        request = MyCityRequestDataModel()
+        location_services_utils.resolve_location(request, "46 Everdean St")
+        location_services_utils.resolve_location(request, "1 City Hall Sq")
+        self.assertEqual(2, mock_geocode.call_count)
+        self.assertEqual("1 City Hall Sq", request.resolved_location.address)
+
+    @mock.patch.object(location_services_utils, 'is_location_in_city',
+                       return_value=False)
+    def test_device_coordinates_are_resolved_without_geocoding(
+            self, mock_in_city):
+        request = MyCityRequestDataModel()
+        coordinates = {"latitudeInDegrees": 42.367084,
+                       "longitudeInDegrees": -71.105708}
+        with mock.patch.object(location_services_utils.gis_utils,
+                               'geocode_address') as mock_geocode:
+            location = location_services_utils.resolve_location(
+                request, None, coordinates)
+            location_services_utils.resolve_location(request, None,
+                                                     coordinates)
+        mock_geocode.assert_not_called()
+        mock_in_city.assert_called_once()
+        self.assertEqual({'x': -71.105708, 'y': 42.367084},
+                         location.coordinates)
+        self.assertFalse(location.in_city)
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
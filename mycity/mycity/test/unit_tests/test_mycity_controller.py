@@ -58,7 +58,7 @@ class MyCityControllerUnitTestCase(base.BaseTestCase):
         self.assertEqual(response.card_title, expected_card_title)
         self.assertIsNone(response.reprompt_text)
 
-    @mock.patch('mycity.mycity_controller.get_trash_day_info')
+    @mock.patch('mycity.intents.trash_intent.get_trash_day_info')
     def test_intent_that_needs_address_with_address_in_session_attributes(
             self,
             mock_intent
@@ -75,3 +75,16 @@ class MyCityControllerUnitTestCase(base.BaseTestCase):
         with self.assertRaises(ValueError):
             self.controller.on_intent(self.request)
 
+    def test_on_intent_records_handler_stats(self):
+        self.request.intent_name = "AMAZON.HelpIntent"
+        calls_before = \
+            self.controller.INTENT_HANDLERS.get_stats()["AMAZON.HelpIntent"]["calls"]
+        self.controller.on_intent(self.request)
+        stats = self.controller.INTENT_HANDLERS.get_stats()["AMAZON.HelpIntent"]
+        self.assertEqual(calls_before + 1, stats["calls"])
+        self.assertIsNotNone(stats["import_seconds"])
+
+    def test_every_registered_intent_resolves_to_a_function(self):
+        for intent_name in self.controller.INTENT_HANDLERS.get_stats():
+            self.assertTrue(
+                callable(self.controller.INTENT_HANDLERS.get_handler(intent_name)))
@@ -0,0 +1,56 @@
+import unittest.mock as mock
+
+import mycity.intents.intent_constants as intent_constants
+import mycity.intents.next_result_intent as next_result_intent
+import mycity.intents.speech_constants.next_result_intent as speech_constants
+import mycity.intents.speech_constants.snow_parking_intent as \
+    snow_parking_constants
+import mycity.test.unit_tests.base as base
+
+
+def _lot(name):
+    return [name + ' St Boston, MA', '0.5 miles', '2 minutes', '',
+            ' There is no fee. ', name, '', '10']
+
+
+class NextResultIntentTestCase(base.BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.request.session_attributes[
+            intent_constants.RANKED_RESULTS_KEY] = {
+                'intent': 'SnowParkingIntent',
+                'next': 1,
+                'fields': ['Address', 'Driving_distance', 'Driving_time',
+                           'Comments', 'Fee', 'Name', 'Phone', 'Spaces'],
+                'rows': [_lot('First'), _lot('Second'), _lot('Third')],
+            }
+
+    @mock.patch('mycity.utilities.http_utils.get')
+    def test_next_results_are_told_without_upstream_calls(self, mock_get):
+        response = next_result_intent.get_next_result(self.request)
+        self.assertTrue(response.output_speech.startswith(
+            'The next closest snow emergency parking lot, Second, is at '
+            'Second St Boston, MA.'))
+        self.assertTrue(response.output_speech.endswith(
+            snow_parking_constants.NEXT_PROMPT))
+        self.assertFalse(response.should_end_session)
+        self.assertEqual(snow_parking_constants.CARD_TITLE,
+                         response.card_title)
+
+        response = next_result_intent.get_next_result(self.request)
+        self.assertIn('Third St Boston, MA', response.output_speech)
+        self.assertTrue(response.output_speech.endswith(
+            speech_constants.NO_MORE_RESULTS_SPEECH))
+        self.assertTrue(response.should_end_session)
+        self.assertNotIn(intent_constants.RANKED_RESULTS_KEY,
+                         response.session_attributes)
+        mock_get.assert_not_called()
+
+    def test_next_without_a_search(self):
+        del self.request.session_attributes[
+            intent_constants.RANKED_RESULTS_KEY]
+        response = next_result_intent.get_next_result(self.request)
+        self.assertEqual(speech_constants.NO_NEXT_RESULT_SPEECH,
+                         response.output_speech)
+        self.assertFalse(response.should_end_session)
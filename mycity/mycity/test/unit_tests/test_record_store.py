@@ -0,0 +1,54 @@
+import mycity.test.unit_tests.base as base
+from mycity.utilities.finder.RecordStore import RecordStore
+
+
+class RecordStoreTestCase(base.BaseTestCase):
+
+    RECORDS = [
+        {'X': '-71.0600', 'Y': '42.3600', 'Address': 'Closest',
+         'Fee': 'No Charge'},
+        {'X': '-71.2000', 'Y': '42.2500', 'Address': 'Far',
+         'Fee': 'No Charge'},
+        {'X': '', 'Y': '', 'Address': 'No coordinates', 'Fee': '$5'},
+        {'X': '-71.0700', 'Y': '42.3500', 'Address': 'Second',
+         'Phone': '617-635-4500'},
+    ]
+    ORIGIN = {'x': -71.0589, 'y': 42.3601}
+
+    def setUp(self):
+        super().setUp()
+        self.store = RecordStore(self.RECORDS, 'Address', ' Boston, MA')
+
+    def test_records_are_rebuilt_with_the_address_suffix(self):
+        self.assertEqual(4, len(self.store))
+        self.assertEqual(['X', 'Y', 'Address', 'Fee', 'Phone'],
+                         self.store.fields)
+        self.assertEqual({'X': '-71.0700', 'Y': '42.3500',
+                          'Address': 'Second Boston, MA',
+                          'Phone': '617-635-4500'}, self.store.record(3))
+        self.assertEqual('Far', self.RECORDS[1]['Address'])
+
+    def test_repeated_strings_are_stored_once(self):
+        self.assertIs(self.store.value(0, 'Fee'), self.store.value(1, 'Fee'))
+
+    def test_nearest_rows_skip_rows_without_coordinates(self):
+        self.assertEqual([0, 3], self.store.nearest_rows(self.ORIGIN, 2))
+        self.assertEqual([0, 3, 1], self.store.nearest_rows(self.ORIGIN))
+        self.assertEqual([0, 1, 3], self.store.rows_with_coordinates())
+
+    def test_nearest_rows_skip_coordinates_that_are_not_numbers(self):
+        store = RecordStore([{'X': '-71.10', 'Y': '42.33', 'Address': 'A'},
+                             {'X': 'n/a', 'Y': '42.36', 'Address': 'B'},
+                             {'X': '-71.06', 'Y': '42.36', 'Address': 'C'}],
+                            'Address')
+        self.assertEqual([2, 0], store.nearest_rows(self.ORIGIN, 3))
+
+    def test_coordinate_dict_keeps_the_records_coordinates(self):
+        self.assertEqual({('-71.0700', '42.3500'): 'Second Boston, MA',
+                          ('-71.0600', '42.3600'): 'Closest Boston, MA'},
+                         self.store.coordinate_dict([3, 0]))
+
+    def test_rows_are_found_by_address(self):
+        self.assertEqual(2, self.store.row_for_address(
+            'No coordinates Boston, MA'))
+        self.assertIsNone(self.store.row_for_address('Nowhere'))
@@ -0,0 +1,67 @@
+import unittest.mock as mock
+
+import mycity.test.unit_tests.base as base
+import mycity.utilities.arcgis_utils as arcgis_utils
+import mycity.utilities.travel_time_utils as travel_time_utils
+
+CITY_HALL = {'x': -71.0578, 'y': 42.3603}
+# about 2.6 miles from City Hall in a straight line
+JFK_UMASS = {'x': -71.0524, 'y': 42.3207}
+
+
+class TravelTimeUtilsTestCase(base.BaseTestCase):
+
+    def test_estimate_is_longer_than_the_straight_line(self):
+        miles, minutes = travel_time_utils.estimate_travel(CITY_HALL,
+                                                           JFK_UMASS)
+        self.assertAlmostEqual(2.75 * travel_time_utils.CIRCUITY_FACTOR,
+                               miles, delta=0.2)
+        self.assertGreater(minutes, miles / 30 * 60)
+        self.assertLess(minutes, miles / 10 * 60 +
+                        travel_time_utils.TERMINAL_MINUTES)
+
+    def test_estimated_time_grows_with_distance(self):
+        times = [travel_time_utils.estimate_travel(
+            CITY_HALL, {'x': CITY_HALL['x'], 'y': CITY_HALL['y'] - offset})[1]
+            for offset in (0.001, 0.0144, 0.0146, 0.04, 0.1)]
+        self.assertEqual(sorted(times), times)
+
+    def test_matrix_entry_replaces_the_defaults(self):
+        entry = {'circuity': 2.0, 'mph': 30.0}
+        with mock.patch.object(travel_time_utils, '_matrix_entry',
+                               return_value=entry):
+            miles, minutes = travel_time_utils.estimate_travel(CITY_HALL,
+                                                               JFK_UMASS)
+        self.assertAlmostEqual(5.5, miles, delta=0.2)
+        self.assertAlmostEqual(miles / 30 * 60 +
+                               travel_time_utils.TERMINAL_MINUTES, minutes)
+
+    def test_estimate_closest_route_picks_the_shortest_time(self):
+        destinations = {
+            ('-71.0524', '42.3207'): 'JFK/UMass',
+            ('-71.0600', '42.3550'): 'Downtown Crossing',
+            ('', ''): 'Nowhere',
+        }
+        closest = travel_time_utils.estimate_closest_route(CITY_HALL,
+                                                           destinations)
+        self.assertEqual('Downtown Crossing', closest['Address'])
+        self.assertTrue(closest[arcgis_utils.DRIVING_TIME_TEXT_KEY]
+                        .startswith('about '))
+        self.assertTrue(closest[arcgis_utils.DRIVING_DISTANCE_TEXT_KEY]
+                        .endswith(' miles'))
+
+    def test_estimate_closest_routes_ranks_by_time(self):
+        destinations = {
+            ('-71.0524', '42.3207'): 'JFK/UMass',
+            ('-71.0600', '42.3550'): 'Downtown Crossing',
+            ('-71.0700', '42.3400'): 'South End',
+            ('', ''): 'Nowhere',
+        }
+        routes = travel_time_utils.estimate_closest_routes(CITY_HALL,
+                                                           destinations, 2)
+        self.assertEqual(['Downtown Crossing', 'South End'],
+                         [route['Address'] for route in routes])
+
+    def test_estimate_closest_route_without_coordinates(self):
+        self.assertIsNone(travel_time_utils.estimate_closest_route(
+            CITY_HALL, {('', ''): 'Nowhere'}))
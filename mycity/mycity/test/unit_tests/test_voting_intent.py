@@ -5,6 +5,7 @@ import mycity.utilities.voting_utils as vote_utils
 import mycity.intents.intent_constants as intent_constants
 from mycity.mycity_request_data_model import MyCityRequestDataModel
 from unittest.mock import patch
+import mycity.utilities.arcgis_utils as arcgis_utils
 from mycity.intents.custom_errors import ParseError
 
 
@@ -20,7 +21,7 @@ class VotingIntentTestCase(base.BaseTestCase):
         response = get_voting_location(mycity_request)
         self.assertTrue("read::alexa:device:all:address" in response.card_permissions)
 
-    @patch('mycity.intents.voting_intent.gis_utils.geocode_address')
+    @patch('mycity.utilities.gis_utils.geocode_address')
     @patch('mycity.intents.voting_intent.vote_utils.get_ward_precinct_info')
     @patch('mycity.intents.voting_intent.vote_utils.get_polling_location')
     def test_correct_voting_response(self, mock_poll_location, mock_ward, mock_geocode):
@@ -34,7 +35,7 @@ class VotingIntentTestCase(base.BaseTestCase):
         self.assertTrue(expected_text, response.output_speech)
 
 
-    @patch('mycity.intents.voting_intent.gis_utils.geocode_address')
+    @patch('mycity.utilities.gis_utils.geocode_address')
     @patch('mycity.intents.voting_intent.vote_utils.get_ward_precinct_info')
     def test_no_ward_voting_response(self, mock_ward, mock_geocode):
         mycity_request = MyCityRequestDataModel()
@@ -44,3 +45,44 @@ class VotingIntentTestCase(base.BaseTestCase):
         expected_text = "There doesn't seem to be information for that address in Boston"
         response = get_voting_location(mycity_request)
         self.assertTrue(expected_text, response.output_speech)
+
+    @patch('mycity.utilities.arcgis_utils.geocode')
+    @patch('mycity.intents.voting_intent.vote_utils.get_ward_precinct_info')
+    @patch('mycity.intents.voting_intent.vote_utils.get_polling_location')
+    def test_address_is_geocoded_once(self, mock_poll_location, mock_ward,
+                                      mock_geocode):
+        mock_geocode.return_value = [{
+            'address': '866 Huntington Ave, Boston, Massachusetts, 02115',
+            'location': {'x': -71.1057, 'y': 42.3332},
+            'score': 100,
+            'attributes': {'MetroArea': 'Boston Metro Area',
+                           'City': 'Boston'}}]
+        mock_ward.return_value = test_constants.WARD_PRECINCT
+        mock_poll_location.return_value = test_constants.POLL_DATA
+        mycity_request = MyCityRequestDataModel()
+        mycity_request.session_attributes[
+            intent_constants.CURRENT_ADDRESS_KEY] = "866 Huntington Avenue"
+        response = get_voting_location(mycity_request)
+        self.assertTrue(response.output_speech.startswith(
+            "Your polling location is"))
+        mock_geocode.assert_called_once_with(
+            "866 Huntington Ave, City:Boston, State:Ma",
+            arcgis_utils.GEOCODE_OUT_FIELDS)
+        mock_ward.assert_called_once_with({'x': -71.1057, 'y': 42.3332})
+
+    @patch('mycity.utilities.arcgis_utils.geocode')
+    @patch('mycity.intents.voting_intent.vote_utils.get_ward_precinct_info')
+    def test_no_poll_lookup_outside_boston(self, mock_ward, mock_geocode):
+        mock_geocode.return_value = [{
+            'address': '866 Huntington Ave, Springfield, Massachusetts',
+            'location': {'x': -72.58, 'y': 42.10},
+            'score': 100,
+            'attributes': {'MetroArea': 'Springfield Metro Area',
+                           'City': 'Springfield'}}]
+        mycity_request = MyCityRequestDataModel()
+        mycity_request.session_attributes[
+            intent_constants.CURRENT_ADDRESS_KEY] = "866 Huntington Avenue"
+        response = get_voting_location(mycity_request)
+        self.assertTrue(response.output_speech.startswith(
+            "This address is not in Boston"))
+        mock_ward.assert_not_called()
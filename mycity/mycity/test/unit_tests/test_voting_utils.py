@@ -1,8 +1,11 @@
+import os
+import tempfile
 import mycity.test.unit_tests.base as base
 import mycity.test.test_constants as test_constants
 import mycity.utilities.voting_utils as vote_utils
 import mycity.intents.intent_constants as intent_constants
 from unittest.mock import patch
+from mycity.intents.custom_errors import ParseError
 import requests
 
 
@@ -11,7 +14,7 @@ class VotingUtilitiesTestCase(base.BaseTestCase):
     def test_get_ward_precinct_info(self):
         mock_resp = self._mock_response(status=200, 
             json_data=test_constants.MOCK_WARD_PRECINCT_RESP)
-        mock_get_patcher = patch('mycity.utilities.voting_utils.requests.get')
+        mock_get_patcher = patch('mycity.utilities.voting_utils.http_utils.get')
         mock_get = mock_get_patcher.start()
 
         mock_get.return_value = mock_resp
@@ -23,9 +26,80 @@ class VotingUtilitiesTestCase(base.BaseTestCase):
     def test_get_polling_location(self):
         mock_resp = self._mock_response(status=200, 
             json_data=test_constants.MOCK_POLL_RESP)
-        mock_get_patcher = patch('mycity.utilities.voting_utils.requests.get')
+        mock_get_patcher = patch('mycity.utilities.voting_utils.http_utils.get')
         mock_get = mock_get_patcher.start()
         mock_get.return_value = mock_resp
         expected_output_text = test_constants.POLL_DATA
         result = vote_utils.get_polling_location(test_constants.WARD_PRECINCT)
         self.assertEqual(expected_output_text, result)
+
+
+def _square(x, y, size=0.01):
+    return [[x, y], [x, y + size], [x + size, y + size], [x + size, y],
+            [x, y]]
+
+
+class BundledVotingDataTestCase(base.BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        for name, file_name in (('PRECINCTS_PATH', 'precincts.geojson'),
+                                ('POLLING_LOCATIONS_PATH', 'polls.json')):
+            path_patcher = patch.object(
+                vote_utils, name, os.path.join(directory.name, file_name))
+            path_patcher.start()
+            self.addCleanup(path_patcher.stop)
+        self.addCleanup(setattr, vote_utils, '_data_loaded', False)
+        vote_utils._data_loaded = False
+
+        # ArcGIS rings: clockwise exteriors, counterclockwise holes
+        precincts = [
+            {'attributes': {'WARD_PRECINCT': '1008'},
+             'geometry': {'rings': [_square(-71.11, 42.32),
+                                    _square(-71.108, 42.322, 0.002)[::-1]]}},
+            {'attributes': {'WARD_PRECINCT': '1009'},
+             'geometry': {'rings': [_square(-71.108, 42.322, 0.002)]}},
+        ]
+        polls = [{'attributes': {'Ward': '10', 'Precinct': 8,
+                                 'Location2': 'BACK OF THE HILL APARTMENTS -',
+                                 'Location3': '100 SOUTH HUNTINGTON AVENUE.'}}]
+        with patch('mycity.utilities.voting_utils.arcgis_utils.'
+                   'query_feature_layer', side_effect=[precincts, polls]):
+            self.assertEqual((2, 1), vote_utils.refresh_voting_data(
+                precincts_path=vote_utils.PRECINCTS_PATH,
+                polling_locations_path=vote_utils.POLLING_LOCATIONS_PATH))
+
+    @patch('mycity.utilities.voting_utils.http_utils.get')
+    def test_lookups_are_answered_from_bundled_data(self, mock_get):
+        ward_precinct = vote_utils.get_ward_precinct_info(
+            test_constants.COORDS)
+        self.assertEqual(test_constants.WARD_PRECINCT, ward_precinct)
+        self.assertEqual(test_constants.POLL_DATA,
+                         vote_utils.get_polling_location(ward_precinct))
+        mock_get.assert_not_called()
+
+    def test_point_in_a_hole_is_in_the_inner_precinct(self):
+        self.assertEqual({'ward': '10', 'precinct': '09'},
+                         vote_utils.get_ward_precinct_info(
+                             {'x': -71.107, 'y': 42.323}))
+
+    def test_point_outside_every_precinct_raises_parse_error(self):
+        with self.assertRaises(ParseError):
+            vote_utils.get_ward_precinct_info({'x': -70.5, 'y': 42.0})
+
+    def test_precinct_without_polling_location_raises_parse_error(self):
+        with self.assertRaises(ParseError):
+            vote_utils.get_polling_location({'ward': '10', 'precinct': '09'})
+
+    def test_check_loads_the_bundled_files(self):
+        self.assertEqual((2, 1), vote_utils.check_voting_data(
+            vote_utils.PRECINCTS_PATH, vote_utils.POLLING_LOCATIONS_PATH))
+        vote_utils.main(['--check'])
+
+    def test_check_fails_without_the_bundled_files(self):
+        os.remove(vote_utils.POLLING_LOCATIONS_PATH)
+        with self.assertRaises(SystemExit) as context, patch('sys.stderr'):
+            vote_utils.main(['--check'])
+        self.assertEqual(1, context.exception.code)
@@ -0,0 +1,123 @@
+"""
+Reduces the many ways an address can be said or typed to one canonical form
+
+"46 everdean street boston ma", "46 Everdean St" and "46 EVERDEAN ST,
+Boston" all name the same place. Normalizing them to the same house number,
+street, street type, city and zip code lets the geocoding cache answer all
+of them with one upstream call.
+
+"""
+
+import collections
+import logging
+import re
+
+import usaddress
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CITY = 'Boston'
+DEFAULT_STATE = 'Ma'
+
+# USPS abbreviations of the street types and directions common in Boston
+STREET_TYPE_ABBREVIATIONS = {
+    'ALLEY': 'Aly',
+    'AVENUE': 'Ave',
+    'AV': 'Ave',
+    'BOULEVARD': 'Blvd',
+    'CIRCLE': 'Cir',
+    'COURT': 'Ct',
+    'DRIVE': 'Dr',
+    'HIGHWAY': 'Hwy',
+    'LANE': 'Ln',
+    'PARK': 'Park',
+    'PARKWAY': 'Pkwy',
+    'PLACE': 'Pl',
+    'PLAZA': 'Plz',
+    'ROAD': 'Rd',
+    'ROW': 'Row',
+    'SQUARE': 'Sq',
+    'STREET': 'St',
+    'TERRACE': 'Ter',
+    'WAY': 'Way',
+    'WHARF': 'Whf',
+}
+DIRECTION_ABBREVIATIONS = {
+    'NORTH': 'N',
+    'SOUTH': 'S',
+    'EAST': 'E',
+    'WEST': 'W',
+}
+
+_PUNCTUATION = re.compile(r"[^\w\s#/-]")
+
+NormalizedAddress = collections.namedtuple(
+    'NormalizedAddress',
+    ['number', 'street', 'street_type', 'city', 'state', 'zipcode'])
+
+
+def _clean(value):
+    return ' '.join(_PUNCTUATION.sub(' ', value).split())
+
+
+def _abbreviate(value, abbreviations):
+    value = _clean(value)
+    return abbreviations.get(value.upper(), value.title())
+
+
+def normalize_address(address, zipcode=None):
+    """
+    Parses an address into its canonical parts
+
+    :param address: single line address string
+    :param zipcode: zip code to use instead of one in the address
+    :return: NormalizedAddress, or None if no street could be found
+    """
+    try:
+        parts, _ = usaddress.tag(address)
+    except usaddress.RepeatedLabelError:
+        logger.debug('Could not parse address: %s', address)
+        return None
+    if not parts.get('StreetName'):
+        return None
+
+    # Types before the name, as in "Avenue de Lafayette", are part of it
+    street = ' '.join(
+        _abbreviate(parts[label], abbreviations)
+        for label, abbreviations in (
+            ('StreetNamePreModifier', {}),
+            ('StreetNamePreDirectional', DIRECTION_ABBREVIATIONS),
+            ('StreetNamePreType', STREET_TYPE_ABBREVIATIONS),
+            ('StreetName', DIRECTION_ABBREVIATIONS),
+            ('StreetNamePostDirectional', DIRECTION_ABBREVIATIONS))
+        if parts.get(label))
+    street_type = _abbreviate(parts.get('StreetNamePostType', ''),
+                              STREET_TYPE_ABBREVIATIONS)
+    zipcode = zipcode or parts.get('ZipCode')
+    city = _clean(parts.get('PlaceName', '')).title()
+    if not city and not zipcode:
+        city = DEFAULT_CITY
+    return NormalizedAddress(
+        number=_clean(parts.get('AddressNumber', '')),
+        street=street,
+        street_type=street_type,
+        city=city,
+        state=_clean(parts.get('StateName', '')).title() or DEFAULT_STATE,
+        zipcode=_clean(zipcode) if zipcode else '')
+
+
+def to_single_line(normalized):
+    """
+    Formats a normalized address as an ArcGIS single line query, with the
+    city or zip code passed as a category hint
+
+    :param normalized: NormalizedAddress
+    :return: String such as "46 Everdean St, City:Boston, State:Ma"
+    """
+    street = ' '.join(part for part in (normalized.number, normalized.street,
+                                        normalized.street_type) if part)
+    if normalized.zipcode:
+        return '{}, State:{}, Zone:{}'.format(street, normalized.state,
+                                              normalized.zipcode)
+    return '{}, City:{}, State:{}'.format(street, normalized.city,
+                                          normalized.state)
@@ -1,9 +1,16 @@
 import requests
+import contextvars
 import json
 import os
 import sys
+import threading
+import time
 import urllib
 import logging
+import mycity.utilities.address_normalization as address_normalization
+import mycity.utilities.cache as cache
+import mycity.utilities.http_utils as http_utils
+from mycity.intents.custom_errors import BadAPIResponse
 
 logger = logging.getLogger(__name__)
 
@@ -15,13 +22,145 @@ EMPTY_RECORD = ""
 ARCGIS_AUTH_URL = "https://www.arcgis.com/sharing/rest/oauth2/token"
 ARCGIS_CLOSEST_FACILITY_URL = "https://route.arcgis.com/arcgis/rest/services/World/ClosestFacility/NAServer/ClosestFacility_World/solveClosestFacility"
 ARCGIS_GEOCODE_URL = "https://geocode.arcgis.com/arcgis/rest/services/World/GeocodeServer/findAddressCandidates"
+ARCGIS_BATCH_GEOCODE_URL = "https://geocode.arcgis.com/arcgis/rest/services/World/GeocodeServer/geocodeAddresses"
+ARCGIS_REVERSE_GEOCODE_URL = "https://geocode.arcgis.com/arcgis/rest/services/World/GeocodeServer/reverseGeocode"
+MAX_GEOCODE_CANDIDATES = 20
+
+# Candidate attributes kept in the geocoding cache
+GEOCODE_OUT_FIELDS = "Match_addr,Addr_type,MetroArea,City"
+# Candidates scoring above this are confident matches
+CONFIDENT_SCORE = 95
+# Seconds a geocoded address is kept. Addresses with no single confident
+# candidate are kept for the shorter time, as they are the ones a user is
+# most likely to retry with more detail.
+GEOCODE_TTL = 86400
+GEOCODE_NEGATIVE_TTL = 900
+
+# Seconds before an access token expires that a new one is fetched in the
+# background, and the lifetime assumed when the server does not say
+TOKEN_REFRESH_MARGIN = 300
+DEFAULT_TOKEN_EXPIRES_IN = 7200
+# ArcGIS error codes for an expired or invalid token
+INVALID_TOKEN_ERROR_CODES = (498, 499)
+
+# Snake case keyword names accepted by the arcgis package's FeatureLayer.query
+# and the REST parameters they correspond to
+FEATURE_QUERY_PARAMETER_NAMES = {
+    'out_fields': 'outFields',
+    'out_sr': 'outSR',
+    'return_geometry': 'returnGeometry',
+    'result_offset': 'resultOffset',
+    'result_record_count': 'resultRecordCount',
+    'order_by_fields': 'orderByFields',
+    'geometry_type': 'geometryType',
+    'in_sr': 'inSR',
+    'spatial_rel': 'spatialRel',
+}
+
+
+class AccessTokenManager(object):
+    """
+    Keeps an ArcGIS access token for as long as it is valid, so every
+    invocation handled by the container shares one token instead of
+    fetching its own
 
+    A token close to expiry is still handed out while a background thread
+    fetches its replacement. Callers that find no valid token share one
+    fetch among them, and never wait on the background refresh.
 
-def generate_access_token():
+    @property: fetches ::= number of tokens fetched from ArcGIS
+    @property: reuses ::= number of times a kept token was handed out
+        instead of fetching one
+    """
+
+    def __init__(self, fetch, refresh_margin=TOKEN_REFRESH_MARGIN,
+                 clock=time.monotonic):
+        """
+        :param fetch: function returning a (token, seconds until it
+            expires) tuple, or None if no token could be fetched
+        :param refresh_margin: seconds before expiry a new token is fetched
+        :param clock: function returning the current time in seconds,
+            replaceable for tests
+        """
+        self._fetch = fetch
+        self._refresh_margin = refresh_margin
+        self._clock = clock
+        self._token = None
+        self._expires_at = 0
+        self._refreshing = False
+        self._lock = threading.Lock()
+        self._fetch_lock = threading.Lock()
+        self.fetches = 0
+        self.reuses = 0
+
+    def get_token(self):
+        """
+        :return: String containing a valid access token, or None if one
+            could not be fetched
+        """
+        with self._lock:
+            remaining = self._expires_at - self._clock()
+            if self._token is not None and remaining > 0:
+                self.reuses += 1
+                if remaining < self._refresh_margin and not self._refreshing:
+                    self._refreshing = True
+                    # in a copy of the caller's context, so the refresh is
+                    # bounded by the invocation's deadline
+                    context = contextvars.copy_context()
+                    threading.Thread(target=context.run,
+                                     args=(self._refresh,),
+                                     daemon=True).start()
+                return self._token
+        with self._fetch_lock:
+            # another caller may have fetched one while this one waited
+            with self._lock:
+                if self._token is not None and \
+                        self._expires_at > self._clock():
+                    self.reuses += 1
+                    return self._token
+            return self._load()
+
+    def invalidate(self, token=None):
+        """
+        Forgets the kept token, so the next get_token fetches a new one
+
+        :param token: only forget the kept token if it is this one, so a
+            caller holding an old token does not discard a newer one
+        :return: None
+        """
+        with self._lock:
+            if token is None or token == self._token:
+                self._token = None
+                self._expires_at = 0
+
+    def _load(self):
+        fetched = self._fetch()
+        with self._lock:
+            self.fetches += 1
+            if fetched is None:
+                return None
+            self._token, expires_in = fetched
+            self._expires_at = self._clock() + expires_in
+            return self._token
+
+    def _refresh(self):
+        # Without _fetch_lock: the kept token is still valid while this
+        # runs, and a caller finding it invalidated fetches its own
+        try:
+            self._load()
+        except Exception:
+            logger.debug('Background token refresh failed', exc_info=True)
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+
+def _request_access_token():
     """
-    Generates a temporary access token fro ArcGIS REST APIs
+    Requests a temporary access token for ArcGIS REST APIs
 
-    :return: String containing temporary access token
+    :return: tuple of (String containing temporary access token, seconds
+        until it expires), or None if the request failed
     """
     try:
         client_id = get_client_id()
@@ -36,7 +175,9 @@ def generate_access_token():
         if response.status_code == 200:
             response_json = response.json()
             access_token = response_json['access_token']
-            return access_token
+            expires_in = int(response_json.get('expires_in',
+                                               DEFAULT_TOKEN_EXPIRES_IN))
+            return access_token, expires_in
         else:
             logger.debug("Response Error: {}, Response: {}".format(str(response.status_code), response.text))
             return None
@@ -46,6 +187,39 @@ def generate_access_token():
         return None
 
 
+_access_token_manager = AccessTokenManager(_request_access_token)
+
+
+def generate_access_token():
+    """
+    Returns a temporary access token for ArcGIS REST APIs, shared by every
+    caller until shortly before it expires
+
+    :return: String containing temporary access token, or None if one
+        could not be fetched
+    """
+    return _access_token_manager.get_token()
+
+
+def invalidate_access_token(token=None):
+    """
+    Forgets the shared access token after ArcGIS rejected it
+
+    :param token: the rejected token
+    :return: None
+    """
+    _access_token_manager.invalidate(token)
+
+
+def get_access_token_stats():
+    """
+    :return: dictionary with the number of tokens fetched and the number of
+        fetches avoided by reusing a token
+    """
+    return {'fetches': _access_token_manager.fetches,
+            'reuses': _access_token_manager.reuses}
+
+
 def get_client_id():
     """
     Returns Client ID environment variable
@@ -83,6 +257,27 @@ def find_closest_route(api_access_token, origin_address, destination_addresses):
         and the associated address string as the values
     :return: Dictionary containing address, driving time and driving distance of closest destination
     """
+    routes = find_closest_routes(api_access_token, origin_address,
+                                 destination_addresses, 1)
+    return routes[0] if routes else None
+
+
+def find_closest_routes(api_access_token, origin_address,
+                        destination_addresses, count):
+    """
+    Finds the count closest routes, by driving time, given the coordinates
+    of an origin and possible destinations. All of them are solved in one
+    ClosestFacility request.
+
+    :param api_access_token: String containing temporary ArcGIS REST API access token
+    :param origin_address: Dictionary containing coordinates and address string of origin
+    :param destination_addresses: Dictionary with (x, y) coordinate values as the keys,
+        and the associated address string as the values
+    :param count: number of destinations wanted
+    :return: list of dictionaries containing address, driving time and
+        driving distance of the closest destinations, closest first, or None
+        if the routes could not be found
+    """
     logger.debug("api_access_token: {} ".format(api_access_token) \
                 + "origin_address: {} ".format(str(origin_address)) \
                 + "destination_addresses: {}".format(str(destination_addresses))
@@ -109,6 +304,8 @@ def find_closest_route(api_access_token, origin_address, destination_addresses):
             'incidents': incidents,
             'facilities': facilities
             }
+    if count > 1:
+        params['defaultTargetFacilityCount'] = str(count)
 
     body_as_string, updated_header = format_multipart_form_request(ARCGIS_CLOSEST_FACILITY_URL, params)
     # POST request over network
@@ -117,35 +314,46 @@ def find_closest_route(api_access_token, origin_address, destination_addresses):
     if response.status_code == 200:
         response_json = response.json()
         logger.debug("Response JSON: {}".format(str(response_json)))
+        if response_json.get('error', {}).get('code') in \
+                INVALID_TOKEN_ERROR_CODES:
+            invalidate_access_token(api_access_token)
+            return None
         try:
-            routes = response_json['routes']
-            features = routes['features']
-            attributes = features[0]['attributes']
-            facility_id = attributes['FacilityID']
-            travel_time_in_minutes = attributes['Total_TravelTime']
-            travel_distance_in_miles = attributes['Total_Miles']
+            features = response_json['routes']['features']
+            attributes_list = sorted(
+                (feature['attributes'] for feature in features),
+                key=lambda attributes: attributes.get('FacilityRank', 0))
+            routes = [(attributes['FacilityID'],
+                       attributes['Total_TravelTime'],
+                       attributes['Total_Miles'])
+                      for attributes in attributes_list[:count]]
         except KeyError as e:
             logger.debug(str(e))
             return None
+        if not routes:
+            return None
 
-        formatted_travel_time_in_minutes = _format_float(float(travel_time_in_minutes))
-        formatted_travel_distance_in_miles = _format_float(float(travel_distance_in_miles))
+        destinations = []
+        for facility_id, travel_time_in_minutes, travel_distance_in_miles \
+                in routes:
+            formatted_travel_time_in_minutes = _format_float(float(travel_time_in_minutes))
+            formatted_travel_distance_in_miles = _format_float(float(travel_distance_in_miles))
 
-        travel_time_string = "{} minutes".format(formatted_travel_time_in_minutes)
-        travel_distance_string = "{} miles".format(formatted_travel_distance_in_miles)
+            travel_time_string = "{} minutes".format(formatted_travel_time_in_minutes)
+            travel_distance_string = "{} miles".format(formatted_travel_distance_in_miles)
 
-        facility_key_index = int(facility_id) - 1
-        facility_key = facility_key_list[facility_key_index]
-        facility_address = destination_addresses[facility_key]
+            facility_key_index = int(facility_id) - 1
+            facility_key = facility_key_list[facility_key_index]
+            facility_address = destination_addresses[facility_key]
 
-        destination_dict = {
-                'Address': facility_address,
-                'Driving_time': travel_time_string,
-                'Driving_distance': travel_distance_string
-                }
+            destinations.append({
+                    'Address': facility_address,
+                    'Driving_time': travel_time_string,
+                    'Driving_distance': travel_distance_string
+                    })
 
-        logger.debug("Returning closest destination: {}".format(str(destination_dict)))
-        return destination_dict
+        logger.debug("Returning closest destinations: {}".format(str(destinations)))
+        return destinations
     else:
         logger.debug("Response Error: {}".format(str(response.status_code)))
         return None
@@ -211,8 +419,8 @@ def _format_float(input_float):
 
 def _post_request(url, params, headers):
     """
-    Utilizes requests module to formulate
-    HTTP POST request over the network
+    Sends an HTTP POST request over the network
+    through the shared session for the url's host
 
     :param url: String representing base URL of request
     :param params: String or Dictionary containing parameters
@@ -221,11 +429,7 @@ def _post_request(url, params, headers):
     """
     logger.debug("URL: {}, Params: {}, Headers: {}".format(url, str(params), str(headers)))
 
-    session = requests.Session()
-    request = requests.Request("POST", url, data=params, headers=headers)
-    prepared_request = request.prepare()
-    response = session.send(prepared_request)
-    return response
+    return http_utils.post(url, data=params, headers=headers)
 
 
 def geocode_address_candidates(input_address):
@@ -238,15 +442,9 @@ def geocode_address_candidates(input_address):
     """
     logger.debug("Input Address: {}".format(input_address))
 
-    params = {
-            "f": "json",
-            "singleLine": input_address,
-            "outFields":"Match_addr,Addr_type"
-            }
-    response = requests.request("GET", ARCGIS_GEOCODE_URL, params=params)
-    if response.status_code == 200:
-        return response.json()
-    else:
+    try:
+        return {'candidates': find_address_candidates(input_address)}
+    except BadAPIResponse:
         return None
 
 
@@ -277,3 +475,231 @@ def select_top_address_candidate(geocode_candidate_response_json):
                 }
         return coordinate_dict
 
+
+def find_address_candidates(address, zipcode=None):
+    """
+    Geocodes an address in Massachusetts, through a cache keyed by the
+    address's normalized form so different spellings of the same address
+    share one upstream call
+
+    :param address: single line address string. Boston is assumed when
+        neither a city nor a zip code is given.
+    :param zipcode: zip code to restrict the search to
+    :return: list of candidate dictionaries with 'address', 'location',
+        'score' and 'attributes' (Match_addr, Addr_type, MetroArea and
+        City) keys
+    :raises: BadAPIResponse
+    """
+    normalized = address_normalization.normalize_address(address, zipcode)
+    if normalized is not None:
+        single_line = address_normalization.to_single_line(normalized)
+    elif zipcode:
+        single_line = "{}, State:Ma, Zone:{}".format(" ".join(address.split()),
+                                                    zipcode)
+    else:
+        single_line = "{}, City:Boston, State:Ma".format(
+            " ".join(address.split()))
+    return _geocode_single_line(single_line)
+
+
+def _is_unresolved(candidates):
+    """
+    :param candidates: list of geocoded candidate dictionaries
+    :return: True if there is not exactly one confident candidate
+    """
+    confident = [candidate for candidate in candidates
+                 if candidate['score'] > CONFIDENT_SCORE]
+    return len(confident) != 1
+
+
+@cache.cached('geocode_address', ttl=GEOCODE_TTL, maxsize=512,
+              negative_ttl=GEOCODE_NEGATIVE_TTL, is_negative=_is_unresolved,
+              copy_result=True, persistent=True)
+def _geocode_single_line(single_line):
+    """
+    :param single_line: canonical single line query
+    :return: list of candidate dictionaries, keeping only what callers use
+    :raises: BadAPIResponse
+    """
+    return [{'address': candidate['address'],
+             'location': candidate['location'],
+             'score': candidate['score'],
+             'attributes': {field: candidate.get('attributes', {}).get(field)
+                            for field in GEOCODE_OUT_FIELDS.split(',')}}
+            for candidate in geocode(single_line, GEOCODE_OUT_FIELDS)]
+
+
+def geocode(address, out_fields="*", max_locations=MAX_GEOCODE_CANDIDATES):
+    """
+    Finds candidate locations for a single line address using the
+    ArcGIS World Geocoding service
+
+    :param address: String of address to be geocoded
+    :param out_fields: comma separated attribute names to return
+        for each candidate
+    :param max_locations: maximum number of candidates to return
+    :return: list of candidate dictionaries with 'address', 'location',
+        'score' and 'attributes' keys
+    :raises: BadAPIResponse
+    """
+    logger.debug("Address: {}".format(address))
+    params = {
+            "f": "json",
+            "singleLine": address,
+            "outFields": out_fields,
+            "maxLocations": max_locations
+            }
+    response_json = _get_json(ARCGIS_GEOCODE_URL, params)
+    if 'candidates' not in response_json:
+        raise BadAPIResponse
+    return response_json['candidates']
+
+
+def geocode_addresses(addresses, api_access_token):
+    """
+    Geocodes many single line addresses in one call to the ArcGIS World
+    Geocoding service. The results are requested for storage, as the
+    service's terms require when they are kept.
+
+    :param addresses: list of single line address strings, no more than
+        the service's batch size
+    :param api_access_token: String containing temporary ArcGIS REST API
+        access token
+    :return: list of the best candidate for each address, in the same
+        order, as dictionaries with 'address', 'location' and 'score' keys,
+        or None where nothing was found
+    :raises: BadAPIResponse
+    """
+    logger.debug("Batch geocoding {} addresses".format(len(addresses)))
+    records = [{'attributes': {'OBJECTID': index, 'SingleLine': address}}
+               for index, address in enumerate(addresses)]
+    params = {
+            "f": "json",
+            "token": api_access_token,
+            "addresses": json.dumps({'records': records}),
+            "forStorage": "true",
+            "sourceCountry": "USA",
+            "outSR": 4326
+            }
+    response = _post_request(ARCGIS_BATCH_GEOCODE_URL, params, {})
+    if response.status_code != 200:
+        logger.debug("Response Error: {}".format(str(response.status_code)))
+        raise BadAPIResponse
+    response_json = response.json()
+    if 'error' in response_json:
+        logger.debug("ArcGIS Error: {}".format(str(response_json['error'])))
+        if response_json['error'].get('code') in INVALID_TOKEN_ERROR_CODES:
+            invalidate_access_token(api_access_token)
+        raise BadAPIResponse
+    if 'locations' not in response_json:
+        raise BadAPIResponse
+
+    results = [None] * len(addresses)
+    for location in response_json['locations']:
+        index = location.get('attributes', {}).get('ResultID')
+        if index is None or not 0 <= index < len(addresses) or \
+                not location.get('location') or \
+                location['location'].get('x') is None:
+            continue
+        results[index] = {'address': location.get('address'),
+                          'location': location['location'],
+                          'score': location.get('score', 0)}
+    return results
+
+
+def reverse_geocode(coordinates):
+    """
+    Finds the address closest to a point using the ArcGIS
+    World Geocoding service
+
+    :param coordinates: a list of [Long, Lat]
+    :return: dictionary with 'address' and 'location' keys
+    :raises: BadAPIResponse
+    """
+    logger.debug("Coordinates: {}".format(str(coordinates)))
+    params = {
+            "f": "json",
+            "location": "{},{}".format(coordinates[0], coordinates[1])
+            }
+    response_json = _get_json(ARCGIS_REVERSE_GEOCODE_URL, params)
+    if 'address' not in response_json:
+        raise BadAPIResponse
+    return response_json
+
+
+def query_feature_layer(url, query):
+    """
+    Queries an ArcGIS FeatureServer layer, following pages until the
+    server reports that every matching feature has been returned
+
+    :param url: url of the FeatureServer layer
+    :param query: dictionary of query parameters. Snake case names used by
+        the arcgis package (out_sr, out_fields, ...) are translated to their
+        REST equivalents, anything else is passed through unchanged.
+    :return: list of feature dictionaries with 'attributes' and,
+        when requested, 'geometry' keys
+    :raises: BadAPIResponse
+    """
+    return list(iter_feature_layer(url, query))
+
+
+def iter_feature_layer(url, query):
+    """
+    Queries an ArcGIS FeatureServer layer as query_feature_layer does, but
+    yields the features of each page as it arrives, so they never all have
+    to be held at once. The next page is only requested once the features
+    of the last one have been used.
+
+    :param url: url of the FeatureServer layer
+    :param query: dictionary of query parameters, as for
+        query_feature_layer
+    :return: generator of feature dictionaries
+    :raises: BadAPIResponse while iterating
+    """
+    logger.debug("URL: {}, Query: {}".format(url, str(query)))
+    params = {
+            "f": "json",
+            "where": "1=1",
+            "outFields": "*",
+            "returnGeometry": "true"
+            }
+    for key, value in query.items():
+        if isinstance(value, bool):
+            value = str(value).lower()
+        params[FEATURE_QUERY_PARAMETER_NAMES.get(key, key)] = value
+    query_url = url.rstrip('/') + '/query'
+
+    while True:
+        response_json = _get_json(query_url, params)
+        if 'features' not in response_json:
+            raise BadAPIResponse
+        features = response_json['features']
+        yield from features
+        if not response_json.get('exceededTransferLimit') or not features:
+            return
+        params['resultOffset'] = \
+            int(params.get('resultOffset', 0)) + len(features)
+
+
+def _get_json(url, params):
+    """
+    Sends a GET request to an ArcGIS REST endpoint and returns the
+    decoded JSON body
+
+    ArcGIS reports most errors with a 200 status and an 'error'
+    object in the body, so both are checked.
+
+    :param url: String representing URL of request
+    :param params: Dictionary containing query string parameters
+    :return: Dictionary of the response JSON
+    :raises: BadAPIResponse
+    """
+    response = http_utils.get(url, params=params)
+    if response.status_code != 200:
+        logger.debug("Response Error: {}".format(str(response.status_code)))
+        raise BadAPIResponse
+    response_json = response.json()
+    if 'error' in response_json:
+        logger.debug("ArcGIS Error: {}".format(str(response_json['error'])))
+        raise BadAPIResponse
+    return response_json
@@ -0,0 +1,171 @@
+"""
+Geocodes the addresses of a dataset in bulk and keeps their coordinates
+
+Some datasets (open spaces, for example) only give an address for each
+record. Rather than geocoding a record at a time while a user waits, every
+address of the dataset is geocoded together: addresses are sent to ArcGIS
+in batches, a few batches at a time, and the coordinates found are kept in
+a persistent cache keyed by the normalized address. Until the dataset gains
+new addresses, later requests find every coordinate in memory or in /tmp
+and make no geocoding call at all. Requests short of time only look in the
+cache (see Finder.geocode_missing_coordinates).
+
+The cache can be filled ahead of time from the command line:
+
+    python -m mycity.utilities.batch_geocode URL --address-field ADDRESS
+
+"""
+
+import argparse
+import csv
+import logging
+
+import mycity.utilities.address_normalization as address_normalization
+import mycity.utilities.arcgis_utils as arcgis_utils
+import mycity.utilities.cache as cache
+import mycity.utilities.concurrency as concurrency
+import mycity.utilities.dataset_fetch as dataset_fetch
+from mycity.intents.custom_errors import BadAPIResponse
+
+logger = logging.getLogger(__name__)
+
+# Addresses per call, the World Geocoding service's suggested batch size
+BATCH_SIZE = 150
+# Batches sent at the same time
+MAX_CONCURRENT_BATCHES = 4
+
+# Candidates scoring lower are not trusted as the address's location
+MIN_SCORE = 80
+
+# Street addresses do not move. Addresses that could not be geocoded are
+# retried after an hour, in case the failure was the service's.
+COORDINATES_TTL = 30 * 86400
+UNMATCHED_TTL = 3600
+
+
+def address_key(address):
+    """
+    :param address: single line address string
+    :return: canonical single line form of the address, the same for
+        different spellings of it, such as "46 Everdean St, Boston, Ma"
+    """
+    normalized = address_normalization.normalize_address(address)
+    if normalized is None:
+        return " ".join(address.split())
+    street = " ".join(part for part in (normalized.number, normalized.street,
+                                        normalized.street_type) if part)
+    region = " ".join(part for part in (normalized.state, normalized.zipcode)
+                      if part)
+    return ", ".join(part for part in (street, normalized.city, region)
+                     if part)
+
+
+def _coordinates_of(candidate):
+    if candidate is None or candidate['score'] < MIN_SCORE:
+        return None
+    return {'x': candidate['location']['x'], 'y': candidate['location']['y']}
+
+
+@cache.cached('coordinates', ttl=COORDINATES_TTL, maxsize=8192,
+              negative_ttl=UNMATCHED_TTL,
+              is_negative=lambda coordinates: coordinates is None,
+              copy_result=True, persistent=True)
+def get_coordinates(key):
+    """
+    Geocodes a single address that no batch has covered
+
+    :param key: address as returned by address_key
+    :return: dictionary with 'x' and 'y' keys, or None if the address
+        could not be found
+    """
+    candidates = arcgis_utils.find_address_candidates(key)
+    if not candidates:
+        return None
+    return _coordinates_of(max(candidates,
+                               key=lambda candidate: candidate['score']))
+
+
+def _geocode_batch(keys, api_access_token):
+    """
+    Geocodes one batch and caches what was found
+
+    :return: None
+    """
+    candidates = arcgis_utils.geocode_addresses(keys, api_access_token)
+    for key, candidate in zip(keys, candidates):
+        get_coordinates.prime(_coordinates_of(candidate), key)
+
+
+def geocode_addresses(addresses, cached_only=False):
+    """
+    Finds the coordinates of many addresses, geocoding in batches the ones
+    that are not cached yet
+
+    :param addresses: iterable of single line address strings
+    :param cached_only: only look the addresses up in the cache, geocoding
+        none of them
+    :return: dictionary of each address to a dictionary with 'x' and 'y'
+        keys, or to None if it could not be found
+    """
+    keys = {address: address_key(address) for address in set(addresses)
+            if address and address.strip()}
+    results = {}
+    missing = []
+    for address, key in keys.items():
+        found, coordinates = get_coordinates.peek(key)
+        if found:
+            results[address] = coordinates
+        elif key not in missing:
+            missing.append(key)
+
+    if missing and cached_only:
+        logger.debug("Not geocoding {} of {} addresses".format(len(missing),
+                                                               len(keys)))
+    elif missing:
+        logger.debug("Geocoding {} of {} addresses".format(len(missing),
+                                                           len(keys)))
+        batches = [missing[start:start + BATCH_SIZE]
+                   for start in range(0, len(missing), BATCH_SIZE)]
+        api_access_token = arcgis_utils.generate_access_token()
+        if api_access_token is not None:
+            for start in range(0, len(batches), MAX_CONCURRENT_BATCHES):
+                group = batches[start:start + MAX_CONCURRENT_BATCHES]
+                futures = [concurrency.submit(_geocode_batch, batch,
+                                              api_access_token)
+                           for batch in group]
+                for future in futures:
+                    try:
+                        future.result()
+                    except BadAPIResponse:
+                        logger.debug("Batch geocoding failed",
+                                     exc_info=True)
+
+    for address, key in keys.items():
+        if address not in results:
+            found, coordinates = get_coordinates.peek(key)
+            results[address] = coordinates if found else None
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Geocode the addresses of a csv dataset into the '
+                    'coordinate cache')
+    parser.add_argument('url', help='url of the csv dataset')
+    parser.add_argument('--address-field', default='Address',
+                        help='column holding the addresses')
+    args = parser.parse_args(argv)
+
+    dataset = dataset_fetch.fetch_dataset(args.url)
+    if dataset is None:
+        parser.error('could not download ' + args.url)
+    addresses = [record[args.address_field]
+                 for record in csv.DictReader(dataset.value.splitlines())]
+    coordinates = geocode_addresses(addresses)
+    found = sum(1 for value in coordinates.values() if value is not None)
+    print('Found coordinates for {} of {} addresses'.format(
+        found, len(coordinates)))
+
+
+if __name__ == '__main__':
+    main()
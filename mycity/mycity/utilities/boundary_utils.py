@@ -0,0 +1,349 @@
+"""
+Answers "is this point in Boston, and in which neighborhood" without a
+network call
+
+The neighborhood polygons are bundled as GeoJSON (longitude/latitude) in
+mycity/data. They are indexed once per container on a uniform grid. A cell
+that no polygon edge passes through lies wholly inside one neighborhood (or
+outside all of them) and is answered by a dictionary lookup; only points in
+cells an edge crosses run the point-in-polygon test, and only against the
+polygons whose edges cross that cell.
+
+The bundled file is generated from the City of Boston open data portal
+when the skill is built (see hooks/build.sh), or by hand with:
+
+    python -m mycity.utilities.boundary_utils --refresh
+
+and --check fails unless the bundled file is there and loads.
+
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import threading
+
+import mycity.utilities.http_utils as http_utils
+from mycity.intents.custom_errors import BadAPIResponse
+
+logger = logging.getLogger(__name__)
+
+DATA_DIRECTORY = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+NEIGHBORHOODS_PATH = os.path.join(DATA_DIRECTORY,
+                                  'boston_neighborhoods.geojson')
+
+# Boston Neighborhoods (BPDA) on the City of Boston open data portal
+NEIGHBORHOODS_URL = 'https://bostonopendata-boston.opendata.arcgis.com/' \
+                    'datasets/3525b0ee6e6b427f9aab5d0a1d0a1a28_0.geojson'
+NEIGHBORHOODS_NAME_FIELD = 'Name'
+
+# Grid cell size in degrees, roughly 550 by 400 meters in Boston
+DEFAULT_CELL_SIZE = 0.005
+
+# Decimal places kept when refreshing, about 10 cm
+COORDINATE_PRECISION = 6
+
+_index = None
+_index_loaded = False
+_index_lock = threading.Lock()
+
+
+class Polygon(object):
+    """
+    Polygon made of an exterior ring and any number of holes
+
+    @property: rings ::= list of rings, each a list of (x, y) tuples
+    @property: bbox ::= (min x, min y, max x, max y)
+    """
+
+    def __init__(self, rings):
+        """
+        :param rings: list of rings, each a list of [x, y] positions. The
+            first is the exterior, the rest are holes.
+        """
+        self.rings = [[(float(x), float(y)) for x, y, *_ in ring]
+                      for ring in rings]
+        xs = [x for x, _ in self.rings[0]]
+        ys = [y for _, y in self.rings[0]]
+        self.bbox = (min(xs), min(ys), max(xs), max(ys))
+
+    def contains(self, x, y):
+        """
+        Even-odd ray casting over every ring, so points in a hole are
+        outside
+
+        :param x: longitude
+        :param y: latitude
+        :return: True if the point is inside the polygon
+        """
+        min_x, min_y, max_x, max_y = self.bbox
+        if x < min_x or x > max_x or y < min_y or y > max_y:
+            return False
+        inside = False
+        for ring in self.rings:
+            previous_x, previous_y = ring[-1]
+            for current_x, current_y in ring:
+                if (current_y > y) != (previous_y > y) and \
+                        x < (previous_x - current_x) * (y - current_y) / \
+                        (previous_y - current_y) + current_x:
+                    inside = not inside
+                previous_x, previous_y = current_x, current_y
+        return inside
+
+
+class BoundaryIndex(object):
+    """
+    Named areas, each one or more polygons, indexed by a uniform grid.
+    Areas must not overlap.
+    """
+
+    def __init__(self, areas, cell_size=DEFAULT_CELL_SIZE):
+        """
+        :param areas: list of (name, list of Polygon) tuples
+        :param cell_size: grid cell size in degrees
+        """
+        self.cell_size = cell_size
+        self.names = [name for name, _ in areas]
+        self.polygons = []
+        # cell to indexes of the polygons whose edges cross it
+        self._grid = {}
+        # cell to the name of the area that wholly contains it
+        self._interior = {}
+        for name, polygons in areas:
+            for polygon in polygons:
+                polygon_index = len(self.polygons)
+                self.polygons.append((name, polygon))
+                self._index_polygon(name, polygon_index, polygon)
+        if self.polygons:
+            self.bbox = (min(p.bbox[0] for _, p in self.polygons),
+                         min(p.bbox[1] for _, p in self.polygons),
+                         max(p.bbox[2] for _, p in self.polygons),
+                         max(p.bbox[3] for _, p in self.polygons))
+        else:
+            self.bbox = None
+
+    def _cell(self, coordinate):
+        return int(math.floor(coordinate / self.cell_size))
+
+    def _index_polygon(self, name, polygon_index, polygon):
+        """
+        Registers a polygon in the cells its edges may cross, and as the
+        answer for the cells it wholly contains
+        """
+        boundary_cells = set()
+        for ring in polygon.rings:
+            previous_x, previous_y = ring[-1]
+            for current_x, current_y in ring:
+                # every cell of the edge's bounding box, which includes
+                # every cell the edge passes through
+                for cell_x in range(self._cell(min(previous_x, current_x)),
+                                    self._cell(max(previous_x, current_x)) + 1):
+                    for cell_y in range(
+                            self._cell(min(previous_y, current_y)),
+                            self._cell(max(previous_y, current_y)) + 1):
+                        boundary_cells.add((cell_x, cell_y))
+                previous_x, previous_y = current_x, current_y
+        for cell in boundary_cells:
+            self._grid.setdefault(cell, []).append(polygon_index)
+
+        min_x, min_y, max_x, max_y = polygon.bbox
+        for cell_x in range(self._cell(min_x), self._cell(max_x) + 1):
+            for cell_y in range(self._cell(min_y), self._cell(max_y) + 1):
+                cell = (cell_x, cell_y)
+                if cell in boundary_cells:
+                    continue
+                # no edge crosses the cell, so its center decides for all
+                # of it
+                if polygon.contains((cell_x + 0.5) * self.cell_size,
+                                    (cell_y + 0.5) * self.cell_size):
+                    self._interior[cell] = name
+
+    @classmethod
+    def from_geojson(cls, geojson, name_field=NEIGHBORHOODS_NAME_FIELD,
+                     cell_size=DEFAULT_CELL_SIZE):
+        """
+        :param geojson: GeoJSON FeatureCollection dictionary of Polygon and
+            MultiPolygon features
+        :param name_field: feature property holding the area's name
+        :param cell_size: grid cell size in degrees
+        :return: BoundaryIndex object
+        """
+        areas = []
+        for feature in geojson['features']:
+            geometry = feature.get('geometry') or {}
+            if geometry.get('type') == 'Polygon':
+                polygons = [Polygon(geometry['coordinates'])]
+            elif geometry.get('type') == 'MultiPolygon':
+                polygons = [Polygon(rings)
+                            for rings in geometry['coordinates']]
+            else:
+                continue
+            areas.append((feature['properties'][name_field], polygons))
+        return cls(areas, cell_size)
+
+    def locate(self, x, y):
+        """
+        :param x: longitude
+        :param y: latitude
+        :return: name of the area containing the point, or None
+        """
+        cell = (self._cell(x), self._cell(y))
+        if cell in self._interior:
+            return self._interior[cell]
+        for polygon_index in self._grid.get(cell, ()):
+            name, polygon = self.polygons[polygon_index]
+            if polygon.contains(x, y):
+                return name
+        return None
+
+
+def load_boundary_index(path, name_field, cell_size=DEFAULT_CELL_SIZE):
+    """
+    :param path: bundled GeoJSON file
+    :param name_field: feature property holding the area's name
+    :param cell_size: grid cell size in degrees
+    :return: BoundaryIndex object, or None if the file is not bundled
+    """
+    try:
+        with open(path) as geojson_file:
+            return BoundaryIndex.from_geojson(json.load(geojson_file),
+                                              name_field, cell_size)
+    except FileNotFoundError:
+        # lookups fall back to ArcGIS, which is slower, so say so
+        logger.warning('No bundled boundaries at ' + path)
+        return None
+
+
+def get_neighborhood_index():
+    """
+    Returns the index of the bundled neighborhoods, loading it on first use
+
+    :return: BoundaryIndex object, or None if the dataset is not bundled
+    """
+    global _index, _index_loaded
+    if not _index_loaded:
+        with _index_lock:
+            if not _index_loaded:
+                _index = load_boundary_index(NEIGHBORHOODS_PATH,
+                                             NEIGHBORHOODS_NAME_FIELD)
+                _index_loaded = True
+    return _index
+
+
+def find_neighborhood(longitude, latitude):
+    """
+    :param longitude: longitude in degrees
+    :param latitude: latitude in degrees
+    :return: name of the Boston neighborhood containing the point, or None
+        if it is outside Boston
+    :raises: FileNotFoundError if the dataset is not bundled
+    """
+    index = get_neighborhood_index()
+    if index is None:
+        raise FileNotFoundError(NEIGHBORHOODS_PATH)
+    return index.locate(longitude, latitude)
+
+
+def _round_positions(coordinates):
+    if coordinates and isinstance(coordinates[0], (int, float)):
+        return [round(value, COORDINATE_PRECISION) for value in coordinates]
+    return [_round_positions(item) for item in coordinates]
+
+
+def write_boundaries(features, path, name_field):
+    """
+    Writes features as a bundled GeoJSON dataset, keeping only each
+    feature's name and geometry
+
+    :param features: list of GeoJSON Polygon and MultiPolygon features in
+        longitude/latitude
+    :param path: file to write
+    :param name_field: property holding the area's name
+    :return: number of features written
+    """
+    kept = []
+    for feature in features:
+        kept.append({
+            'type': 'Feature',
+            'properties': {name_field: feature['properties'][name_field]},
+            'geometry': {
+                'type': feature['geometry']['type'],
+                'coordinates':
+                    _round_positions(feature['geometry']['coordinates'])
+            }
+        })
+    # check the result can be indexed before replacing the bundled file
+    collection = {'type': 'FeatureCollection', 'features': kept}
+    BoundaryIndex.from_geojson(collection, name_field)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as geojson_file:
+        json.dump(collection, geojson_file, separators=(',', ':'))
+    return len(kept)
+
+
+def refresh_neighborhoods(url=NEIGHBORHOODS_URL, path=NEIGHBORHOODS_PATH,
+                          name_field=NEIGHBORHOODS_NAME_FIELD):
+    """
+    Downloads the neighborhood polygons and writes the bundled dataset
+
+    :param url: url of a GeoJSON FeatureCollection in longitude/latitude
+    :param path: file to write
+    :param name_field: property holding the neighborhood name
+    :return: number of neighborhoods written
+    :raises: BadAPIResponse if the download fails
+    """
+    response = http_utils.get(url)
+    if response.status_code != 200:
+        raise BadAPIResponse
+    return write_boundaries(response.json()['features'], path, name_field)
+
+
+def check_neighborhoods(path=NEIGHBORHOODS_PATH,
+                        name_field=NEIGHBORHOODS_NAME_FIELD):
+    """
+    Loads the bundled neighborhoods the way get_neighborhood_index does
+
+    :param path: bundled GeoJSON file
+    :param name_field: property holding the neighborhood name
+    :return: number of neighborhoods indexed
+    :raises: FileNotFoundError if the file is not bundled, ValueError if it
+        holds no neighborhood
+    """
+    with open(path) as geojson_file:
+        index = BoundaryIndex.from_geojson(json.load(geojson_file),
+                                           name_field)
+    if not index.names:
+        raise ValueError('No neighborhoods in ' + path)
+    return len(index.names)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Refresh the bundled Boston neighborhood polygons')
+    parser.add_argument('--refresh', action='store_true',
+                        help='download the polygons and rewrite the dataset')
+    parser.add_argument('--check', action='store_true',
+                        help='fail unless the bundled dataset loads')
+    parser.add_argument('--url', default=NEIGHBORHOODS_URL)
+    parser.add_argument('--name-field', default=NEIGHBORHOODS_NAME_FIELD)
+    parser.add_argument('--path', default=NEIGHBORHOODS_PATH)
+    args = parser.parse_args(argv)
+    if args.refresh:
+        count = refresh_neighborhoods(args.url, args.path, args.name_field)
+        print('Wrote {} neighborhoods to {}'.format(count, args.path))
+    if args.check:
+        try:
+            count = check_neighborhoods(args.path, args.name_field)
+        except (OSError, ValueError) as error:
+            parser.exit(1, 'Bundled neighborhoods do not load: {}\n'.format(
+                error))
+        print('{} neighborhoods load from {}'.format(count, args.path))
+    if not (args.refresh or args.check):
+        parser.print_help()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,349 @@
+"""
+Process-wide caches for data fetched from upstream services
+
+A warm Lambda container keeps module state between invocations, so data that
+changes slowly (the boston.gov alerts, open data CSVs, FeatureServer layers)
+can be served from memory instead of being fetched again for every request.
+
+Each cache is bounded (least recently used entries are evicted first) and
+every entry expires after a time to live. Failures can be cached for a
+shorter time (negative caching) so a struggling upstream is not hammered, and
+an expired entry can still be served for a grace period while a background
+thread fetches a fresh copy (stale-while-revalidate). Caches created with
+persistent=True also keep their values in /tmp (see disk_cache), so they
+survive the module state being rebuilt.
+
+Usage:
+
+    @cache.cached('alerts', ttl=300, stale_ttl=900)
+    def get_alerts():
+        ...
+
+"""
+
+import collections
+import copy
+import functools
+import logging
+import threading
+import time
+
+import mycity.utilities.disk_cache as disk_cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAXSIZE = 128
+DEFAULT_TTL_SECONDS = 300
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+_CacheEntry = collections.namedtuple(
+    '_CacheEntry', ['value', 'error', 'expires_at', 'stale_until'])
+
+
+class CacheStats(object):
+    """
+    Counters kept by each cache
+
+    @property: hits ::= lookups answered with a fresh value
+    @property: stale_hits ::= lookups answered with an expired value while
+        it was being refreshed
+    @property: negative_hits ::= lookups answered with a cached failure
+    @property: disk_hits ::= lookups answered from the on-disk tier
+    @property: misses ::= lookups that had to call the upstream
+    @property: evictions ::= entries dropped to stay within maxsize
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.stale_hits = 0
+        self.negative_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def as_dict(self):
+        return dict(self.__dict__)
+
+
+class TTLCache(object):
+    """
+    Bounded least recently used cache whose entries expire
+    """
+
+    def __init__(self, name, maxsize=DEFAULT_MAXSIZE, clock=time.monotonic):
+        """
+        :param name: name the cache is reported under
+        :param maxsize: maximum number of entries kept
+        :param clock: function returning the current time in seconds,
+            replaceable for tests
+        """
+        self.name = name
+        self.maxsize = maxsize
+        self.stats = CacheStats()
+        self._clock = clock
+        self._entries = collections.OrderedDict()
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def lookup(self, key):
+        """
+        Finds the entry for key
+
+        :param key: hashable key
+        :return: tuple of (entry, is_fresh). entry is None when there is no
+            usable entry, is_fresh is False when the entry is only within
+            its stale grace period.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, False
+            now = self._clock()
+            if now < entry.expires_at:
+                self._entries.move_to_end(key)
+                return entry, True
+            if now < entry.stale_until:
+                self._entries.move_to_end(key)
+                return entry, False
+            del self._entries[key]
+            return None, False
+
+    def store(self, key, value=None, error=None, ttl=DEFAULT_TTL_SECONDS,
+              stale_ttl=0):
+        """
+        Stores a value, or a failure to re-raise, under key
+
+        :param key: hashable key
+        :param value: value to store
+        :param error: exception to store instead of a value
+        :param ttl: seconds the entry is fresh for
+        :param stale_ttl: seconds after expiry the entry may still be served
+            while it is refreshed
+        :return: None
+        """
+        now = self._clock()
+        entry = _CacheEntry(value, error, now + ttl, now + ttl + stale_ttl)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def start_refresh(self, key):
+        """
+        Marks key as being refreshed
+
+        :param key: hashable key
+        :return: True if the caller should refresh it, False if a refresh
+            is already in progress
+        """
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            return True
+
+    def finish_refresh(self, key):
+        with self._lock:
+            self._refreshing.discard(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def get_cache(name, maxsize=DEFAULT_MAXSIZE):
+    """
+    Returns the process-wide cache called name, creating it on first use
+
+    :param name: name of the cache
+    :param maxsize: maximum number of entries if the cache is created
+    :return: TTLCache object
+    """
+    with _caches_lock:
+        if name not in _caches:
+            _caches[name] = TTLCache(name, maxsize)
+        return _caches[name]
+
+
+def get_cache_stats():
+    """
+    :return: dictionary of cache name to its counters and current size
+    """
+    with _caches_lock:
+        return {name: dict(cache.stats.as_dict(), size=len(cache))
+                for name, cache in _caches.items()}
+
+
+def clear_all_caches():
+    """
+    Empties every cache, including the on-disk tier. Counters are kept.
+
+    :return: None
+    """
+    with _caches_lock:
+        for cache in _caches.values():
+            cache.clear()
+    disk_cache.get_disk_cache().clear()
+
+
+def make_key(*args, **kwargs):
+    """
+    Builds a hashable key from function arguments, turning dictionaries
+    and lists into sorted tuples
+
+    :return: hashable tuple
+    """
+    return (_freeze(args), _freeze(kwargs))
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, set):
+        return tuple(sorted(_freeze(item) for item in value))
+    return value
+
+
+def cached(name, ttl=DEFAULT_TTL_SECONDS, maxsize=DEFAULT_MAXSIZE,
+           negative_ttl=0, negative_exceptions=(), is_negative=None,
+           stale_ttl=0, copy_result=False, persistent=False, version=1):
+    """
+    Decorator that caches a function's results by its arguments
+
+    :param name: name of the process-wide cache to use
+    :param ttl: seconds a result stays fresh
+    :param maxsize: maximum number of results kept
+    :param negative_ttl: seconds a failure is remembered. 0 disables
+        negative caching.
+    :param negative_exceptions: exception types that count as a failure.
+        A cached failure is raised again without calling the function.
+    :param is_negative: optional function taking a result and returning
+        True if it is a failure (for example None), to be cached for
+        negative_ttl instead of ttl
+    :param stale_ttl: seconds an expired result may still be returned while
+        a background thread refreshes it
+    :param copy_result: return a deep copy of the cached value, for callers
+        that modify what they are given
+    :param persistent: also keep results (but not failures) in the on-disk
+        tier. Results must be picklable.
+    :param version: version of the result's format. Bump it when the
+        function starts returning something different, so entries written
+        by older code are not read back.
+    :return: decorated function with a 'cache' attribute, and 'peek' and
+        'prime' functions to read and fill the cache without calling it
+    """
+    def decorator(function):
+        cache = get_cache(name, maxsize)
+
+        def _store(key, value):
+            if is_negative is not None and is_negative(value):
+                if negative_ttl:
+                    cache.store(key, value, ttl=negative_ttl)
+            else:
+                cache.store(key, value, ttl=ttl, stale_ttl=stale_ttl)
+                if persistent:
+                    disk_cache.get_disk_cache().save(
+                        name, key, value, ttl, stale_ttl, version)
+
+        def _load(key, args, kwargs):
+            try:
+                value = function(*args, **kwargs)
+            except negative_exceptions as error:
+                if negative_ttl:
+                    cache.store(key, error=error, ttl=negative_ttl)
+                raise
+            _store(key, value)
+            return value
+
+        def _restore(key):
+            """
+            Copies an entry from the on-disk tier into memory
+
+            :return: tuple of (entry, is_fresh) as returned by lookup
+            """
+            loaded = disk_cache.get_disk_cache().load(name, key, version)
+            if loaded is None:
+                return None, False
+            value, fresh_seconds, stale_seconds = loaded
+            cache.store(key, value, ttl=fresh_seconds, stale_ttl=stale_seconds)
+            cache.stats.disk_hits += 1
+            return cache.lookup(key)
+
+        def _refresh(key, args, kwargs):
+            try:
+                _load(key, args, kwargs)
+            except Exception:
+                logger.debug('Background refresh of %s failed', name,
+                             exc_info=True)
+            finally:
+                cache.finish_refresh(key)
+
+        def _result(entry):
+            if entry.error is not None:
+                raise entry.error
+            return copy.deepcopy(entry.value) if copy_result else entry.value
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            key = make_key(*args, **kwargs)
+            entry, is_fresh = cache.lookup(key)
+            from_disk = False
+            if entry is None and persistent:
+                entry, is_fresh = _restore(key)
+                from_disk = entry is not None
+            if entry is not None and is_fresh:
+                if entry.error is not None:
+                    cache.stats.negative_hits += 1
+                elif not from_disk:
+                    cache.stats.hits += 1
+                return _result(entry)
+            if entry is not None:
+                if not from_disk:
+                    cache.stats.stale_hits += 1
+                if cache.start_refresh(key):
+                    threading.Thread(target=_refresh,
+                                     args=(key, args, kwargs),
+                                     daemon=True).start()
+                return _result(entry)
+            cache.stats.misses += 1
+            value = _load(key, args, kwargs)
+            return copy.deepcopy(value) if copy_result else value
+
+        def peek(*args, **kwargs):
+            """
+            Looks up the cached result for the arguments without calling
+            the function
+
+            :return: tuple of (found, value). A cached failure is raised.
+            """
+            key = make_key(*args, **kwargs)
+            entry, is_fresh = cache.lookup(key)
+            if entry is None and persistent:
+                entry, is_fresh = _restore(key)
+            if entry is None or not is_fresh:
+                return False, None
+            return True, _result(entry)
+
+        def prime(value, *args, **kwargs):
+            """
+            Caches value as the function's result for the arguments, as if
+            it had been called. Useful when results are fetched in bulk.
+
+            :return: None
+            """
+            _store(make_key(*args, **kwargs), value)
+
+        wrapper.cache = cache
+        wrapper.peek = peek
+        wrapper.prime = prime
+        return wrapper
+    return decorator
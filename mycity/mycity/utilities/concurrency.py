@@ -0,0 +1,85 @@
+"""
+Runs independent upstream calls at the same time
+
+Most of an intent's time is spent waiting on the network. Calls that do not
+depend on each other (checking that a location is in Boston and fetching
+the data about it, or getting an ArcGIS token while fetching the records to
+route to) are submitted to a shared thread pool so the intent waits roughly
+as long as the slowest call instead of their sum.
+
+Each call runs in a copy of the submitting thread's context, so it sees the
+invocation's deadline and caps its timeouts the same way a call made
+directly would.
+
+Usage:
+
+    in_city, records = concurrency.run_in_parallel(
+        lambda: is_location_in_city(address, coordinates),
+        get_records)
+
+"""
+
+import concurrent.futures
+import contextvars
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Intents fan out to at most a handful of calls at once
+MAX_WORKERS = 8
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=MAX_WORKERS,
+                    thread_name_prefix='mycity-upstream')
+    return _executor
+
+
+def submit(function, *args, **kwargs):
+    """
+    Starts function(*args, **kwargs) on the shared thread pool
+
+    :param function: function to call
+    :return: concurrent.futures.Future whose result() returns the function's
+        return value or raises its exception
+    """
+    context = contextvars.copy_context()
+    return _get_executor().submit(context.run, function, *args, **kwargs)
+
+
+def run_in_parallel(*functions):
+    """
+    Calls functions that take no arguments at the same time and waits for
+    all of them
+
+    :param functions: functions taking no arguments
+    :return: list of the functions' return values, in the order given
+    :raises: the exception raised by the first function, in the order
+        given, that failed. Every function has finished by then.
+    """
+    futures = [submit(function) for function in functions]
+    concurrent.futures.wait(futures)
+    return [future.result() for future in futures]
+
+
+def shutdown():
+    """
+    Waits for running calls to finish and stops the thread pool. The next
+    submit starts a new one.
+
+    :return: None
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
@@ -4,6 +4,7 @@ Utilities for querying with the Boston crime incidents API
 """
 
 import requests
+import mycity.utilities.http_utils as http_utils
 from mycity.utilities.gis_utils import geocode_address
 import logging
 
@@ -27,8 +28,7 @@ def get_crime_incident_response(origin_coordinates):
     url_parameters = {"sql": _build_query_string(origin_coordinates)}
     logger.debug("Finding crime incidents information for {}, {} using query {}"
         .format(origin_coordinates['x'], origin_coordinates['y'], url_parameters))
-    with requests.Session() as session:
-        response = session.get(CRIME_INCIDENTS_SQL_URL, params=url_parameters)
+    response = http_utils.get(CRIME_INCIDENTS_SQL_URL, params=url_parameters)
 
     if response.status_code == requests.codes.ok:
         return response.json()
@@ -0,0 +1,198 @@
+"""
+Downloads open data files only when they have changed
+
+A dataset is kept, with the ETag and Last-Modified validators it was served
+with, in memory and in /tmp (see disk_cache). For FRESH_SECONDS after it
+was last checked it is returned without any request. After that it is
+revalidated with If-None-Match/If-Modified-Since: a 304 Not Modified costs
+one small response and no decoding, and only a changed file is downloaded
+and decoded again.
+
+Bodies are decoded with the encoding declared for the dataset rather than
+one guessed from the bytes, which for a large CSV took longer than the
+download. They are streamed: read in chunks, decoded incrementally and
+handed line by line to a parse function, which keeps what it needs (by
+default the whole text), so a large file is never held whole.
+
+"""
+
+import codecs
+import collections
+import hashlib
+import logging
+import threading
+import time
+
+import mycity.utilities.cache as cache
+import mycity.utilities.disk_cache as disk_cache
+import mycity.utilities.http_utils as http_utils
+
+logger = logging.getLogger(__name__)
+
+# Open data portal CSV files are UTF-8, often with a byte order mark
+DEFAULT_ENCODING = 'utf-8-sig'
+
+# Seconds a dataset is used without asking whether it changed
+FRESH_SECONDS = 3600
+# Seconds a dataset is kept for revalidation after it was last checked
+KEEP_SECONDS = 7 * 86400
+# Seconds a failed download is not retried
+FAILURE_SECONDS = 60
+
+# Bytes read from the response at a time
+CHUNK_SIZE = 64 * 1024
+
+CACHE_NAME = 'datasets'
+CACHE_VERSION = 2
+
+# value is what the parse function kept. version identifies the contents:
+# the ETag, else the Last-Modified date, else a hash of the body.
+# checked_at is when the server last confirmed them, by _clock.
+Dataset = collections.namedtuple(
+    'Dataset', ['value', 'version', 'etag', 'last_modified', 'checked_at'])
+
+_clock = time.time
+_url_locks = collections.defaultdict(threading.Lock)
+_url_locks_lock = threading.Lock()
+
+
+def _lock_for(url):
+    with _url_locks_lock:
+        return _url_locks[url]
+
+
+def _cached(key, persistent):
+    """
+    :return: the kept Dataset, from memory or else /tmp, or None
+    """
+    entry, _ = cache.get_cache(CACHE_NAME).lookup(key)
+    if entry is not None:
+        return entry.value
+    if not persistent:
+        return None
+    loaded = disk_cache.get_disk_cache().load(CACHE_NAME, key, CACHE_VERSION)
+    if loaded is None:
+        return None
+    dataset, fresh_seconds, _ = loaded
+    cache.get_cache(CACHE_NAME).store(key, dataset, ttl=fresh_seconds)
+    return dataset
+
+
+def _keep(key, dataset, persistent):
+    cache.get_cache(CACHE_NAME).store(key, dataset, ttl=KEEP_SECONDS)
+    if persistent:
+        disk_cache.get_disk_cache().save(CACHE_NAME, key, dataset,
+                                         KEEP_SECONDS, version=CACHE_VERSION)
+
+
+def iter_lines(chunks, encoding, digest=None):
+    """
+    Decodes a body as it arrives and splits it into lines
+
+    :param chunks: iterable of bytes
+    :param encoding: encoding of the body
+    :param digest: optional hashlib object updated with every chunk
+    :return: generator of lines, each ending with its newline but for a
+        last line without one
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    pending = ''
+    for chunk in chunks:
+        if digest is not None:
+            digest.update(chunk)
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split('\n')
+        for line in lines:
+            yield line + '\n'
+    pending += decoder.decode(b'', final=True)
+    *lines, pending = pending.split('\n')
+    for line in lines:
+        yield line + '\n'
+    if pending:
+        yield pending
+
+
+def _join(lines):
+    return ''.join(lines)
+
+
+def _download(url, encoding, kept, parse):
+    """
+    Sends a conditional GET for url
+
+    :param kept: Dataset to revalidate, or None
+    :param parse: function the body's lines are streamed through
+    :return: the current Dataset, or None if the download failed
+    """
+    headers = {}
+    if kept is not None:
+        if kept.etag:
+            headers['If-None-Match'] = kept.etag
+        if kept.last_modified:
+            headers['If-Modified-Since'] = kept.last_modified
+    response = http_utils.get(url, headers=headers or None, stream=True)
+    try:
+        if response.status_code == 304 and kept is not None:
+            logger.debug('Not modified: ' + url)
+            return kept._replace(checked_at=_clock())
+        if response.status_code != 200:
+            logger.debug('Could not download {}: {}'.format(
+                url, response.status_code))
+            return None
+        digest = hashlib.sha1()
+        lines = iter_lines(response.iter_content(CHUNK_SIZE), encoding,
+                           digest)
+        value = parse(lines)
+        # a parse that stopped early still needs the whole body hashed
+        for _ in lines:
+            pass
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        version = etag or last_modified or digest.hexdigest()
+        return Dataset(value, version, etag, last_modified, _clock())
+    finally:
+        response.close()
+
+
+def fetch_dataset(url, encoding=DEFAULT_ENCODING, parse=None,
+                  parse_key='text', persistent=True):
+    """
+    Returns a dataset, downloading it only when it is not known or has
+    changed
+
+    :param url: url of the dataset
+    :param encoding: encoding the dataset is served in
+    :param parse: function taking an iterator over the decoded lines of
+        the body and returning what to keep of it. By default the whole
+        text is kept.
+    :param parse_key: hashable naming what parse keeps, so different
+        parses of one url are kept apart
+    :param persistent: also keep the dataset in /tmp. parse_key must then
+        be the same in every process, and what parse returns picklable.
+    :return: Dataset, or None if it could not be downloaded and no earlier
+        copy is kept
+    """
+    key = cache.make_key(url, encoding, parse_key)
+    with _lock_for(url):
+        kept = _cached(key, persistent)
+        now = _clock()
+        if kept is not None and now - kept.checked_at < FRESH_SECONDS:
+            return kept
+        failure_key = cache.make_key('failed', url, encoding, parse_key)
+        failed, _ = cache.get_cache(CACHE_NAME).lookup(failure_key)
+        if failed is not None:
+            return kept
+
+        try:
+            dataset = _download(url, encoding, kept, parse or _join)
+        except (IOError, UnicodeDecodeError) as error:
+            logger.debug('Could not download {}: {}'.format(url, error))
+            dataset = None
+        if dataset is None:
+            # keep answering with the copy we have until the server is back
+            cache.get_cache(CACHE_NAME).store(failure_key, True,
+                                              ttl=FAILURE_SECONDS)
+            return kept
+        _keep(key, dataset, persistent)
+        return dataset
+
@@ -0,0 +1,124 @@
+"""
+Per-invocation time budget for upstream calls
+
+Lambda (and Alexa, which stops waiting for the skill after a few seconds)
+will cut off an invocation that runs too long. A Deadline is created from the
+LambdaContext when a request arrives, and every outbound call takes its
+timeout from the time that is left, so an intent that runs out of time can
+still answer with a graceful message.
+
+"""
+
+import contextvars
+import logging
+import time
+
+from mycity.intents.custom_errors import DeadlineExceededError
+
+logger = logging.getLogger(__name__)
+
+# Time kept back from upstream calls to build and return the response
+SAFETY_MARGIN_SECONDS = 0.25
+
+_current_deadline = contextvars.ContextVar('current_deadline', default=None)
+
+
+class Deadline(object):
+    """
+    A point in time by which the current invocation must have finished
+
+    @property: expires_at ::= time.monotonic() value at which the
+        budget runs out
+    """
+
+    def __init__(self, remaining_seconds, clock=time.monotonic):
+        """
+        :param remaining_seconds: seconds left in the budget from now
+        :param clock: function returning the current time in seconds,
+            replaceable for tests
+        """
+        self._clock = clock
+        self.expires_at = clock() + remaining_seconds
+
+    def __repr__(self):
+        return '<Deadline remaining={:.3f}s>'.format(self.remaining())
+
+    @classmethod
+    def from_lambda_context(cls, context,
+                            safety_margin=SAFETY_MARGIN_SECONDS):
+        """
+        Creates a Deadline from a LambdaContext
+
+        :param context: LambdaContext object, or anything else when the
+            handler is run outside of Lambda
+        :param safety_margin: seconds kept back to build the response
+        :return: Deadline object, or None if the context does not
+            report the remaining time
+        """
+        get_remaining_time = getattr(context, 'get_remaining_time_in_millis',
+                                     None)
+        if get_remaining_time is None:
+            return None
+        return cls(get_remaining_time() / 1000.0 - safety_margin)
+
+    def remaining(self):
+        """
+        :return: seconds left before the deadline, negative once it has passed
+        """
+        return self.expires_at - self._clock()
+
+    def expired(self):
+        """
+        :return: True if the deadline has passed
+        """
+        return self.remaining() <= 0
+
+    def check(self):
+        """
+        :return: None
+        :raises: DeadlineExceededError if the deadline has passed
+        """
+        if self.expired():
+            raise DeadlineExceededError
+
+    def timeout(self, default):
+        """
+        Caps a requests-style timeout to the time that is left
+
+        :param default: timeout in seconds, or a (connect, read) tuple
+        :return: timeout of the same shape, no longer than the time left
+        :raises: DeadlineExceededError if the deadline has passed
+        """
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceededError
+        if isinstance(default, tuple):
+            return tuple(min(value, remaining) for value in default)
+        return min(default, remaining)
+
+
+def get_current_deadline():
+    """
+    :return: the Deadline of the invocation being handled, or None
+    """
+    return _current_deadline.get()
+
+
+def set_current_deadline(deadline):
+    """
+    Makes deadline the one upstream calls take their timeouts from
+
+    :param deadline: Deadline object or None
+    :return: token that can be passed to reset_current_deadline
+    """
+    return _current_deadline.set(deadline)
+
+
+def reset_current_deadline(token):
+    """
+    Restores the deadline that was current before set_current_deadline
+
+    :param token: value returned by set_current_deadline
+    :return: None
+    """
+    _current_deadline.reset(token)
@@ -0,0 +1,290 @@
+"""
+On-disk tier for the process-wide caches
+
+Lambda keeps a container's /tmp directory for as long as the container
+lives, even when the Python module state is rebuilt (a handler reload or an
+init after an error). Caches created with persistent=True write each value
+they fetch here and, when their in-memory copy is missing, read it back from
+disk instead of calling the upstream again.
+
+Entries are stored one per file as a small header followed by a
+zlib-compressed pickle. File names hash the cache name, its version and the
+key, so bumping a cache's version (or FORMAT_VERSION) leaves old entries
+unreachable; they are removed by the size-based eviction, which deletes the
+least recently used files once the directory grows past its limit.
+
+Only this module writes to the directory, which is private to the Lambda
+function, so the pickles it reads back are trusted.
+
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+import struct
+import tempfile
+import threading
+import time
+import zlib
+
+logger = logging.getLogger(__name__)
+
+# Bumped whenever the file layout below changes
+FORMAT_VERSION = 1
+
+DEFAULT_DIRECTORY = os.environ.get(
+    'MYCITY_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'mycity_cache'))
+
+# Lambda gives a function 512 MB of /tmp by default
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+FILE_SUFFIX = '.bin'
+
+# magic, format version, expires at, stale until (seconds since the epoch)
+_HEADER = struct.Struct('>4sBdd')
+_MAGIC = b'MYCC'
+
+_disk_cache = None
+_disk_cache_lock = threading.Lock()
+
+
+class DiskCacheStats(object):
+    """
+    Counters kept by a DiskCache
+
+    @property: hits ::= reads that found a usable entry
+    @property: misses ::= reads that found no entry, or an expired one
+    @property: writes ::= entries written
+    @property: evictions ::= files removed to stay within max_bytes
+    @property: errors ::= unreadable files and failed reads or writes
+    @property: read_seconds ::= total time spent reading entries
+    @property: write_seconds ::= total time spent writing entries
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self.errors = 0
+        self.read_seconds = 0.0
+        self.write_seconds = 0.0
+
+    def as_dict(self):
+        return dict(self.__dict__)
+
+
+class DiskCache(object):
+    """
+    Directory of cache entries bounded by their total size
+    """
+
+    def __init__(self, directory=DEFAULT_DIRECTORY,
+                 max_bytes=DEFAULT_MAX_BYTES, clock=time.time):
+        """
+        :param directory: directory entries are written to, created on
+            first write
+        :param max_bytes: total size of entry files kept before the least
+            recently used are removed
+        :param clock: function returning seconds since the epoch,
+            replaceable for tests
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.stats = DiskCacheStats()
+        self._clock = clock
+        self._total_bytes = None
+        self._lock = threading.Lock()
+
+    def _path(self, name, key, version):
+        digest = hashlib.sha1(
+            repr((FORMAT_VERSION, name, version, key)).encode('utf-8'))
+        return os.path.join(self.directory,
+                            name + '-' + digest.hexdigest() + FILE_SUFFIX)
+
+    def load(self, name, key, version=1):
+        """
+        Reads an entry written by save
+
+        :param name: name of the cache the entry belongs to
+        :param key: hashable key, as built by cache.make_key
+        :param version: version of the cached data's format
+        :return: tuple of (value, fresh_seconds, stale_seconds): the seconds
+            left before the entry expires (0 if it already has) and the
+            seconds of stale grace period left after that. None if there is
+            no entry that is fresh or within its grace period.
+        """
+        start = time.perf_counter()
+        path = self._path(name, key, version)
+        try:
+            with open(path, 'rb') as entry_file:
+                data = entry_file.read()
+        except FileNotFoundError:
+            self.stats.misses += 1
+            return None
+        except OSError:
+            logger.debug('Could not read %s', path, exc_info=True)
+            self.stats.errors += 1
+            return None
+        try:
+            magic, format_version, expires_at, stale_until = \
+                _HEADER.unpack_from(data)
+            if magic != _MAGIC or format_version != FORMAT_VERSION:
+                raise ValueError('Unknown cache file format')
+            value = pickle.loads(zlib.decompress(data[_HEADER.size:]))
+        except Exception:
+            logger.debug('Removing unreadable cache file %s', path,
+                         exc_info=True)
+            self.stats.errors += 1
+            self._remove(path)
+            return None
+        finally:
+            self.stats.read_seconds += time.perf_counter() - start
+        now = self._clock()
+        if now >= stale_until:
+            self.stats.misses += 1
+            self._remove(path)
+            return None
+        try:
+            # the modification time orders files for eviction
+            os.utime(path)
+        except OSError:
+            pass
+        self.stats.hits += 1
+        fresh_seconds = max(expires_at - now, 0)
+        return value, fresh_seconds, stale_until - now - fresh_seconds
+
+    def save(self, name, key, value, ttl, stale_ttl=0, version=1):
+        """
+        Writes an entry, replacing any earlier one for the same key
+
+        :param name: name of the cache the entry belongs to
+        :param key: hashable key, as built by cache.make_key
+        :param value: picklable value
+        :param ttl: seconds the entry is fresh for
+        :param stale_ttl: seconds after expiry the entry may still be served
+        :param version: version of the cached data's format
+        :return: True if the entry was written
+        """
+        start = time.perf_counter()
+        now = self._clock()
+        path = self._path(name, key, version)
+        try:
+            data = _HEADER.pack(_MAGIC, FORMAT_VERSION, now + ttl,
+                                now + ttl + stale_ttl) + \
+                zlib.compress(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+            os.makedirs(self.directory, exist_ok=True)
+            previous_size = self._file_size(path)
+            # write to a temporary file and rename it so a reader never
+            # sees a partly written entry
+            descriptor, temporary_path = tempfile.mkstemp(
+                dir=self.directory, suffix='.tmp')
+            with os.fdopen(descriptor, 'wb') as entry_file:
+                entry_file.write(data)
+            os.replace(temporary_path, path)
+        except Exception:
+            logger.debug('Could not write %s', path, exc_info=True)
+            self.stats.errors += 1
+            return False
+        finally:
+            self.stats.write_seconds += time.perf_counter() - start
+        self.stats.writes += 1
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = self._directory_size()
+            else:
+                self._total_bytes += len(data) - previous_size
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+        return True
+
+    def clear(self):
+        """
+        Removes every entry
+
+        :return: None
+        """
+        with self._lock:
+            for path, _, _ in self._entry_files():
+                self._remove(path)
+            self._total_bytes = 0
+
+    def _evict(self):
+        """
+        Removes the least recently used files until the directory is back
+        under three quarters of max_bytes, so eviction does not run on
+        every write. Called with self._lock held.
+        """
+        entries = sorted(self._entry_files(), key=lambda entry: entry[1])
+        total_bytes = sum(size for _, _, size in entries)
+        target_bytes = self.max_bytes * 3 // 4
+        for path, _, size in entries:
+            if total_bytes <= target_bytes:
+                break
+            self._remove(path)
+            total_bytes -= size
+            self.stats.evictions += 1
+        self._total_bytes = total_bytes
+
+    def _entry_files(self):
+        """
+        :return: list of (path, modification time, size) for every entry file
+        """
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return []
+        entries = []
+        for file_name in names:
+            if not file_name.endswith(FILE_SUFFIX):
+                continue
+            path = os.path.join(self.directory, file_name)
+            try:
+                status = os.stat(path)
+            except OSError:
+                continue
+            entries.append((path, status.st_mtime, status.st_size))
+        return entries
+
+    def _directory_size(self):
+        return sum(size for _, _, size in self._entry_files())
+
+    @staticmethod
+    def _file_size(path):
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def get_disk_cache():
+    """
+    Returns the DiskCache persistent caches use, creating it on first use
+
+    :return: DiskCache object
+    """
+    global _disk_cache
+    with _disk_cache_lock:
+        if _disk_cache is None:
+            _disk_cache = DiskCache()
+        return _disk_cache
+
+
+def set_disk_cache(disk_cache):
+    """
+    Replaces the DiskCache persistent caches use
+
+    :param disk_cache: DiskCache object, or None to go back to the default
+    :return: None
+    """
+    global _disk_cache
+    with _disk_cache_lock:
+        _disk_cache = disk_cache
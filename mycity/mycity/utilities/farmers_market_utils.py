@@ -0,0 +1,102 @@
+"""
+The farmers markets of each weekday, with their speech already written
+
+The Farmers_Markets_Fresh_Trucks_View layer is fetched once per refresh.
+Its markets are grouped by Day_of_Week and deduplicated, and the answer for
+each day is rendered up front, so a request only looks up today's answer.
+
+"""
+
+import collections
+import logging
+
+import mycity.utilities.cache as cache
+import mycity.utilities.gis_utils as gis_utils
+from mycity.intents.custom_errors import BadAPIResponse
+
+logger = logging.getLogger(__name__)
+
+FARMERS_MARKETS_URL = 'https://services.arcgis.com/sFnw0xNflSi8J0uh/arcgis/' \
+                      'rest/services/Farmers_Markets_Fresh_Trucks_View/' \
+                      'FeatureServer/0'
+QUERY = {'where': '1=1', 'out_sr': '4326'}
+
+SPEECH_INTRODUCTION = 'Available farmers markets today are:\n'
+MARKET_SPEECH = '{Name} located at {Address} from {Hours}. '
+
+TABLE_TTL = 12 * 3600
+TABLE_STALE_TTL = 24 * 3600
+TABLE_FAILURE_TTL = 60
+
+
+class FarmersMarketTable(object):
+    """
+    Farmers markets grouped by the weekday they are open
+
+    @property: markets ::= dictionary of weekday name (Monday, Tuesday, ...)
+        to the list of attributes of that day's markets, each market once
+    @property: speech ::= dictionary of weekday name to the spoken list of
+        that day's markets
+    """
+
+    def __init__(self, features):
+        """
+        :param features: list of Farmers_Markets_Fresh_Trucks_View features
+        """
+        self.markets = {}
+        seen = set()
+        for feature in features:
+            attributes = feature.get('attributes', {})
+            # markets without a day or a name can't be listed
+            if not attributes.get('Day_of_Week') or \
+                    not attributes.get('Name'):
+                continue
+            # a market listed more than once is read out once
+            market = (attributes['Day_of_Week'], attributes['Name'],
+                      attributes.get('Address'), attributes.get('Hours'))
+            if market in seen:
+                continue
+            seen.add(market)
+            self.markets.setdefault(attributes['Day_of_Week'], []) \
+                .append(attributes)
+        self.speech = {
+            day: SPEECH_INTRODUCTION + ''.join(
+                MARKET_SPEECH.format_map(_speech_fields(attributes))
+                for attributes in markets)
+            for day, markets in self.markets.items()
+        }
+
+    def get_speech(self, day):
+        """
+        :param day: weekday name, such as "Monday"
+        :return: spoken list of the day's farmers markets
+        """
+        return self.speech.get(day, SPEECH_INTRODUCTION)
+
+
+def _speech_fields(attributes):
+    """
+    :param attributes: a market's attributes
+    :return: the attributes, with missing and null fields as empty strings
+        rather than read out as "None"
+    """
+    return collections.defaultdict(
+        str, {field: value for field, value in attributes.items()
+              if value is not None})
+
+
+@cache.cached('farmers_markets', ttl=TABLE_TTL, stale_ttl=TABLE_STALE_TTL,
+              maxsize=1, negative_ttl=TABLE_FAILURE_TTL,
+              negative_exceptions=(BadAPIResponse,), persistent=True)
+def get_farmers_market_table():
+    """
+    Fetches every farmers market and builds the table of each day's
+    markets
+
+    :return: FarmersMarketTable object
+    :raises: BadAPIResponse
+    """
+    features = gis_utils.get_features_from_feature_server(
+        FARMERS_MARKETS_URL, QUERY)
+    logger.debug('Fetched {} farmers market records'.format(len(features)))
+    return FarmersMarketTable(features)
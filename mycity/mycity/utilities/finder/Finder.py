@@ -4,9 +4,13 @@ based information about city services
 """
 
 import mycity.utilities.address_utils as address_utils
-import mycity.utilities.csv_utils as csv_utils
 import mycity.utilities.arcgis_utils as arcgis_utils
+import mycity.utilities.batch_geocode as batch_geocode
+import mycity.utilities.concurrency as concurrency
+import mycity.utilities.travel_time_utils as travel_time_utils
+from mycity.utilities.finder.RecordStore import RecordStore
 import logging
+import string
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +28,21 @@ class Finder(object):
         fields in the returned record for output_speech formatted string
     @property: origin_address ::= string that represents the address we will
         calculated driving distances from
+    @property: deadline ::= Deadline of the request, or None. Upstream calls
+        take their timeouts from it through the current deadline.
+    @property: max_destinations ::= number of destinations, closest to the
+        origin in a straight line, sent to the routing service to pick the
+        closest by driving distance from. None sends every destination.
+    @property: travel_mode ::= how driving time and distance are found:
+        ROUTED asks the ArcGIS routing service, ESTIMATED computes them
+        locally (see travel_time_utils), and ROUTED_WITH_FALLBACK asks the
+        routing service unless the request is short of time, and estimates
+        if it fails.
+    @property: result_count ::= number of destinations ranked by driving
+        time, all from one routing request, so a follow up asking for the
+        next closest needs no upstream calls
+    @property: ranked_records ::= the closest records with their driving
+        info, closest first, once start has run
 
     """
 
@@ -31,6 +50,20 @@ class Finder(object):
     CITY = "Boston"
     STATE = "MA"
     ERROR_MESSAGE = "Uh oh. Something went wrong!"
+    # Enough that the closest destination by road is among them even when a
+    # river or the harbor is in the way of the closest in a straight line
+    MAX_DESTINATIONS = 10
+
+    ROUTED = "routed"
+    ESTIMATED = "estimated"
+    ROUTED_WITH_FALLBACK = "routed_with_fallback"
+    TRAVEL_MODE = ROUTED_WITH_FALLBACK
+    # Routing is skipped in ROUTED_WITH_FALLBACK mode with less time left
+    MIN_ROUTING_SECONDS = 1.5
+    # With less time left, records without coordinates are only given the
+    # coordinates already cached rather than geocoded
+    MIN_GEOCODING_SECONDS = 3
+    RESULT_COUNT = 1
 
     def __init__(
             self,
@@ -62,7 +95,15 @@ class Finder(object):
         self.resource_url = resource_url
         self.address_key = address_key
         self.output_speech = output_speech
+        self.output_speech_format = output_speech
         self.field_formatter = output_speech_prep_func
+        self.deadline = req.deadline
+        self.max_destinations = self.MAX_DESTINATIONS
+        self.travel_mode = self.TRAVEL_MODE
+        self.result_count = self.RESULT_COUNT
+        self.ranked_records = []
+        self._records = None
+        self._access_token = None
 
         if origin_coordinates is None:
             # pull the origin address from request data model
@@ -90,37 +131,162 @@ class Finder(object):
         All subclasses should provide a get_records for start
         
         :return: None
+        :raises: DeadlineExceededError if the request has run out of time
         """
         logger.debug('')
-        records = self.get_records()
+        if self.deadline is not None:
+            self.deadline.check()
+        self._prefetch_access_token()
+        if self._records is not None:
+            records = self._records.result()
+        else:
+            records = self.get_records()
         self._start(records)
 
+    def prefetch_records(self):
+        """
+        Starts get_records in the background, so the records can be fetched
+        while other checks (such as is_in_city) run. start will use them.
+
+        :return: None
+        """
+        logger.debug('')
+        self._records = concurrency.submit(self.get_records)
+
+    def _prefetch_access_token(self):
+        """
+        Starts fetching the routing service's access token in the
+        background, so it is fetched while the records are. Nothing is
+        fetched if travel_mode will not route.
+
+        :return: None
+        """
+        if self._access_token is not None or \
+                self.travel_mode == Finder.ESTIMATED or \
+                self._short_of_time_to_route():
+            return
+        self._access_token = \
+            concurrency.submit(arcgis_utils.generate_access_token)
+
+    def _short_of_time_to_route(self):
+        """
+        :return: True if travel_mode falls back to estimating and the
+            request has too little time left to route
+        """
+        return self.travel_mode == Finder.ROUTED_WITH_FALLBACK and \
+            self.deadline is not None and \
+            self.deadline.remaining() < Finder.MIN_ROUTING_SECONDS
+
     def _start(self, records):
         """
         Process list of records and set the output_speech field. output_speech
         will be queried by creator of a Finder object and used to 
         construct a MyCityResponseDataModel
         
-        :param records: a list of all location records, records are stored as 
-            dictionaries
+        :param records: a RecordStore, or a list of all location records
+            stored as dictionaries
         :return: None
         """
-        logger.debug('Last 5 records: ' + str(records[:5]))
-        records = self.add_city_and_state_to_records(records)
-        
-        destination_coordinate_dictionary = self.records_to_coordinate_dict(records)
-        api_access_token = arcgis_utils.generate_access_token()
-        closest_dest = arcgis_utils.find_closest_route(api_access_token,
-                                                        self.origin_coordinates,
-                                                        destination_coordinate_dictionary)
-
-        closest_record = \
-            self.get_closest_record_with_driving_info(closest_dest,
-                                                      records)
-        formatted_record = self.field_formatter(closest_record)
+        store = self.to_record_store(records)
+        logger.debug('{} records'.format(len(store)))
+
+        destination_coordinate_dictionary = store.coordinate_dict(
+            self.nearest_rows(store))
+        if not destination_coordinate_dictionary:
+            self.output_speech = Finder.ERROR_MESSAGE
+            return
+        if self.result_count > 1:
+            closest_dests = self.find_closest_destinations(
+                destination_coordinate_dictionary, self.result_count)
+        else:
+            closest_dest = self.find_closest_destination(
+                destination_coordinate_dictionary)
+            closest_dests = [closest_dest] if closest_dest is not None \
+                else None
+        if not closest_dests:
+            self.output_speech = Finder.ERROR_MESSAGE
+            return
+
+        self.ranked_records = []
+        for closest_dest in closest_dests:
+            closest_record = \
+                self.get_closest_record_with_driving_info(closest_dest, store)
+            if closest_record is None:
+                continue
+            formatted_record = self.field_formatter(closest_record)
+            self.ranked_records.append(closest_record)
+        if not self.ranked_records:
+            self.output_speech = Finder.ERROR_MESSAGE
+            return
         # TODO: Should this be called with formatted_record?
-        self.set_output_speech(closest_record)
-        
+        self.set_output_speech(self.ranked_records[0])
+
+    def find_closest_destination(self, coordinate_dict):
+        """
+        Finds the destination closest to the origin by driving time,
+        routed or estimated according to travel_mode
+
+        :param coordinate_dict: dictionary with (X, Y) coordinates as keys
+            and address strings as values
+        :return: dictionary with address, driving time and driving distance
+            of the closest destination, or None if it could not be found
+        """
+        return self._find_by_travel_mode(
+            lambda access_token: arcgis_utils.find_closest_route(
+                access_token, self.origin_coordinates, coordinate_dict),
+            lambda: travel_time_utils.estimate_closest_route(
+                self.origin_coordinates, coordinate_dict))
+
+    def find_closest_destinations(self, coordinate_dict, count):
+        """
+        Ranks the destinations closest to the origin by driving time,
+        routed in one request or estimated according to travel_mode
+
+        :param coordinate_dict: dictionary with (X, Y) coordinates as keys
+            and address strings as values
+        :param count: number of destinations wanted
+        :return: list of dictionaries with address, driving time and
+            driving distance of the closest destinations, closest first, or
+            None if they could not be found
+        """
+        return self._find_by_travel_mode(
+            lambda access_token: arcgis_utils.find_closest_routes(
+                access_token, self.origin_coordinates, coordinate_dict,
+                count),
+            lambda: travel_time_utils.estimate_closest_routes(
+                self.origin_coordinates, coordinate_dict, count))
+
+    def _find_by_travel_mode(self, route, estimate):
+        """
+        :param route: function of the access token asking the routing
+            service, returning None if it found no answer
+        :param estimate: function estimating the answer locally
+        :return: the answer of route or estimate, as travel_mode asks
+        """
+        if self.travel_mode == Finder.ESTIMATED:
+            return estimate()
+
+        fallback = self.travel_mode == Finder.ROUTED_WITH_FALLBACK
+        if self._short_of_time_to_route():
+            logger.debug("Too little time left to route, estimating")
+            return estimate()
+
+        try:
+            if self._access_token is None:
+                access_token = arcgis_utils.generate_access_token()
+            else:
+                access_token = self._access_token.result()
+            found = route(access_token)
+        except Exception:
+            if not fallback:
+                raise
+            logger.debug("Routing failed", exc_info=True)
+            found = None
+        if found is None and fallback:
+            logger.debug("No route found, estimating")
+            found = estimate()
+        return found
+
     def get_output_speech(self):
         """
         Return formatted speech output or the standard error message
@@ -168,55 +334,133 @@ class Finder(object):
         :param driving_info: dictionary with address, time to drive to
             address, and distance to the address (representing the closest
             destination to the origin)
-        :param records: a list of all location records, records are stored as 
-            dictionaries
+        :param records: a RecordStore, or a list of all location records
+            stored as dictionaries
         :return: a merged dictionary with driving time, driving_distance and all 
             fields from the closest record
         """
-        logger.debug('driving_info:' + str(driving_info) +
-                     'records:' + str(records))
+        logger.debug('driving_info:' + str(driving_info))
+        if isinstance(records, RecordStore):
+            row = records.row_for_address(driving_info[self.address_key])
+            if row is None:
+                return None
+            return {**records.record(row), **driving_info}
         for record in records:
             if driving_info[self.address_key] == record[self.address_key]:
                 # NOTE: This will overwrite any common fields (however
                 #       unlikely) between the two dictionaries.
                 return {**record, **driving_info}
 
-    def add_city_and_state_to_records(self, records):
+    def geocode_missing_coordinates(self, records):
         """
-        Appends a city and state to the address value of each record
-        
-        :param records: a list of all location records, records are stored as 
-            dictionaries
-        :return: list of location dictionaries with updated address values
+        Fills in the X and Y of records that only have an address, geocoding
+        all of their addresses together. If the request is short of time,
+        only coordinates already cached are used and the other records are
+        left without, to be geocoded by a later request.
+
+        :param records: a RecordStore, or a list of all location records
+            stored as dictionaries
+        :return: the same records, with coordinates added where they were
+            found
         """
-        logger.debug('records:' + str(records))
-        return csv_utils.add_city_and_state_to_records(records,
-                                                       self.address_key,
-                                                       city=Finder.CITY,
-                                                       state=Finder.STATE)
+        cached_only = self.deadline is not None and \
+            self.deadline.remaining() < Finder.MIN_GEOCODING_SECONDS
+        if isinstance(records, RecordStore):
+            rows = records.rows_without_coordinates()
+            if not rows:
+                return records
+            coordinates = batch_geocode.geocode_addresses(
+                (records.address(row) for row in rows), cached_only)
+            for row in rows:
+                found = coordinates.get(records.address(row))
+                if found is not None:
+                    records.set_coordinates(row, found['x'], found['y'])
+            return records
+
+        missing = [record for record in records
+                   if not str(record.get('X') or '').strip() or
+                   not str(record.get('Y') or '').strip()]
+        if not missing:
+            return records
+        logger.debug("Geocoding {} records without coordinates".format(
+            len(missing)))
+        coordinates = batch_geocode.geocode_addresses(
+            (record[self.address_key] for record in missing), cached_only)
+        for record in missing:
+            found = coordinates.get(record[self.address_key])
+            if found is not None:
+                record['X'] = found['x']
+                record['Y'] = found['y']
+        return records
 
-    def records_to_coordinate_dict(self, records):
+    def output_speech_fields(self):
         """
-        Takes a set of Records and returns a 
-            (X, Y) Coordinate -> address dictionary
+        :return: set of the field names the output speech format uses
+        """
+        return {name for _, name, _, _ in
+                string.Formatter().parse(self.output_speech_format) if name}
 
-        :param records: a list of all location records, records are stored
-            as dictionaries
-        :return: dictionary with (X, Y) coordinates as keys and address
-            strings as values
+    def get_ranked_results(self):
         """
-        logger.debug("Transforming records into (X, Y) Coordinate dict")
+        Packs the ranked records compactly for session attributes: only the
+        fields the output speech uses, listed once, and one list of values
+        per record
 
-        coordinate_dict = {}
-        for record in records:
-            x = record['X']
-            y = record['Y']
-            address_string = record['Address']
-            coordinate_dict[(x, y)] = address_string
+        :return: dictionary with 'fields', a list of field names, and
+            'rows', a list of each ranked record's values of those fields,
+            closest first
+        """
+        fields = sorted(self.output_speech_fields())
+        return {
+            'fields': fields,
+            'rows': [[record.get(field) for field in fields]
+                     for record in self.ranked_records],
+        }
 
-        return coordinate_dict
+    @staticmethod
+    def get_ranked_result(ranked_results, index):
+        """
+        :param ranked_results: dictionary from get_ranked_results
+        :param index: rank of the record wanted, 0 for the closest
+        :return: dictionary of the record's fields, or None if there are
+            not that many ranked records
+        """
+        rows = ranked_results.get('rows') or []
+        if not 0 <= index < len(rows):
+            return None
+        return {field: value for field, value in
+                zip(ranked_results['fields'], rows[index])
+                if value is not None}
 
+    def to_record_store(self, records):
+        """
+        :param records: a RecordStore, or a list of all location records
+            stored as dictionaries
+        :return: RecordStore of the records, with the city and state
+            appended to their addresses
+        """
+        if isinstance(records, RecordStore):
+            return records
+        return RecordStore(records, self.address_key,
+                           " " + Finder.CITY + ", " + Finder.STATE)
 
+    def nearest_rows(self, store):
+        """
+        Picks the rows of the max_destinations destinations closest to the
+        origin, so the routing service only has to solve for likely answers
+
+        :param store: RecordStore of the destinations
+        :return: list of row numbers, closest first when the origin
+            coordinates are known
+        """
+        if self.max_destinations is None or \
+                not isinstance(self.origin_coordinates, dict):
+            return store.rows_with_coordinates()
+        rows = store.nearest_rows(self.origin_coordinates,
+                                  self.max_destinations)
+        logger.debug("Kept {} of {} destinations".format(len(rows),
+                                                         len(store)))
+        return rows
 
     def geocode_origin_address(self):
         """
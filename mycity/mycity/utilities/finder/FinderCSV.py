@@ -3,7 +3,7 @@ Uses csv files to find location based information about Boston city services
 """
 
 import csv
-import requests
+import mycity.utilities.dataset_fetch as dataset_fetch
 from mycity.utilities.finder.Finder import Finder
 import logging
 
@@ -12,6 +12,10 @@ from mycity.utilities.location_services_utils import is_location_in_city
 logger = logging.getLogger(__name__)
 
 
+def _keep_every_record(record):
+    return record
+
+
 class FinderCSV(Finder):
 
     """
@@ -20,7 +24,7 @@ class FinderCSV(Finder):
     @property: filter ::= filter function to conditionally remove records
 
     """
-    default_filter = lambda record : record  # filter that filters nothing
+    default_filter = _keep_every_record  # filter that filters nothing
 
     def __init__(
             self,
@@ -30,7 +34,9 @@ class FinderCSV(Finder):
             output_speech,
             output_speech_prep_func,
             filter = default_filter,
-            origin_coordinates = None
+            origin_coordinates = None,
+            encoding = dataset_fetch.DEFAULT_ENCODING,
+            fields = None
     ):
         """
         Call super constructor and save filter
@@ -54,6 +60,10 @@ class FinderCSV(Finder):
         :param origin_coordinates: coordinates to use as the orgin for
             distance search. If None, will use the address in the req
             parameter
+        :param encoding: encoding the csv file is served in
+        :param fields: columns to keep besides the coordinates, the address
+            and those output_speech names. Other columns are dropped as
+            the file is read.
         """
 
         super().__init__(
@@ -65,6 +75,8 @@ class FinderCSV(Finder):
             origin_coordinates
         )
         self._filter = filter
+        self.encoding = encoding
+        self.fields = fields
 
     def is_in_city(self):
         """
@@ -79,44 +91,63 @@ class FinderCSV(Finder):
         Subclasses must provide a get_records method. Base class will
         handle all processing
 
-        :return: list of dictionaries representing the resource csv file
+        The file is streamed through parse_records as it downloads, and
+        the resulting store is kept for each version of the file, so while
+        it is unchanged it is neither downloaded nor parsed again. The
+        store is shared by every request. Records without coordinates are
+        geocoded after it is fetched rather than as it is parsed, so an
+        address that could not be geocoded is retried as soon as its
+        failure expires, whether or not the file has changed.
+
+        :return: RecordStore of the resource csv file's records, empty if
+            the file could not be downloaded
         """
         logger.debug('')
-        return self.file_to_filtered_records(self.fetch_resource())
-
-    def fetch_resource(self):
+        filter_name = _stable_name(self._filter)
+        dataset = dataset_fetch.fetch_dataset(
+            self.resource_url, self.encoding, parse=self.parse_records,
+            parse_key=('records', self.address_key,
+                       tuple(sorted(self.kept_fields())),
+                       filter_name or self._filter),
+            persistent=filter_name is not None)
+        if dataset is None:
+            logger.error('Could not download ' + str(self.resource_url))
+            return self.to_record_store([])
+        return self.geocode_missing_coordinates(dataset.value)
+
+    def kept_fields(self):
         """
-        Make api call to get csv resource and return it as a string
-
-        :return: a string representation of the csv file
+        :return: set of the columns parse_records keeps
         """
-        logger.debug('')
+        kept = {'X', 'Y', self.address_key}
+        kept.update(self.output_speech_fields())
+        if self.fields:
+            kept.update(self.fields)
+        return kept
 
-        r = requests.get(self.resource_url)
-        if r.status_code == 200:
-            file_contents = r.content.decode(r.apparent_encoding)
-        else:
-            file_contents = None
-        r.close()
-        return file_contents
-
-    def file_to_filtered_records(self, file_contents):
+    def parse_records(self, lines):
         """
-        Convert the string representation of the csv file into a list of
-        dictionaries, each representing one record
+        Reads csv lines one record at a time, keeping the records that pass
+        the filter and only the columns in kept_fields
 
-        :param file_contents: contents from successful GET on resource_url,
-            a string representation of the csv file
-        :return: a list of dictionaries (OrderedDict) each representing one
-            row from the csv
+        :param lines: iterable of the csv file's lines
+        :return: RecordStore of the records
         """
-        logger.debug('file_contents:' + str(file_contents).replace('\n', '\r'))
-        return list(
-            filter(
-                self._filter,
-                csv.DictReader(
-                   file_contents.splitlines(),
-                   delimiter=','
-                )
-            )
-        )
+        kept = self.kept_fields()
+        records = ({field: value for field, value in record.items()
+                    if field in kept}
+                   for record in csv.DictReader(lines, delimiter=',')
+                   if self._filter(record))
+        return self.to_record_store(records)
+
+
+def _stable_name(function):
+    """
+    :return: the module and qualified name of a function defined at module
+        or class level, the same in every process, or None for lambdas and
+        nested functions
+    """
+    name = getattr(function, '__qualname__', '')
+    if not name or '<' in name:
+        return None
+    return getattr(function, '__module__', '') + '.' + name
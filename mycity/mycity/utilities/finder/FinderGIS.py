@@ -2,8 +2,9 @@
 Uses ArcGIS to find location based information about Boston city services
 """
 
+import mycity.utilities.arcgis_utils as arcgis_utils
+import mycity.utilities.gis_utils as gis_utils
 from mycity.utilities.finder.Finder import Finder
-from mycity.utilities.gis_utils import get_features_from_feature_server
 import logging
 
 logger = logging.getLogger(__name__)
@@ -12,11 +13,26 @@ logger = logging.getLogger(__name__)
 class FinderGIS(Finder):
     """
     Finder subclass to find Feature locations from ArcGIS Feature Server
+
+    The query is narrowed on the server: only features within
+    search_radius_meters of the origin, only the fields the output speech
+    and the address need, and geometry only when the coordinates are not
+    attributes. If nothing is that close, every feature is asked for.
+
     @property: query ::= parameter for call to ArcGIS server
+    @property: fields ::= other fields to ask for, such as those the
+        output_speech_prep_func reads
+    @property: coordinate_fields ::= (longitude, latitude) attribute names
+        if the layer has its coordinates as fields, else None and the
+        geometry is asked for
+    @property: search_radius_meters ::= distance around the origin features
+        are asked for within, or None for every feature
 
     """
     # default query returns all records
     DEFAULT_QUERY = "1=1"
+    # Features further away are not asked for while any is nearer
+    SEARCH_RADIUS_METERS = 5000
 
     def __init__(
             self,
@@ -25,15 +41,18 @@ class FinderGIS(Finder):
             address_key,
             output_speech,
             output_speech_prep_func,
-            query=DEFAULT_QUERY
+            query=DEFAULT_QUERY,
+            origin_coordinates=None,
+            fields=None,
+            coordinate_fields=None
     ):
         """
         Call super constructor and save query
 
         :param req: MyCityRequestDataModel
-        :param resource_url: String that Finder classes will 
+        :param resource_url: String that Finder classes will
             use to GET or query from
-        :param address_key: string that names the type of 
+        :param address_key: string that names the type of
             location we are finding
         :param output_speech: String that will be formatted later
             with closest location to origin address. NOTE: this should
@@ -43,26 +62,100 @@ class FinderGIS(Finder):
         :param output_speech_prep_func: function that will access
             and modify fields in the returned record for output_speech
             formatted string
-        :param query: parameter for call to ArcGIS server 
+        :param query: parameter for call to ArcGIS server
+        :param origin_coordinates: coordinates to use as the orgin for
+            distance search. If None, will use the address in the req
+            parameter
+        :param fields: other fields to ask for besides the address and
+            those output_speech names
+        :param coordinate_fields: (longitude, latitude) field names, if the
+            layer has its coordinates as attributes
         """
         super().__init__(
             req,
             resource_url,
             address_key,
             output_speech,
-            output_speech_prep_func
+            output_speech_prep_func,
+            origin_coordinates=origin_coordinates
         )
         self.query = query
+        self.fields = fields
+        self.coordinate_fields = coordinate_fields
+        self.search_radius_meters = self.SEARCH_RADIUS_METERS
 
     def get_records(self):
         """
-        Query City of Boston Feature Server, and return a list of features
-        
-        :return: list of features corresponding to query
+        Query City of Boston Feature Server for the features near the
+        origin, or every feature if none is near
+
+        :return: RecordStore of the features' attributes, with their
+            coordinates as X and Y
         """
         logger.debug('')
+        store = self.to_record_store(self.features_to_records(
+            self.iter_features(self.search_radius_meters)))
+        if len(store) == 0 and self.search_radius_meters is not None:
+            logger.debug('Nothing within {} meters, querying every '
+                         'feature'.format(self.search_radius_meters))
+            store = self.to_record_store(
+                self.features_to_records(self.iter_features(None)))
+        return store
 
-        return get_features_from_feature_server(
-            self.resource_url,
-            self.query
-        )
+    def kept_fields(self):
+        """
+        :return: set of the fields asked for
+        """
+        kept = {self.address_key}
+        kept.update(self.output_speech_fields())
+        kept.difference_update((arcgis_utils.DRIVING_DISTANCE_TEXT_KEY,
+                                arcgis_utils.DRIVING_TIME_TEXT_KEY))
+        if self.fields:
+            kept.update(self.fields)
+        if self.coordinate_fields:
+            kept.update(self.coordinate_fields)
+        return kept
+
+    def build_query(self, radius_meters):
+        """
+        :param radius_meters: distance around the origin to ask for features
+            within, or None for every feature
+        :return: dictionary of Feature Server query parameters
+        """
+        query = self.query if isinstance(self.query, dict) \
+            else {'where': self.query}
+        query = dict(query)
+        query['out_fields'] = ','.join(sorted(self.kept_fields()))
+        query['return_geometry'] = self.coordinate_fields is None
+        query['out_sr'] = '4326'
+        if radius_meters is not None and \
+                isinstance(self.origin_coordinates, dict):
+            query.update(gis_utils.distance_query(self.origin_coordinates,
+                                                  radius_meters))
+        return query
+
+    def iter_features(self, radius_meters):
+        """
+        :param radius_meters: as for build_query
+        :return: generator of the features, fetched page by page
+        """
+        return gis_utils.iter_features_from_feature_server(
+            self.resource_url, self.build_query(radius_meters))
+
+    def features_to_records(self, features):
+        """
+        :param features: iterable of Feature dictionaries
+        :return: generator of each feature's attributes, with its
+            coordinates as X and Y
+        """
+        for feature in features:
+            record = dict(feature.get('attributes') or {})
+            if self.coordinate_fields is not None:
+                x_field, y_field = self.coordinate_fields
+                record['X'] = record.get(x_field)
+                record['Y'] = record.get(y_field)
+            else:
+                geometry = feature.get('geometry') or {}
+                record['X'] = geometry.get('x')
+                record['Y'] = geometry.get('y')
+            yield record
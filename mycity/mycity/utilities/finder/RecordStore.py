@@ -0,0 +1,172 @@
+"""
+Column oriented storage of a Finder dataset's records
+"""
+
+import array
+import heapq
+import logging
+import math
+import sys
+
+logger = logging.getLogger(__name__)
+
+
+class RecordStore(object):
+    """
+    A dataset's records held by column rather than as one dictionary per
+    row. Coordinates are kept as arrays of floats, so the distances to
+    every record are computed in one tight loop, and repeated strings
+    (fees, neighborhoods, empty fields) are stored once. A dictionary is
+    only built for the rows a caller asks for.
+
+    Apart from rows gaining the coordinates geocoding finds for them, the
+    store is not changed once it is filled in, so one store can be shared
+    by every request while its dataset is unchanged.
+
+    @property: address_key ::= field holding each record's address
+    @property: fields ::= field names, in the order they first appear
+    @property: xs ::= array of each record's longitude, NaN if it has none
+    @property: ys ::= array of each record's latitude, NaN if it has none
+    """
+
+    def __init__(self, records, address_key, address_suffix=''):
+        """
+        :param records: iterable of record dictionaries, with 'X' and 'Y'
+            coordinates where known
+        :param address_key: field holding each record's address
+        :param address_suffix: string appended to every address, such as
+            " Boston, MA"
+        """
+        self.address_key = address_key
+        self.fields = []
+        self._columns = {}
+        self.xs = array.array('d')
+        self.ys = array.array('d')
+        self._rows_by_address = {}
+        self._length = 0
+
+        for row, record in enumerate(records):
+            for field in record:
+                if field not in self._columns:
+                    self.fields.append(field)
+                    self._columns[field] = [None] * row
+            for field in self.fields:
+                value = record.get(field)
+                if field == address_key and value is not None:
+                    value = value + address_suffix
+                if isinstance(value, str):
+                    value = sys.intern(value)
+                self._columns[field].append(value)
+            self.xs.append(_to_float(record.get('X')))
+            self.ys.append(_to_float(record.get('Y')))
+            address = self._columns[address_key][row] \
+                if address_key in self._columns else None
+            self._rows_by_address.setdefault(address, row)
+            self._length = row + 1
+
+    def __len__(self):
+        return self._length
+
+    def value(self, row, field):
+        """
+        :return: the field of a row, or None if the row has no such field
+        """
+        column = self._columns.get(field)
+        return column[row] if column is not None else None
+
+    def address(self, row):
+        return self.value(row, self.address_key)
+
+    def record(self, row):
+        """
+        :param row: row number
+        :return: a new dictionary of every field of the row
+        """
+        return {field: self._columns[field][row] for field in self.fields
+                if self._columns[field][row] is not None}
+
+    def records(self):
+        """
+        :return: list of a new dictionary for every row
+        """
+        return [self.record(row) for row in range(self._length)]
+
+    def row_for_address(self, address):
+        """
+        :param address: address, with the suffix the store was built with
+        :return: the first row with that address, or None
+        """
+        return self._rows_by_address.get(address)
+
+    def rows_with_coordinates(self):
+        """
+        :return: list of the rows that have coordinates, in order
+        """
+        return [row for row, (x, y) in enumerate(zip(self.xs, self.ys))
+                if not (math.isnan(x) or math.isnan(y))]
+
+    def rows_without_coordinates(self):
+        """
+        :return: list of the rows that have no coordinates, in order
+        """
+        return [row for row, (x, y) in enumerate(zip(self.xs, self.ys))
+                if math.isnan(x) or math.isnan(y)]
+
+    def set_coordinates(self, row, x, y):
+        """
+        Gives a row without coordinates the coordinates found for it
+
+        :param row: row number
+        :param x: longitude
+        :param y: latitude
+        :return: None
+        """
+        for field, value in (('X', x), ('Y', y)):
+            if field not in self._columns:
+                self.fields.append(field)
+                self._columns[field] = [None] * self._length
+            self._columns[field][row] = value
+        self.xs[row] = float(x)
+        self.ys[row] = float(y)
+
+    def nearest_rows(self, origin, count=None):
+        """
+        Finds the rows closest to an origin. Distances are measured on a
+        plane tangent at the origin's latitude, which across a city ranks
+        points as the great-circle distance does.
+
+        :param origin: dictionary with 'x' (longitude) and 'y' (latitude)
+            keys
+        :param count: number of rows to keep, or None for every row with
+            coordinates
+        :return: list of row numbers, closest first. Rows without
+            coordinates are left out.
+        """
+        origin_x, origin_y = float(origin['x']), float(origin['y'])
+        x_scale = math.cos(math.radians(origin_y))
+        x_scale *= x_scale
+        # NaN compares false, so rows without coordinates drop out here
+        distances = [((x - origin_x) * (x - origin_x) * x_scale +
+                      (y - origin_y) * (y - origin_y), row)
+                     for row, (x, y) in enumerate(zip(self.xs, self.ys))
+                     if x == x and y == y]
+        if count is None:
+            distances.sort()
+            return [row for _, row in distances]
+        return [row for _, row in heapq.nsmallest(count, distances)]
+
+    def coordinate_dict(self, rows):
+        """
+        :param rows: row numbers, in the order wanted
+        :return: dictionary with (X, Y) coordinates, as the records give
+            them, as keys and address strings as values
+        """
+        return {(self.value(row, 'X'), self.value(row, 'Y')):
+                self.address(row) for row in rows}
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
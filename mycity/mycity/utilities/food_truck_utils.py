@@ -0,0 +1,111 @@
+"""
+A daily snapshot of the food truck schedule, searched in process
+
+The whole food_truck_schedule layer is a few hundred stops, so rather than
+asking the FeatureServer for the trucks near each user, the layer is
+fetched once and indexed by weekday and by a grid of its stops' locations.
+The snapshot is kept fresh for SNAPSHOT_TTL; after that it is still served
+for up to SNAPSHOT_STALE_TTL while a background thread fetches a new one,
+so no request waits for the layer once a container has it.
+
+"""
+
+import logging
+import math
+
+import mycity.utilities.cache as cache
+import mycity.utilities.gis_utils as gis_utils
+from mycity.intents.custom_errors import BadAPIResponse
+
+logger = logging.getLogger(__name__)
+
+FOOD_TRUCK_SCHEDULE_URL = 'https://services.arcgis.com/sFnw0xNflSi8J0uh/' \
+                          'arcgis/rest/services/food_truck_schedule/' \
+                          'FeatureServer/0/'
+
+METERS_PER_MILE = 1609.344
+METERS_PER_DEGREE_LATITUDE = 111320.0
+
+# Grid cell size in degrees, a little over a mile in Boston
+CELL_SIZE = 0.02
+
+SNAPSHOT_TTL = 12 * 3600
+SNAPSHOT_STALE_TTL = 24 * 3600
+SNAPSHOT_FAILURE_TTL = 60
+
+
+class FoodTruckSchedule(object):
+    """
+    Food truck stops indexed by the day they are served and by location
+
+    @property: days ::= dictionary of weekday name (Monday, Tuesday, ...)
+        to a dictionary of grid cell to the stops in it
+    """
+
+    def __init__(self, features, cell_size=CELL_SIZE):
+        """
+        :param features: list of food_truck_schedule features, with
+            longitude/latitude geometry. Features without a day or a
+            location are left out.
+        :param cell_size: grid cell size in degrees
+        """
+        self.cell_size = cell_size
+        self.days = {}
+        for feature in features:
+            day = feature.get('attributes', {}).get('Day')
+            geometry = feature.get('geometry') or {}
+            if not day or geometry.get('x') is None or \
+                    geometry.get('y') is None:
+                continue
+            cell = self._cell(geometry['x'], geometry['y'])
+            self.days.setdefault(day, {}).setdefault(cell, []).append(feature)
+
+    def _cell(self, x, y):
+        return (int(math.floor(x / self.cell_size)),
+                int(math.floor(y / self.cell_size)))
+
+    def find_within(self, origin, day, radius_meters=METERS_PER_MILE):
+        """
+        :param origin: dictionary with 'x' (longitude) and 'y' (latitude)
+            keys
+        :param day: weekday name, such as "Monday"
+        :param radius_meters: search radius
+        :return: list of the day's stops within the radius, closest first
+        """
+        grid = self.days.get(day)
+        if not grid:
+            return []
+        x, y = float(origin['x']), float(origin['y'])
+        y_span = radius_meters / METERS_PER_DEGREE_LATITUDE
+        x_span = y_span / max(math.cos(math.radians(y)), 0.01)
+        min_cell_x, min_cell_y = self._cell(x - x_span, y - y_span)
+        max_cell_x, max_cell_y = self._cell(x + x_span, y + y_span)
+
+        found = []
+        for cell_x in range(min_cell_x, max_cell_x + 1):
+            for cell_y in range(min_cell_y, max_cell_y + 1):
+                for feature in grid.get((cell_x, cell_y), ()):
+                    distance = gis_utils.calculate_distance(
+                        {'x': x, 'y': y}, feature)
+                    if distance <= radius_meters:
+                        found.append((distance, feature))
+        found.sort(key=lambda item: item[0])
+        return [feature for _, feature in found]
+
+
+@cache.cached('food_truck_schedule', ttl=SNAPSHOT_TTL,
+              stale_ttl=SNAPSHOT_STALE_TTL, maxsize=1,
+              negative_ttl=SNAPSHOT_FAILURE_TTL,
+              negative_exceptions=(BadAPIResponse,), persistent=True)
+def get_food_truck_schedule():
+    """
+    Fetches the whole food truck schedule and indexes it
+
+    :return: FoodTruckSchedule object
+    :raises: BadAPIResponse
+    """
+    features = gis_utils.get_features_from_feature_server(
+        FOOD_TRUCK_SCHEDULE_URL, {'where': '1=1', 'out_sr': '4326',
+                                  'out_fields': '*'})
+    logger.debug('Fetched {} food truck stops'.format(len(features)))
+    return FoodTruckSchedule(features)
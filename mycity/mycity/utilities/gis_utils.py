@@ -5,16 +5,16 @@ NOTE: Intents that query FeatureServers may fail because AWS will
 kill any computation that takes longer than 3 secs.
 
 """
-from arcgis.gis import GIS
-from arcgis.features import FeatureLayer
-from arcgis.geocoding import geocode
-from arcgis.geocoding import reverse_geocode
 from mycity.intents.custom_errors import MultipleAddressError, BadAPIResponse
-from arcgis import geometry
+import mycity.utilities.arcgis_utils as arcgis_utils
+import mycity.utilities.cache as cache
 import logging
+import math
 
 logger = logging.getLogger(__name__)
-dev_gis = GIS()
+
+# Mean radius of the earth in meters, used for geodesic distances
+EARTH_RADIUS_METERS = 6371008.8
 
 # A list of neighborhoods in Boston for address geocoding
 NEIGHBORHOODS = ['Allston',
@@ -48,6 +48,9 @@ NEIGHBORHOODS = ['Allston',
                  'West Roxbury']
 
 
+@cache.cached('feature_server', ttl=900, maxsize=256, copy_result=True,
+              negative_ttl=60, negative_exceptions=(BadAPIResponse,),
+              persistent=True)
 def get_features_from_feature_server(url, query):
     """
     Given a url to a City of Boston Feature Server, return a list
@@ -55,17 +58,54 @@ def get_features_from_feature_server(url, query):
 
     :param url: url for Feature Server
     :param query: a JSON object (example: { 'where': '1=1', 'out_sr': '4326' })
+        or a where clause string
     :return: list of all features returned from the query
     """
 
     logger.debug('url received: ' + url + ', query received: ' + str(query))
 
-    features = []
-    f = FeatureLayer(url=url)
-    feature_set = f.query(**query)
-    for feature in feature_set:
-        features.append(feature.as_dict)
-    return features
+    if isinstance(query, str):
+        query = {'where': query}
+    return arcgis_utils.query_feature_layer(url, query)
+
+
+def iter_features_from_feature_server(url, query):
+    """
+    Given a url to a City of Boston Feature Server, yield the Features a
+    query returns, page by page as they arrive. Unlike
+    get_features_from_feature_server nothing is cached, which suits
+    queries around one user's location.
+
+    :param url: url for Feature Server
+    :param query: a JSON object (example: { 'where': '1=1', 'out_sr': '4326' })
+        or a where clause string
+    :return: generator of the features returned from the query
+    :raises: BadAPIResponse while iterating
+    """
+    logger.debug('url received: ' + url + ', query received: ' + str(query))
+
+    if isinstance(query, str):
+        query = {'where': query}
+    return arcgis_utils.iter_feature_layer(url, query)
+
+
+def distance_query(origin, radius_meters):
+    """
+    Builds the spatial part of a Feature Server query, so that the server
+    only returns the features within a distance of an origin
+
+    :param origin: dictionary with 'x' (longitude) and 'y' (latitude) keys
+    :param radius_meters: distance from the origin in meters
+    :return: dictionary of query parameters, to be merged into a query
+    """
+    return {
+        'geometry': '{},{}'.format(origin['x'], origin['y']),
+        'geometry_type': 'esriGeometryPoint',
+        'in_sr': '4326',
+        'spatial_rel': 'esriSpatialRelIntersects',
+        'distance': radius_meters,
+        'units': 'esriSRUnit_Meter',
+    }
 
 
 def _get_dest_addresses_from_features(feature_address_index, features):
@@ -97,13 +137,10 @@ def _get_dest_addresses_from_features(feature_address_index, features):
 def geocode_address(m_address, zipcode = None):
     """
     :param m_address: address of interest in street form
+    :param zipcode: zip code to restrict the search to
     :return: address in coordinate (X and Y) form
     """
-    WITH_ZIP = "{address}, State:Ma, Zone:{zipcode}"
-    WITHOUT_ZIP = "{address}, City:Boston, State:Ma"
-    m_address = WITH_ZIP.format(address=m_address, zipcode=zipcode) \
-         if zipcode is not None else WITHOUT_ZIP.format(address=m_address)
-    m_location = geocode(address=m_address)
+    m_location = _geocode(m_address, zipcode)
     confident = confidenceCheck(m_location)
     if confident:
         return m_location[0]['location']
@@ -115,6 +152,17 @@ def geocode_address(m_address, zipcode = None):
     return m_location[0]['location']
 
 
+def _geocode(address, zipcode=None):
+    """
+    Geocodes a single line address through the shared geocoding cache
+
+    :param address: single line address string
+    :param zipcode: zip code to restrict the search to
+    :return: list of candidate dictionaries returned by ArcGIS
+    """
+    return arcgis_utils.find_address_candidates(address, zipcode)
+
+
 def confidenceCheck(addresses):
     overNinetyFiveCount = 0
     for address in addresses:
@@ -126,14 +174,15 @@ def confidenceCheck(addresses):
         return True
 
 
-def geocode_addr(addr, city):
+def geocode_addr(addr, city, zipcode=None):
     """
     Given a string and a city, determine if the address is in Boston, MA
     :param addr: string corresponding to the address
     :param city: the city of interest
+    :param zipcode: zip code to restrict the search to
     :return: boolean
     """
-    m_location = geocode(addr)
+    m_location = _geocode(addr, zipcode)
 
     for location in m_location:
         if location['score'] < 100:
@@ -159,7 +208,7 @@ def reverse_geocode_addr(coord_list):
     :param coord_list: a list of [Long, Lat]
     :return: a descriptive location
     """
-    return reverse_geocode(coord_list)
+    return arcgis_utils.reverse_geocode(coord_list)
 
 
 def calculate_distance(feature1, feature2):
@@ -170,9 +219,24 @@ def calculate_distance(feature1, feature2):
     """
     geometry1 = feature1  # feature1 is the address, which is already a geometry
     geometry2 = feature2['geometry']
-    spatial_ref = {"wkid": 4326}
-    return geometry.distance(spatial_ref,
-                             geometry1,
-                             geometry2,
-                             distance_unit='',
-                             geodesic=True)['distance']
+    return geodesic_distance(geometry1['x'], geometry1['y'],
+                             geometry2['x'], geometry2['y'])
+
+
+def geodesic_distance(x1, y1, x2, y2):
+    """
+    Great-circle distance between two WGS84 points, computed locally
+    with the haversine formula
+
+    :param x1: longitude of the first point
+    :param y1: latitude of the first point
+    :param x2: longitude of the second point
+    :param y2: latitude of the second point
+    :return: the distance in meters
+    """
+    lat1, lat2 = math.radians(y1), math.radians(y2)
+    half_dlat = (lat2 - lat1) / 2
+    half_dlong = math.radians(x2 - x1) / 2
+    a = math.sin(half_dlat) ** 2 + \
+        math.cos(lat1) * math.cos(lat2) * math.sin(half_dlong) ** 2
+    return 2 * EARTH_RADIUS_METERS * math.asin(math.sqrt(a))
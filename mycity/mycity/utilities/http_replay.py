@@ -0,0 +1,281 @@
+"""
+Records upstream HTTP traffic to fixture files and replays it offline
+
+Every outbound call goes through http_utils, so installing a transport there
+captures all of it. In record mode each request is sent as usual and its
+response is written to a fixture file. In replay mode responses are served
+from those files, optionally after an injected delay, so intents can be run
+and timed without a network.
+
+Fixtures are JSON files named after the request's host and a hash of its
+method, url, query string and body. Only the hash of the request is stored,
+so credentials sent in a body or header are not written to disk. Multipart
+bodies are hashed with their random boundary replaced, so the same form
+always maps to the same fixture.
+
+Usage:
+
+    with http_replay.recording('fixtures'):
+        lambda_handler(event, context)
+
+    with http_replay.replaying('fixtures', latency=0.1) as replay:
+        lambda_handler(event, context)
+    print(replay.calls)
+
+"""
+
+import base64
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import random
+import threading
+import time
+from urllib.parse import urlencode, urlsplit, parse_qsl
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+import mycity.utilities.http_utils as http_utils
+
+logger = logging.getLogger(__name__)
+
+# Response headers kept in fixtures. The rest describe the original
+# connection (dates, cookies, server names) and are not replayed.
+RECORDED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Location')
+
+
+class UnrecordedRequestError(requests.exceptions.ConnectionError):
+    """
+    Raised in strict replay mode for a request that has no fixture. It
+    subclasses ConnectionError so intents handle it like a network failure.
+    """
+    pass
+
+
+def request_key(method, url, params=None, data=None, headers=None):
+    """
+    Builds the identity of a request that fixtures are stored under
+
+    :param method: HTTP method
+    :param url: url, possibly with a query string
+    :param params: dictionary or list of pairs added to the query string
+    :param data: body as a dictionary, string or bytes
+    :param headers: request headers, used to find a multipart boundary
+    :return: hexadecimal digest string
+    """
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    if isinstance(params, dict):
+        query.extend(params.items())
+    elif params:
+        query.extend(params)
+    query = sorted((str(key), str(value)) for key, value in query)
+
+    if isinstance(data, dict):
+        body = urlencode(sorted((str(key), str(value))
+                                for key, value in data.items()))
+    elif isinstance(data, bytes):
+        body = data.decode('utf-8', 'replace')
+    else:
+        body = data or ''
+    content_type = CaseInsensitiveDict(headers or {}).get('Content-Type', '')
+    if 'boundary=' in content_type:
+        boundary = content_type.split('boundary=', 1)[1].split(';')[0]
+        body = body.replace(boundary, 'BOUNDARY')
+
+    identity = '\n'.join([method.upper(),
+                          '{}://{}{}'.format(parts.scheme, parts.netloc,
+                                             parts.path),
+                          urlencode(query), body])
+    return hashlib.sha1(identity.encode('utf-8')).hexdigest()
+
+
+def _fixture_path(directory, url, key):
+    host = urlsplit(url).netloc.replace(':', '_') or 'unknown'
+    return os.path.join(directory, '{}-{}.json'.format(host, key[:20]))
+
+
+def _key_for(method, url, kwargs):
+    return request_key(method, url, kwargs.get('params'), kwargs.get('data'),
+                       kwargs.get('headers'))
+
+
+def response_to_fixture(method, url, response):
+    """
+    :param method: HTTP method of the request
+    :param url: url of the request, without its query string parameters
+    :param response: requests.Response object
+    :return: dictionary that can be written as JSON
+    """
+    return {
+        'request': {'method': method.upper(), 'url': url},
+        'response': {
+            'status_code': response.status_code,
+            'url': response.url,
+            'encoding': response.encoding,
+            'headers': {name: response.headers[name]
+                        for name in RECORDED_HEADERS
+                        if name in response.headers},
+            'body_base64':
+                base64.b64encode(response.content).decode('ascii'),
+        }
+    }
+
+
+def fixture_to_response(fixture):
+    """
+    :param fixture: dictionary written by response_to_fixture
+    :return: requests.Response object
+    """
+    recorded = fixture['response']
+    response = requests.Response()
+    response.status_code = recorded['status_code']
+    response.url = recorded['url']
+    response.encoding = recorded['encoding']
+    response.headers = CaseInsensitiveDict(recorded['headers'])
+    response._content = base64.b64decode(recorded['body_base64'])
+    # read by iter_content as well as content, for streamed requests
+    response._content_consumed = True
+    return response
+
+
+class RecordingTransport(object):
+    """
+    http_utils transport that sends requests and saves their responses
+
+    @property: calls ::= number of requests sent
+    """
+
+    def __init__(self, directory):
+        """
+        :param directory: directory fixtures are written to
+        """
+        self.directory = directory
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, session, method, url, **kwargs):
+        response = session.request(method, url, **kwargs)
+        key = _key_for(method, url, kwargs)
+        os.makedirs(self.directory, exist_ok=True)
+        with open(_fixture_path(self.directory, url, key), 'w') as fixture:
+            json.dump(response_to_fixture(method, url, response), fixture,
+                      indent=1, sort_keys=True)
+        with self._lock:
+            self.calls += 1
+        return response
+
+
+class ReplayTransport(object):
+    """
+    http_utils transport that answers requests from fixture files
+
+    @property: calls ::= number of requests answered from a fixture
+    @property: misses ::= number of requests that had no fixture
+    """
+
+    def __init__(self, directory, latency=0.0, jitter=0.0, strict=True,
+                 sleep=time.sleep):
+        """
+        :param directory: directory fixtures are read from
+        :param latency: seconds each response is delayed by
+        :param jitter: up to this many more seconds are added at random
+        :param strict: raise UnrecordedRequestError for a request without
+            a fixture. Otherwise it is answered with a 503 response.
+        :param sleep: function used to wait, replaceable for tests
+        """
+        self.directory = directory
+        self.latency = latency
+        self.jitter = jitter
+        self.strict = strict
+        self.calls = 0
+        self.misses = 0
+        self._sleep = sleep
+        self._fixtures = {}
+        self._lock = threading.Lock()
+
+    def _load(self, url, key):
+        path = _fixture_path(self.directory, url, key)
+        if path not in self._fixtures:
+            try:
+                with open(path) as fixture:
+                    self._fixtures[path] = json.load(fixture)
+            except FileNotFoundError:
+                self._fixtures[path] = None
+        return self._fixtures[path]
+
+    def _delay(self, timeout):
+        """
+        Waits the injected latency, honouring the request's timeout
+
+        :param timeout: read timeout in seconds, or a (connect, read) tuple
+        :raises: requests.exceptions.ReadTimeout if the latency is longer
+            than the timeout
+        """
+        delay = self.latency + random.uniform(0, self.jitter)
+        if isinstance(timeout, tuple):
+            timeout = timeout[1]
+        if timeout is not None and delay > timeout:
+            self._sleep(timeout)
+            raise requests.exceptions.ReadTimeout(
+                'Injected latency exceeded the timeout')
+        if delay:
+            self._sleep(delay)
+
+    def __call__(self, session, method, url, **kwargs):
+        key = _key_for(method, url, kwargs)
+        with self._lock:
+            fixture = self._load(url, key)
+            if fixture is None:
+                self.misses += 1
+            else:
+                self.calls += 1
+        if fixture is None:
+            logger.debug('No fixture for %s %s', method, url)
+            if self.strict:
+                raise UnrecordedRequestError(
+                    'No recorded response for {} {}'.format(method, url))
+            response = requests.Response()
+            response.status_code = 503
+            response.url = url
+            response._content = b''
+            response._content_consumed = True
+            return response
+        self._delay(kwargs.get('timeout'))
+        return fixture_to_response(fixture)
+
+
+@contextlib.contextmanager
+def recording(directory):
+    """
+    Records every upstream response made inside the block
+
+    :param directory: directory fixtures are written to
+    :return: context manager yielding the RecordingTransport
+    """
+    transport = RecordingTransport(directory)
+    previous = http_utils.set_transport(transport)
+    try:
+        yield transport
+    finally:
+        http_utils.set_transport(previous)
+
+
+@contextlib.contextmanager
+def replaying(directory, **options):
+    """
+    Answers every upstream request made inside the block from fixtures
+
+    :param directory: directory fixtures are read from
+    :param options: keyword arguments for ReplayTransport
+    :return: context manager yielding the ReplayTransport
+    """
+    transport = ReplayTransport(directory, **options)
+    previous = http_utils.set_transport(transport)
+    try:
+        yield transport
+    finally:
+        http_utils.set_transport(previous)
@@ -0,0 +1,192 @@
+"""
+Shared HTTP sessions for every outbound call the skill makes
+
+Each upstream host gets one requests.Session with a pooled, keep-alive
+connection adapter. Sessions live at module level, so a warm Lambda container
+reuses its open TCP/TLS connections across invocations instead of paying a
+new handshake for every call.
+
+"""
+
+import logging
+import threading
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import mycity.utilities.deadline as deadline_utils
+from mycity.intents.custom_errors import DeadlineExceededError
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait for a connection and for a response, respectively
+CONNECT_TIMEOUT = 3.05
+READ_TIMEOUT = 10
+DEFAULT_TIMEOUT = (CONNECT_TIMEOUT, READ_TIMEOUT)
+
+# Connections kept open per host. Intents make at most a handful of
+# concurrent calls to any one host.
+POOL_MAXSIZE = 10
+
+# Retry only failures to connect, which are safe to repeat for any method.
+# Read errors are raised as they are, so a slow response still surfaces as
+# requests.exceptions.Timeout rather than a ConnectionError.
+CONNECT_RETRIES = 1
+
+_sessions = {}
+_request_counts = {}
+_sessions_lock = threading.Lock()
+
+# Function that sends requests instead of the session when set, used to
+# record or replay upstream traffic (see utilities/http_replay)
+_transport = None
+
+
+def _host_key(url):
+    """
+    Returns the scheme and host:port a url will connect to
+
+    :param url: String url
+    :return: String like "https://geocode.arcgis.com"
+    """
+    parts = urlsplit(url)
+    return "{}://{}".format(parts.scheme, parts.netloc)
+
+
+def _create_session():
+    """
+    Creates a requests.Session with a pooled adapter for http and https
+
+    :return: requests.Session object
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1,
+                          pool_maxsize=POOL_MAXSIZE,
+                          max_retries=Retry(total=CONNECT_RETRIES,
+                                            read=False, status=0))
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def get_session(url):
+    """
+    Returns the shared session for the host of a url, creating it on first use
+
+    :param url: String url that will be requested with the session
+    :return: requests.Session object
+    """
+    host = _host_key(url)
+    session = _sessions.get(host)
+    if session is None:
+        with _sessions_lock:
+            session = _sessions.get(host)
+            if session is None:
+                logger.debug("Creating pooled session for " + host)
+                session = _create_session()
+                _sessions[host] = session
+                _request_counts[host] = 0
+    return session
+
+
+def request(method, url, **kwargs):
+    """
+    Sends a request through the shared session for the url's host.
+    Accepts the same keyword arguments as requests.request. The timeout,
+    DEFAULT_TIMEOUT when none is given, is capped to the time left before
+    the current invocation's deadline.
+
+    :param method: HTTP method, e.g. "GET"
+    :param url: String url
+    :return: requests.Response object
+    :raises: DeadlineExceededError if the deadline passes before or
+        while the request is made
+    """
+    deadline = deadline_utils.get_current_deadline()
+    timeout = kwargs.pop('timeout', DEFAULT_TIMEOUT)
+    if deadline is not None:
+        timeout = deadline.timeout(timeout)
+    session = get_session(url)
+    host = _host_key(url)
+    _request_counts[host] = _request_counts.get(host, 0) + 1
+    try:
+        if _transport is not None:
+            return _transport(session, method, url, timeout=timeout,
+                              **kwargs)
+        return session.request(method, url, timeout=timeout, **kwargs)
+    except requests.exceptions.Timeout:
+        if deadline is not None and deadline.expired():
+            logger.debug("Deadline exceeded waiting for " + url)
+            raise DeadlineExceededError
+        raise
+
+
+def get(url, params=None, **kwargs):
+    """
+    Sends a GET request through the shared session
+
+    :param url: String url
+    :param params: Dictionary of query string parameters
+    :return: requests.Response object
+    """
+    return request("GET", url, params=params, **kwargs)
+
+
+def post(url, data=None, **kwargs):
+    """
+    Sends a POST request through the shared session
+
+    :param url: String url
+    :param data: Dictionary, bytes or string to send in the body
+    :return: requests.Response object
+    """
+    return request("POST", url, data=data, **kwargs)
+
+
+def set_transport(transport):
+    """
+    Sends every request through transport instead of the network
+
+    :param transport: function called as transport(session, method, url,
+        timeout=..., **kwargs) that returns a requests.Response, or None to
+        send requests through the sessions again
+    :return: the transport that was set before
+    """
+    global _transport
+    previous, _transport = _transport, transport
+    return previous
+
+
+def get_connection_stats():
+    """
+    Reports, per host, how many requests were sent and how many new
+    connections (and so TCP/TLS handshakes) they needed
+
+    :return: dictionary of host to {'requests': int, 'connections': int}
+    """
+    stats = {}
+    with _sessions_lock:
+        for host, session in _sessions.items():
+            adapter = session.get_adapter(host + '/')
+            pools = adapter.poolmanager.pools
+            connections = sum(pools[key].num_connections
+                              for key in pools.keys())
+            stats[host] = {'requests': _request_counts.get(host, 0),
+                           'connections': connections}
+    return stats
+
+
+def close_sessions():
+    """
+    Closes every shared session and forgets them. The next request to a
+    host opens a new session.
+
+    :return: None
+    """
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+        _request_counts.clear()
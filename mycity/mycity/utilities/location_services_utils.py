@@ -1,10 +1,12 @@
-import requests
 import logging
+import mycity.utilities.boundary_utils as boundary_utils
+import mycity.utilities.http_utils as http_utils
 from mycity.intents import intent_constants
 from mycity.intents.speech_constants.location_speech_constants import \
     GENERIC_GEOLOCATION_PERMISSON_SPEECH, GENERIC_DEVICE_PERMISSON_SPEECH
 import mycity.utilities.gis_utils as gis_utils
 import mycity.mycity_response_data_model as mycity_response_data_model
+from mycity.mycity_request_data_model import ResolvedLocation
 import usaddress
 
 """ Methods for working with location based data """
@@ -29,7 +31,7 @@ def get_address_from_user_device(mycity_request):
     head_info = {'Accept': 'application/json',
                  'Authorization': 'Bearer {}'.format(mycity_request.
                                                      api_access_token)}
-    response_object = requests.get(base_url, headers=head_info)
+    response_object = http_utils.get(base_url, headers=head_info)
 
     logger.debug("response object:{}".format(response_object))
     try:
@@ -123,7 +125,8 @@ def is_in_city(mycity_request, city):
 def are_coordinates_in_city(coordinates, cities):
     """
     Checks if the provided coordinates are in any
-    of the cities provided
+    of the cities provided. Uses the bundled neighborhood polygons when they
+    are available, and reverse geocoding otherwise.
     :param coordinates: Dictionary of coordinates
     :param cities: Array of possible cities to check against
     :return: True if coordinates are in one of the cities. False if not.
@@ -135,6 +138,13 @@ def are_coordinates_in_city(coordinates, cities):
     lat = coordinates['y']
     long = coordinates['x']
 
+    if boundary_utils.get_neighborhood_index() is not None:
+        neighborhood = boundary_utils.find_neighborhood(long, lat)
+        # reverse geocoding names a Boston location by its neighborhood or
+        # simply "Boston", so any neighborhood counts when Boston is asked for
+        return neighborhood is not None and \
+            (neighborhood in cities or 'Boston' in cities)
+
     location = gis_utils.reverse_geocode_addr([long, lat])
     if location['address']['City'] in cities and \
             location['address']['Region'] == 'Massachusetts':
@@ -143,10 +153,11 @@ def are_coordinates_in_city(coordinates, cities):
     return False
 
 
-def is_address_in_city(address):
+def is_address_in_city(address, zipcode=None):
     """
     Check if the provided address is in Boston
     :param address: the adress to check
+    :param zipcode: zip code to restrict the search to
     :return: boolean
     """
 
@@ -157,21 +168,71 @@ def is_address_in_city(address):
         address = " ".join([address, "Boston"])
 
     city = 'Boston Metro Area'
-    return gis_utils.geocode_addr(address, city)
+    return gis_utils.geocode_addr(address, city, zipcode)
 
 
-def is_location_in_city(address, coordinates):
+def is_location_in_city(address, coordinates, zipcode=None):
     """
     Determines if the provided address or coordinates
     are located in Boston. If both are provided,
     address takes priority
     :param address: String of address to check. Can be None.
     :param coordinates: Dictionary of coordinates to check. Can be None.
+    :param zipcode: zip code to restrict the address search to
     :return: True if location is in Boston. False if not.
     """
     if address:
-        return is_address_in_city(address)
+        return is_address_in_city(address, zipcode)
     if coordinates:
         return are_coordinates_in_city(coordinates, gis_utils.NEIGHBORHOODS)
 
     return True
+
+
+def resolve_location(mycity_request, address=None, coordinates=None,
+                     geocode=True, check_city=True, zipcode=None):
+    """
+    Finds out where an address or device location is, looking each thing
+    up at most once per session. What is found is kept on the request and
+    in its session attributes, so later turns about the same address reuse
+    it without geocoding again.
+
+    :param mycity_request: MyCityRequestDataModel object
+    :param address: String of the address. Can be None.
+    :param coordinates: Dictionary of coordinates, used when there is no
+        address. Can be None.
+    :param geocode: find the address's coordinates
+    :param check_city: find whether the location is in Boston and in which
+        neighborhood
+    :param zipcode: zip code telling apart addresses that exist in more
+        than one neighborhood
+    :return: ResolvedLocation object
+    :raises: BadAPIResponse, MultipleAddressError from geocoding
+    """
+    if coordinates and 'latitudeInDegrees' in coordinates:
+        coordinates = {'x': coordinates['longitudeInDegrees'],
+                       'y': coordinates['latitudeInDegrees']}
+    location = mycity_request.resolved_location
+    if location is None or not location.describes(address, coordinates):
+        location = ResolvedLocation(address, coordinates)
+
+    if address and location.parsed_address is None:
+        try:
+            location.parsed_address = dict(usaddress.tag(address)[0])
+        except usaddress.RepeatedLabelError:
+            location.parsed_address = {}
+    if geocode and location.coordinates is None:
+        geocoded = gis_utils.geocode_address(address, zipcode)
+        if geocoded:
+            location.coordinates = {'x': geocoded['x'], 'y': geocoded['y']}
+    if check_city and location.in_city is None:
+        # with the address geocoded just above, this is answered from the
+        # geocoding cache
+        location.in_city = is_location_in_city(address, coordinates, zipcode)
+        if location.coordinates and \
+                boundary_utils.get_neighborhood_index() is not None:
+            location.neighborhood = boundary_utils.find_neighborhood(
+                location.coordinates['x'], location.coordinates['y'])
+
+    mycity_request.resolved_location = location
+    return location
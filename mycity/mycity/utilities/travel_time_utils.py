@@ -0,0 +1,181 @@
+"""
+Estimates driving distance and time without calling a routing service
+
+The distance is the great-circle distance stretched by a circuity factor,
+the ratio of the distance by road to the straight line. The time comes from
+speeds that grow with the length of the trip: the first mile is driven
+slowly (side streets, intersections, parking), the miles after it faster.
+Both default to values calibrated for Boston. When the bundled neighborhood
+to neighborhood travel time matrix is present, its circuity and speed for
+the origin's and destination's neighborhoods are used instead.
+
+The matrix is a JSON file in mycity/data:
+
+    {"Allston": {"Back Bay": {"circuity": 1.3, "mph": 14.5}, ...}, ...}
+
+"""
+
+import heapq
+import json
+import logging
+import os
+import threading
+
+import mycity.utilities.arcgis_utils as arcgis_utils
+import mycity.utilities.boundary_utils as boundary_utils
+import mycity.utilities.gis_utils as gis_utils
+
+logger = logging.getLogger(__name__)
+
+MATRIX_PATH = os.path.join(boundary_utils.DATA_DIRECTORY,
+                           'neighborhood_travel_times.json')
+
+METERS_PER_MILE = 1609.344
+
+# Road distance over straight line distance on Boston's street grid
+CIRCUITY_FACTOR = 1.4
+
+# (miles by road into the trip where the band ends, speed in miles per
+# hour within the band)
+SPEED_BANDS = [
+    (1.0, 11.0),
+    (3.0, 15.0),
+    (6.0, 19.0),
+]
+LONG_TRIP_MPH = 24.0
+
+# Minutes spent pulling out and parking, on top of the time moving
+TERMINAL_MINUTES = 2.0
+
+_matrix = None
+_matrix_loaded = False
+_matrix_lock = threading.Lock()
+
+
+def get_travel_time_matrix():
+    """
+    Returns the bundled neighborhood travel time matrix, loading it on
+    first use
+
+    :return: dictionary of origin neighborhood to destination neighborhood
+        to a dictionary with 'circuity' and 'mph' keys, or None if the
+        matrix is not bundled
+    """
+    global _matrix, _matrix_loaded
+    if not _matrix_loaded:
+        with _matrix_lock:
+            if not _matrix_loaded:
+                try:
+                    with open(MATRIX_PATH) as matrix_file:
+                        _matrix = json.load(matrix_file)
+                except FileNotFoundError:
+                    logger.debug('No bundled travel time matrix at ' +
+                                 MATRIX_PATH)
+                    _matrix = None
+                _matrix_loaded = True
+    return _matrix
+
+
+def _minutes_moving(road_miles):
+    """
+    :param road_miles: length of the trip by road
+    :return: minutes spent driving it, each band of the trip at its speed
+    """
+    minutes = 0.0
+    band_start = 0.0
+    for band_end, mph in SPEED_BANDS:
+        if road_miles <= band_start:
+            return minutes
+        minutes += (min(road_miles, band_end) - band_start) / mph * 60
+        band_start = band_end
+    if road_miles > band_start:
+        minutes += (road_miles - band_start) / LONG_TRIP_MPH * 60
+    return minutes
+
+
+def _matrix_entry(origin, destination):
+    """
+    :return: the matrix entry for the points' neighborhoods, or None
+    """
+    matrix = get_travel_time_matrix()
+    if matrix is None or boundary_utils.get_neighborhood_index() is None:
+        return None
+    origin_neighborhood = boundary_utils.find_neighborhood(origin['x'],
+                                                           origin['y'])
+    destination_neighborhood = boundary_utils.find_neighborhood(
+        destination['x'], destination['y'])
+    return matrix.get(origin_neighborhood, {}).get(destination_neighborhood)
+
+
+def estimate_travel(origin, destination):
+    """
+    :param origin: dictionary with 'x' (longitude) and 'y' (latitude) keys
+    :param destination: dictionary with 'x' and 'y' keys
+    :return: tuple of (estimated miles by road, estimated minutes driving)
+    """
+    origin = {'x': float(origin['x']), 'y': float(origin['y'])}
+    destination = {'x': float(destination['x']),
+                   'y': float(destination['y'])}
+    straight_miles = gis_utils.geodesic_distance(
+        origin['x'], origin['y'],
+        destination['x'], destination['y']) / METERS_PER_MILE
+
+    entry = _matrix_entry(origin, destination)
+    if entry is not None:
+        road_miles = straight_miles * entry['circuity']
+        minutes = road_miles / entry['mph'] * 60
+    else:
+        road_miles = straight_miles * CIRCUITY_FACTOR
+        minutes = _minutes_moving(road_miles)
+    return road_miles, minutes + TERMINAL_MINUTES
+
+
+def estimate_closest_route(origin_address, destination_addresses):
+    """
+    Finds the destination with the shortest estimated driving time. Takes
+    and returns the same as arcgis_utils.find_closest_route, with the
+    distance and time marked as approximate.
+
+    :param origin_address: Dictionary containing coordinates of the origin
+    :param destination_addresses: Dictionary with (x, y) coordinate values
+        as the keys, and the associated address string as the values
+    :return: Dictionary containing address, driving time and driving
+        distance of closest destination, or None if no destination has
+        coordinates
+    """
+    routes = estimate_closest_routes(origin_address, destination_addresses, 1)
+    return routes[0] if routes else None
+
+
+def estimate_closest_routes(origin_address, destination_addresses, count):
+    """
+    Finds the count destinations with the shortest estimated driving times.
+    Takes and returns the same as arcgis_utils.find_closest_routes, with
+    the distances and times marked as approximate.
+
+    :param origin_address: Dictionary containing coordinates of the origin
+    :param destination_addresses: Dictionary with (x, y) coordinate values
+        as the keys, and the associated address string as the values
+    :param count: number of destinations wanted
+    :return: list of dictionaries containing address, driving time and
+        driving distance of the closest destinations, closest first, or
+        None if no destination has coordinates
+    """
+    estimates = []
+    for (x, y), address in destination_addresses.items():
+        try:
+            miles, minutes = estimate_travel(origin_address,
+                                             {'x': x, 'y': y})
+        except (KeyError, TypeError, ValueError):
+            continue
+        estimates.append((minutes, len(estimates), address, miles))
+    if not estimates:
+        return None
+
+    return [{
+        'Address': address,
+        arcgis_utils.DRIVING_TIME_TEXT_KEY:
+            "about {} minutes".format(int(round(minutes))),
+        arcgis_utils.DRIVING_DISTANCE_TEXT_KEY:
+            "about {} miles".format(max(round(miles, 1), 0.1)),
+    } for minutes, _, address, miles in heapq.nsmallest(count, estimates)]
@@ -1,7 +1,95 @@
-import requests
+"""
+Ward, precinct and polling location lookups
+
+When the precinct polygons and the polling location table are bundled in
+mycity/data, both lookups are answered in process: the point is located in
+a grid index of the precincts (see utilities/boundary_utils) and its ward
+and precinct looked up in the table. Without them, the City's ArcGIS
+layers are queried as before. Both are built from those layers when the
+skill is built (see hooks/build.sh), or by hand with:
+
+    python -m mycity.utilities.voting_utils --refresh
+
+and --check fails unless both are there and load.
+
+"""
+
+import argparse
+import json
+import logging
+import os
 import re
+import threading
+
+import mycity.utilities.arcgis_utils as arcgis_utils
+import mycity.utilities.boundary_utils as boundary_utils
+import mycity.utilities.http_utils as http_utils
 from mycity.intents.custom_errors import ParseError
 
+logger = logging.getLogger(__name__)
+
+PRECINCTS_URL = "https://services.arcgis.com/sFnw0xNflSi8J0uh/ArcGIS/" \
+                "rest/services/Precincts_2017/FeatureServer/0"
+POLLING_LOCATIONS_URL = "http://gis.cityofboston.gov/arcgis/rest/services/" \
+                        "CityServices/OpenData/MapServer/5"
+WARD_PRECINCT_FIELD = "WARD_PRECINCT"
+
+PRECINCTS_PATH = os.path.join(boundary_utils.DATA_DIRECTORY,
+                              'boston_precincts.geojson')
+POLLING_LOCATIONS_PATH = os.path.join(boundary_utils.DATA_DIRECTORY,
+                                      'polling_locations.json')
+
+# Precincts are a few blocks across, so they get a finer grid than
+# neighborhoods
+PRECINCT_CELL_SIZE = 0.002
+
+_precinct_index = None
+_polling_locations = None
+_data_loaded = False
+_data_lock = threading.Lock()
+
+
+def _load_data():
+    """
+    Loads the bundled precinct index and polling location table on first
+    use. Both are needed, so either missing disables the local lookups.
+
+    :return: tuple of (BoundaryIndex, dictionary of ward and precinct to
+        polling location), or (None, None) if they are not bundled
+    """
+    global _precinct_index, _polling_locations, _data_loaded
+    if not _data_loaded:
+        with _data_lock:
+            if not _data_loaded:
+                try:
+                    with open(POLLING_LOCATIONS_PATH) as table_file:
+                        _polling_locations = json.load(table_file)
+                    _precinct_index = boundary_utils.load_boundary_index(
+                        PRECINCTS_PATH, WARD_PRECINCT_FIELD,
+                        PRECINCT_CELL_SIZE)
+                except FileNotFoundError:
+                    logger.debug('No bundled polling locations at ' +
+                                 POLLING_LOCATIONS_PATH)
+                    _polling_locations = None
+                if _precinct_index is None:
+                    _polling_locations = None
+                _data_loaded = True
+    return _precinct_index, _polling_locations
+
+
+def _ward_precinct_key(ward, precinct):
+    """
+    :return: four digit ward and precinct, such as "1008"
+    """
+    return "{:02d}{:02d}".format(int(ward), int(precinct))
+
+
+def _format_poll_location(location_name, location_address):
+    return {
+        "Location Name": re.sub('[-]', '', location_name),
+        "Location Address": re.sub('[-]', '', location_address)
+    }
+
 
 def get_polling_location(ward_precinct):
     """
@@ -11,12 +99,20 @@ def get_polling_location(ward_precinct):
     :param ward_precinct: dictionary object containing the ward and precinct
     :return: Dict containing location address string and
         location name string
+    :raises: ParseError if no polling location is known for the precinct
     """
 
     ward = ward_precinct["ward"].lstrip()
     precinct = ward_precinct["precinct"].lstrip()
-    url = "http://gis.cityofboston.gov/arcgis/rest/services/" \
-        "CityServices/OpenData/MapServer/5/query"
+    _, polling_locations = _load_data()
+    if polling_locations is not None:
+        location = polling_locations.get(_ward_precinct_key(ward, precinct))
+        if location is None:
+            raise ParseError
+        return _format_poll_location(location["Location2"],
+                                     location["Location3"])
+
+    url = POLLING_LOCATIONS_URL + "/query"
 
     params = {
         "f": "json",
@@ -24,20 +120,14 @@ def get_polling_location(ward_precinct):
         "where": "Ward = " + ward + "AND Precinct = " + precinct,
         "outFields": "Location2, Location3"
     }
-    response = requests.get(url, params=params)
+    response = http_utils.get(url, params=params)
     if response.status_code != 200:
         raise ParseError
     else:
         res_data = response.json()
         location_name = res_data['features'][0]['attributes']['Location2']
         location_address = res_data['features'][0]['attributes']['Location3']
-        stripped_address = re.sub('[-]', '', location_address)
-        stripped_name = re.sub('[-]', '', location_name)
-        poll_location = {
-            "Location Name": stripped_name,
-            "Location Address": stripped_address
-        }
-        return poll_location
+        return _format_poll_location(location_name, location_address)
 
 
 def get_ward_precinct_info(coordinates):
@@ -49,9 +139,17 @@ def get_ward_precinct_info(coordinates):
     string and floating point values for x and y that represent
     longitude and latitude
     :return: Dict containing ward string and precinct string
+    :raises: ParseError if the coordinates are in no precinct
     """
-    url = "https://services.arcgis.com/sFnw0xNflSi8J0uh/ArcGIS/" \
-          "rest/services/Precincts_2017/FeatureServer/0/query"
+    precinct_index, _ = _load_data()
+    if precinct_index is not None:
+        precinct_data = precinct_index.locate(float(coordinates['x']),
+                                              float(coordinates['y']))
+        if precinct_data is None:
+            raise ParseError
+        return {'ward': precinct_data[:2], 'precinct': precinct_data[2:4]}
+
+    url = PRECINCTS_URL + "/query"
 
     params = {
         "f": "json",
@@ -59,19 +157,140 @@ def get_ward_precinct_info(coordinates):
         "geometryType": "esriGeometryPoint",
         "inSR": "4326",
         "returnGeometry": "false",
-        "outFields": "WARD_PRECINCT"
+        "outFields": WARD_PRECINCT_FIELD
     }
 
-    response = requests.get(url, params=params)
+    response = http_utils.get(url, params=params)
 
     if response.status_code != 200:
         raise ParseError
     else:
         res_data = response.json()
-        precinct_data = res_data['features'][0]['attributes']['WARD_PRECINCT']
+        precinct_data = \
+            res_data['features'][0]['attributes'][WARD_PRECINCT_FIELD]
         ward_precinct = {
             'ward': precinct_data[:2],
             'precinct': precinct_data[2:4]
         }
         return ward_precinct
 
+
+def _is_clockwise(ring):
+    return sum((x2 - x1) * (y2 + y1)
+               for (x1, y1), (x2, y2) in zip(ring, ring[1:] + ring[:1])) > 0
+
+
+def _rings_to_multipolygon(rings):
+    """
+    Turns the rings of an ArcGIS polygon, where clockwise rings are
+    exteriors and the counterclockwise rings after one are its holes, into
+    GeoJSON MultiPolygon coordinates
+
+    :param rings: list of rings, each a list of [x, y] positions
+    :return: list of polygons, each a list of rings
+    """
+    polygons = []
+    for ring in rings:
+        if _is_clockwise(ring) or not polygons:
+            polygons.append([ring])
+        else:
+            polygons[-1].append(ring)
+    return polygons
+
+
+def refresh_voting_data(precincts_url=PRECINCTS_URL,
+                        polling_locations_url=POLLING_LOCATIONS_URL,
+                        precincts_path=PRECINCTS_PATH,
+                        polling_locations_path=POLLING_LOCATIONS_PATH):
+    """
+    Downloads the precinct polygons and the polling locations and rewrites
+    the bundled files
+
+    :return: tuple of (number of precincts, number of polling locations)
+        written
+    :raises: BadAPIResponse if a download fails
+    """
+    precincts = arcgis_utils.query_feature_layer(
+        precincts_url, {'out_fields': WARD_PRECINCT_FIELD, 'out_sr': 4326})
+    features = [{
+        'type': 'Feature',
+        'properties': {
+            WARD_PRECINCT_FIELD:
+                precinct['attributes'][WARD_PRECINCT_FIELD]},
+        'geometry': {
+            'type': 'MultiPolygon',
+            'coordinates':
+                _rings_to_multipolygon(precinct['geometry']['rings'])}
+    } for precinct in precincts if precinct.get('geometry')]
+
+    locations = arcgis_utils.query_feature_layer(
+        polling_locations_url,
+        {'out_fields': 'Ward,Precinct,Location2,Location3',
+         'return_geometry': False})
+    table = {}
+    for location in locations:
+        attributes = location['attributes']
+        try:
+            key = _ward_precinct_key(attributes['Ward'],
+                                     attributes['Precinct'])
+        except (TypeError, ValueError):
+            continue
+        table[key] = {'Location2': attributes['Location2'] or '',
+                      'Location3': attributes['Location3'] or ''}
+
+    precinct_count = boundary_utils.write_boundaries(
+        features, precincts_path, WARD_PRECINCT_FIELD)
+    with open(polling_locations_path, 'w') as table_file:
+        json.dump(table, table_file, indent=0, sort_keys=True)
+    return precinct_count, len(table)
+
+
+def check_voting_data(precincts_path=PRECINCTS_PATH,
+                      polling_locations_path=POLLING_LOCATIONS_PATH):
+    """
+    Loads the bundled precincts and polling locations the way _load_data
+    does
+
+    :return: tuple of (number of precincts, number of polling locations)
+    :raises: FileNotFoundError if a file is not bundled, ValueError if one
+        is empty
+    """
+    with open(polling_locations_path) as table_file:
+        table = json.load(table_file)
+    index = boundary_utils.load_boundary_index(
+        precincts_path, WARD_PRECINCT_FIELD, PRECINCT_CELL_SIZE)
+    if index is None:
+        raise FileNotFoundError(precincts_path)
+    if not index.names or not table:
+        raise ValueError('No precincts or polling locations bundled')
+    return len(index.names), len(table)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Refresh the bundled precincts and polling locations')
+    parser.add_argument('--refresh', action='store_true',
+                        help='download both and rewrite the bundled files')
+    parser.add_argument('--check', action='store_true',
+                        help='fail unless both bundled files load')
+    args = parser.parse_args(argv)
+    if args.refresh:
+        precinct_count, location_count = refresh_voting_data()
+        print('Wrote {} precincts to {} and {} polling locations to {}'
+              .format(precinct_count, PRECINCTS_PATH, location_count,
+                      POLLING_LOCATIONS_PATH))
+    if args.check:
+        try:
+            precinct_count, location_count = check_voting_data(
+                PRECINCTS_PATH, POLLING_LOCATIONS_PATH)
+        except (OSError, ValueError) as error:
+            parser.exit(1, 'Bundled voting data does not load: {}\n'.format(
+                error))
+        print('{} precincts and {} polling locations load'.format(
+            precinct_count, location_count))
+    if not (args.refresh or args.check):
+        parser.print_help()
+
+
+if __name__ == '__main__':
+    main()